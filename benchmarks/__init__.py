@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+Benchmarks - Synthetic sprint trees and timed scenarios
+
+Run with `python -m benchmarks.run` from the repository root.
+"""
@@ -0,0 +1,179 @@
+# benchmarks/generate.py
+"""
+Generate - Synthetic sprint trees and Web.config files for benchmarks.
+
+Sprint trees follow the same layout `--new-day` produces:
+`root/YYYY/MM/WW/YYYYMMDD.md`, one file per working day, each carrying the
+previous days' `####` sections over under `### Daily Tracker`.
+"""
+import argparse
+import random
+from collections import deque
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Deque, Optional
+
+TICKET_WORDS = [
+    "updating url", "solving bug in component", "Creating unit tests",
+    "adding endpoints", "code review", "pairing on migration",
+    "reading logs", "writing docs", "refactoring service layer",
+]
+MEETINGS = ["Stand-up", "Refinement", "Bug Scrub", "Retro", "Planning"]
+
+HEADER = """# Today {date}
+
+## Questions
+
+Generated for benchmarks.
+
+## Daily Tasks
+
+> These reoccur every day!
+
+- [x] Copy Daily Task List
+- [x] Log into portal
+- [ ] Log your times
+
+## Current Tasks
+
+### Priority
+
+{current}
+
+### Daily Tracker
+"""
+
+FOOTER = """
+---
+
+> Let the tripple dash indicate end of what program works on.
+
+## Other Stuff
+
+Below is other stuff
+"""
+
+
+def day_section(day: date, tasks_per_day: int, notes_per_task: int,
+                rng: random.Random) -> str:
+    """One `#### date` section with `tasks_per_day` tasks and a Bye."""
+    lines = [f"#### {day.isoformat()} ({day.strftime('%a')})", ""]
+    minute = 8 * 60 + rng.randrange(0, 60, 5)
+    for _ in range(tasks_per_day):
+        kind = rng.random()
+        if kind < 0.6:
+            name = f"TICKET-{rng.randint(10000, 10400)}"
+        elif kind < 0.85:
+            name = f"Meeting: {rng.choice(MEETINGS)}"
+        else:
+            name = rng.choice(["Admin", "Lunch", "Support"])
+
+        lines.append(f"- {minute // 60:02d}:{minute % 60:02d} - {name}")
+        for _ in range(rng.randint(0, notes_per_task)):
+            lines.append(f"  - {rng.choice(TICKET_WORDS)}")
+        minute = min(minute + rng.randrange(15, 120, 5), 23 * 60)
+    lines.append(f"- {minute // 60:02d}:{minute % 60:02d} - Bye")
+    return "\n".join(lines) + "\n"
+
+
+def day_file_content(day: date, sections: Deque[str], rng: random.Random) -> str:
+    current = "\n".join(
+        f"- [{'x' if rng.random() < 0.3 else ' '}] TICKET-{rng.randint(10000, 10400)}"
+        for _ in range(5))
+    return HEADER.format(date=day.isoformat(), current=current) \
+        + "\n" + "\n".join(sections) + FOOTER
+
+
+def generate_sprint_tree(root: Path, years: int = 1, tasks_per_day: int = 10,
+                         notes_per_task: int = 3, carry_days: Optional[int] = 20,
+                         start: date = date(2024, 1, 1), seed: int = 0) -> int:
+    """
+    Write `years` of working days under `root`. Each file carries the
+    previous `carry_days` days over (all of them when None).
+    Returns the number of files written.
+    """
+    rng = random.Random(seed)
+    sections: Deque[str] = deque(maxlen=carry_days)
+    end = date(start.year + years, start.month, start.day)
+
+    sprint_dir: Optional[Path] = None
+    sprint = None
+    written = 0
+    day = start
+    while day < end:
+        if day.weekday() < 5:
+            week = day.strftime("%U")
+            # Same rule as --new-day: week 00 stays in last year's sprint
+            if sprint_dir is None or (week != sprint and int(week) != 0):
+                sprint = week
+                sprint_dir = root / day.strftime("%Y") / day.strftime("%m") / week
+                sprint_dir.mkdir(parents=True, exist_ok=True)
+
+            sections.appendleft(
+                day_section(day, tasks_per_day, notes_per_task, rng))
+            content = day_file_content(day, sections, rng)
+            (sprint_dir / f"{day.strftime('%Y%m%d')}.md").write_text(
+                content, encoding="utf-8")
+            written += 1
+        day += timedelta(days=1)
+    return written
+
+
+def generate_web_config(path: Path, size_bytes: int = 1 << 20,
+                        seed: int = 0) -> Path:
+    """A Web.config padded with app settings around one httpErrors block."""
+    rng = random.Random(seed)
+    settings = []
+    size = 0
+    i = 0
+    while size < size_bytes:
+        line = f'    <add key="setting{i}" value="{rng.getrandbits(64):x}" />'
+        settings.append(line)
+        size += len(line) + 1
+        i += 1
+    half = len(settings) // 2
+
+    content = "\n".join([
+        '<?xml version="1.0" encoding="utf-8"?>',
+        "<configuration>",
+        "  <appSettings>",
+        *settings[:half],
+        "  </appSettings>",
+        "  <system.webServer>",
+        '    <httpErrors errorMode="Custom" defaultResponseMode="Redirect">',
+        '      <remove statusCode="404" />',
+        '      <error statusCode="404" responseMode="Redirect" redirect="~/Error/NotFound" />',
+        "    </httpErrors>",
+        "  </system.webServer>",
+        "  <connectionStrings>",
+        *settings[half:],
+        "  </connectionStrings>",
+        "</configuration>",
+        "",
+    ])
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic sprint tree for benchmarks')
+    parser.add_argument('root', help='Directory to create the sprint tree in')
+    parser.add_argument('--years', type=int, default=1)
+    parser.add_argument('--tasks', type=int, default=10,
+                        help='tasks per day')
+    parser.add_argument('--notes', type=int, default=3,
+                        help='maximum notes per task')
+    parser.add_argument('--carry', type=int, default=20,
+                        help='days carried over per file, 0 for all history')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    written = generate_sprint_tree(
+        Path(args.root), args.years, args.tasks, args.notes,
+        args.carry or None, seed=args.seed)
+    print(f"Created {written} day files under {args.root}")
+
+
+if __name__ == '__main__':
+    main()
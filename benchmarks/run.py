@@ -0,0 +1,270 @@
+# benchmarks/run.py
+"""
+Run - Timed scenarios over a synthetic sprint tree.
+
+    python -m benchmarks.run --years 2 --output bench.json
+    python -m benchmarks.run --compare bench.json
+
+Everything runs inside a temp directory with HOME pointed at it, so the
+real config, parse cache and manifest are never touched.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.generate import (  # noqa: E402
+    day_file_content, day_section, generate_sprint_tree, generate_web_config
+)
+
+
+class Scenario:
+    """A named callable, timed `repeat` times after an optional setup."""
+
+    def __init__(self, name: str, func: Callable[[], Any],
+                 setup: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+
+    def run(self, repeat: int) -> Dict[str, Any]:
+        times = []
+        for _ in range(repeat):
+            if self.setup is not None:
+                self.setup()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                self.func()
+                times.append(time.perf_counter() - start)
+        return {
+            'name': self.name,
+            'repeat': repeat,
+            'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.fmean(times),
+            'times': times,
+        }
+
+
+def run_cli(*argv: str) -> None:
+    """Run `time_tracker_parser.main()` in-process with the given args."""
+    import time_tracker_parser
+
+    saved = sys.argv
+    sys.argv = ['time_tracker_parser.py', *argv]
+    try:
+        time_tracker_parser.main()
+    finally:
+        sys.argv = saved
+
+
+def build_scenarios(work_dir: Path, args: argparse.Namespace) -> List[Scenario]:
+    import random
+
+    import time_tracker_parser
+    import web_config_manager
+    from markflow.cache import ParseCache
+    from markflow.engine import Engine, parse_files
+
+    tree_root = work_dir / 'sprints'
+    files = generate_sprint_tree(
+        tree_root, args.years, args.tasks, args.notes, args.carry or None)
+
+    # One big carried-over file holding the whole history
+    rng = random.Random(1)
+    history = [
+        day_section(date(2024, 1, 1), args.tasks, args.notes, rng)
+        for _ in range(args.years * 260)
+    ]
+    big_root = work_dir / 'big' / '2024' / '01' / '00'
+    big_root.mkdir(parents=True)
+    big_file = big_root / '20240101.md'
+    big_file.write_text(
+        day_file_content(date(2024, 1, 1), history, rng), encoding='utf-8')
+
+    # A single day with a very long task list
+    big_day = day_section(date(2024, 1, 1), args.tasks * 50, args.notes, rng)
+    big_day = big_day.split('\n', 1)[1]
+
+    config_dir = work_dir / '.config' / 'python-helpers'
+    config_dir.mkdir(parents=True)
+    (config_dir / 'config.yaml').write_text(
+        f"tracking_root_directory: {big_root.parent.parent.parent}\n")
+
+    web_config = generate_web_config(
+        work_dir / 'Web.config', args.web_config_mb << 20)
+
+    # The same history with every closed year and month archived
+    archived_root = work_dir / 'archived'
+    shutil.copytree(tree_root, archived_root)
+    Engine(archived_root, workers=1).archive()
+
+    results = {}
+    for file_results in parse_files(
+            [Path(p) for p in sorted(tree_root.rglob('*.md'))], workers=1):
+        results.update(file_results)
+
+    print(f"Generated {files} day files, big file "
+          f"{big_file.stat().st_size >> 10} KiB, Web.config "
+          f"{web_config.stat().st_size >> 10} KiB", file=sys.stderr)
+
+    def clear_cache():
+        for name in ('parse_cache.json', 'sprint_manifest.json'):
+            with contextlib.suppress(FileNotFoundError):
+                (config_dir / name).unlink()
+
+    def reset_new_day():
+        # Drop the day (and sprint) the previous run created
+        for year_dir in big_root.parent.parent.parent.iterdir():
+            if year_dir != big_root.parent.parent:
+                shutil.rmtree(year_dir)
+        for path in big_root.iterdir():
+            if path != big_file:
+                path.unlink()
+
+    def engine_summary():
+        # What a dashboard refresh does in-process instead of running the CLI
+        engine = Engine(tree_root, ParseCache.load(), workers=1)
+        return engine.summary(engine.days()).top(10)
+
+    def toggle_web_config():
+        web_config_manager.process_web_config(web_config, 'comment')
+        web_config_manager.process_web_config(web_config, 'uncomment')
+
+    return [
+        Scenario('parse_time_tracking_file',
+                 lambda: time_tracker_parser.parse_time_tracking_file(big_file)),
+        Scenario('parse_day_tasks',
+                 lambda: time_tracker_parser.parse_day_tasks(big_day)),
+        Scenario('print_summary',
+                 lambda: time_tracker_parser.print_summary(results)),
+        Scenario('print_summary_top',
+                 lambda: time_tracker_parser.print_summary(
+                     results, top=5, max_notes=3)),
+        Scenario('summary_tree_uncached',
+                 lambda: run_cli('--root', str(tree_root), '--summary',
+                                 '--no-cache', '--workers', '1')),
+        Scenario('summary_tree_cold_cache',
+                 lambda: run_cli('--root', str(tree_root), '--summary',
+                                 '--workers', '1'),
+                 setup=clear_cache),
+        Scenario('summary_tree_warm_cache',
+                 lambda: run_cli('--root', str(tree_root), '--summary',
+                                 '--workers', '1')),
+        Scenario('engine_summary_warm_cache', engine_summary),
+        Scenario('summary_archived_cold_cache',
+                 lambda: run_cli('--root', str(archived_root), '--summary',
+                                 '--workers', '1'),
+                 setup=clear_cache),
+        Scenario('new_day', lambda: run_cli('--new-day'), setup=reset_new_day),
+        Scenario('process_web_config', toggle_web_config),
+    ]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(report: Dict[str, Any],
+                baseline: Optional[Dict[str, Any]] = None) -> None:
+    before = {s['name']: s for s in baseline['scenarios']} if baseline else {}
+    print(f"{'scenario':<28}{'min (ms)':>12}{'median (ms)':>14}"
+          + (f"{'vs baseline':>14}" if baseline else ""))
+    for scenario in report['scenarios']:
+        line = f"{scenario['name']:<28}{scenario['min'] * 1000:>12.2f}" \
+            f"{scenario['median'] * 1000:>14.2f}"
+        old = before.get(scenario['name'])
+        if old:
+            line += f"{scenario['median'] / old['median']:>13.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark parsing, summaries, new-day and Web.config toggling')
+    parser.add_argument('--years', type=int, default=1,
+                        help='years of working days in the sprint tree')
+    parser.add_argument('--tasks', type=int, default=10, help='tasks per day')
+    parser.add_argument('--notes', type=int, default=3,
+                        help='maximum notes per task')
+    parser.add_argument('--carry', type=int, default=20,
+                        help='days carried over per file, 0 for all history')
+    parser.add_argument('--web-config-mb', type=int, default=4,
+                        help='size of the generated Web.config')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scenario', action='append',
+                        help='only run scenarios whose name contains this')
+    parser.add_argument('--output',
+                        help='write the JSON report here, "-" for stdout')
+    parser.add_argument('--compare',
+                        help='JSON report of an earlier run to compare against')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix='markflow-bench-') as tmp:
+        work_dir = Path(tmp)
+        saved_home = os.environ.get('HOME')
+        os.environ['HOME'] = str(work_dir)
+        try:
+            scenarios = build_scenarios(work_dir, args)
+            if args.scenario:
+                scenarios = [
+                    s for s in scenarios
+                    if any(name in s.name for name in args.scenario)
+                ]
+            measured = [s.run(args.repeat) for s in scenarios]
+        finally:
+            if saved_home is None:
+                del os.environ['HOME']
+            else:
+                os.environ['HOME'] = saved_home
+
+    report = {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'years': args.years, 'tasks': args.tasks, 'notes': args.notes,
+            'carry': args.carry, 'web_config_mb': args.web_config_mb,
+            'repeat': args.repeat,
+        },
+        'scenarios': measured,
+    }
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print_table(report, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/startup.py
+"""
+Startup - Wall time of short CLI runs against a budget.
+
+    python -m benchmarks.startup --budget-ms 120
+
+Each command is run as a fresh interpreter, the way shell hooks and
+prompts run it, with HOME pointed at a temp directory holding a config
+file. Exits non-zero when any command's median is over the budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / 'time_tracker_parser.py'
+EXAMPLE_FILE = REPO_ROOT / 'example' / '2025' / '06' / '26' / '20250701.md'
+
+
+def commands() -> Dict[str, List[str]]:
+    """Name -> argv of the runs to time."""
+    python = sys.executable
+    return {
+        'interpreter': [python, '-c', 'pass'],
+        'help': [python, str(CLI), '--help'],
+        'file': [python, str(CLI), '--file', str(EXAMPLE_FILE),
+                 '--aggregate-time', '--no-cache'],
+        'latest_day': [python, str(CLI), '--aggregate-time'],
+    }
+
+
+def time_command(argv: List[str], env: Dict[str, str],
+                 repeat: int) -> Dict[str, Any]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'times': times,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time fresh CLI runs and check them against a budget')
+    parser.add_argument('--budget-ms', type=float, default=120.0,
+                        help='maximum median wall time per command (default: 120)')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output',
+                        help='write the JSON report here, "-" for stdout')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='markflow-startup-') as tmp:
+        config_dir = Path(tmp) / '.config' / 'python-helpers'
+        config_dir.mkdir(parents=True)
+        (config_dir / 'config.yaml').write_text(
+            f"tracking_root_directory: {REPO_ROOT / 'example'}\n")
+        env = dict(os.environ, HOME=tmp)
+        for name in ('PYTHON_HELPERS_CONFIG', 'PYTHON_HELPERS_ROOT'):
+            env.pop(name, None)
+
+        results = {}
+        for name, argv in commands().items():
+            # One untimed run warms the OS cache, .pyc files and snapshots
+            subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, check=True)
+            results[name] = time_command(argv, env, args.repeat)
+
+    over = [
+        name for name, result in results.items()
+        if result['median'] * 1000 > args.budget_ms
+    ]
+    report = {
+        'python': sys.version.split()[0],
+        'budget_ms': args.budget_ms,
+        'commands': results,
+        'over_budget': over,
+    }
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        print(f"{'command':<16}{'min (ms)':>12}{'median (ms)':>14}")
+        for name, result in results.items():
+            flag = '  over budget' if name in over else ''
+            print(f"{name:<16}{result['min'] * 1000:>12.2f}"
+                  f"{result['median'] * 1000:>14.2f}{flag}")
+
+    if over:
+        print(f"❌ Over the {args.budget_ms:g}ms budget: {', '.join(over)}",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
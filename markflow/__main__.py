@@ -0,0 +1,59 @@
+# markflow/__main__.py
+"""
+Markflow - `python -m markflow serve` runs the resident query daemon,
+`python -m markflow stop` stops it.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from markflow.serve import DaemonError, query, serve
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='markflow', description='Markdown workflow tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser(
+        'serve', help='keep the sprint tree parsed in memory and answer queries on a Unix socket')
+    serve_parser.add_argument('--root',
+                              help='serve this directory instead of the configured root')
+    serve_parser.add_argument('--socket',
+                              help='socket path (default: markflow.sock next to the config)')
+    serve_parser.add_argument('--interval', type=float, default=5.0,
+                              help='seconds between checks for changed day files (default: 5)')
+    serve_parser.add_argument('--workers', type=int,
+                              help='worker processes for the first parse (default: CPU count)')
+
+    stop_parser = commands.add_parser('stop', help='stop a running daemon')
+    stop_parser.add_argument('--socket',
+                             help='socket path (default: markflow.sock next to the config)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve' and args.interval <= 0:
+        serve_parser.error('--interval must be more than 0 seconds')
+    socket_path = Path(args.socket) if args.socket else None
+
+    if args.command == 'serve':
+        try:
+            serve(Path(args.root) if args.root else None, socket_path,
+                  args.interval, args.workers)
+        except (RuntimeError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+
+    try:
+        stopped = query({'op': 'stop'}, socket_path)
+    except DaemonError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if stopped is None:
+        print("❌ No daemon is running")
+        sys.exit(1)
+    print(f"🛑 Stopped daemon {stopped['pid']}")
+
+
+if __name__ == '__main__':
+    main()
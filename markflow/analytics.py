@@ -0,0 +1,266 @@
+# markflow/analytics.py
+"""
+Analytics - Vectorized rollups over many parsed days.
+
+Every occurrence from a `{date: DaySummary}` mapping is loaded once into
+flat NumPy columns (day index, task id, start minute, duration). Rollups
+are then group-bys with `np.bincount` instead of loops over nested dicts,
+so reports over thousands of days stay in the millisecond range.
+
+NumPy is optional: it is only needed by this module, and only imported
+when a rollup or heatmap is asked for.
+"""
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from markflow.models.time_records import DaySummary
+
+PERIODS = ('day', 'week', 'sprint', 'month', 'quarter')
+PERCENTILES = (50, 90)
+
+# Light to heavy, blank for no time at all
+HEATMAP_SHADES = ' .:-=+*#%@'
+
+# 1970-01-01 was a Thursday
+_MONDAY_OFFSET = 3
+_SUNDAY_OFFSET = 4
+
+
+def require_numpy():
+    """The numpy module, or an ImportError saying how to get it."""
+    if np is None:
+        raise ImportError(
+            "markflow.analytics needs NumPy, install it with: pip install numpy")
+    return np
+
+
+class Rollup:
+    """Totals per period, with per-day statistics inside each period."""
+    __slots__ = ('period', 'labels', 'totals', 'days', 'mean', 'percentiles')
+
+    def __init__(self, period: str, labels: List[str], totals, days, mean,
+                 percentiles: Dict[int, 'np.ndarray']):
+        self.period = period
+        self.labels = labels
+        self.totals = totals
+        self.days = days
+        self.mean = mean
+        self.percentiles = percentiles
+
+    def __len__(self):
+        return len(self.labels)
+
+    def rows(self):
+        """(label, total, days, mean per day, {pct: value}) per period."""
+        for i, label in enumerate(self.labels):
+            yield (label, int(self.totals[i]), int(self.days[i]),
+                   float(self.mean[i]),
+                   {pct: float(values[i])
+                    for pct, values in self.percentiles.items()})
+
+
+class OccurrenceTable:
+    """
+    Columnar view of every occurrence in a set of days.
+
+    `dates` holds the distinct days in order and `task_names` the distinct
+    tasks in order of first appearance; the per-occurrence columns refer
+    to them by index.
+    """
+    __slots__ = ('dates', 'task_names', 'day_index', 'task_ids', 'starts',
+                 'durations')
+
+    def __init__(self, dates: List[str], task_names: List[str],
+                 day_index, task_ids, starts, durations):
+        self.dates = dates
+        self.task_names = task_names
+        self.day_index = day_index
+        self.task_ids = task_ids
+        self.starts = starts
+        self.durations = durations
+
+    @classmethod
+    def from_summaries(cls, results: Dict[str, DaySummary]) -> 'OccurrenceTable':
+        """Load `{date: DaySummary}` results, days sorted by date."""
+        require_numpy()
+        dates = sorted(results)
+        ids: Dict[str, int] = {}
+        day_index, task_ids, starts, durations = [], [], [], []
+        for i, date in enumerate(dates):
+            day = results[date]
+            if not day:
+                continue
+            # Day-local task ids -> table-wide ones
+            lookup = np.array(
+                [ids.setdefault(name, len(ids)) for name in day.names],
+                dtype=np.int32)
+            local = np.frombuffer(day.task_ids, dtype=day.task_ids.typecode)
+            task_ids.append(lookup[local])
+            starts.append(np.frombuffer(day.starts, dtype=day.starts.typecode))
+            durations.append(
+                np.frombuffer(day.durations, dtype=day.durations.typecode))
+            day_index.append(np.full(len(day), i, dtype=np.int32))
+
+        def column(parts, dtype):
+            if not parts:
+                return np.zeros(0, dtype=dtype)
+            return np.concatenate(parts).astype(dtype, copy=False)
+
+        return cls(dates, list(ids),
+                   column(day_index, np.int32), column(task_ids, np.int32),
+                   column(starts, np.int16), column(durations, np.int64))
+
+    def __len__(self):
+        return len(self.durations)
+
+    @property
+    def day_numbers(self):
+        """Days since 1970-01-01, one per entry of `dates`."""
+        return np.array(self.dates, dtype='datetime64[D]').astype(np.int64)
+
+    def day_totals(self):
+        """Minutes tracked on each of `dates`."""
+        return np.bincount(self.day_index, weights=self.durations,
+                           minlength=len(self.dates)).astype(np.int64)
+
+    def task_totals(self):
+        """Minutes per task, indexed like `task_names`."""
+        return np.bincount(self.task_ids, weights=self.durations,
+                           minlength=len(self.task_names)).astype(np.int64)
+
+    def pivot(self):
+        """Task x day matrix of minutes, rows like `task_names`."""
+        n_days = len(self.dates)
+        flat = self.task_ids.astype(np.int64) * n_days + self.day_index
+        return np.bincount(
+            flat, weights=self.durations,
+            minlength=len(self.task_names) * n_days,
+        ).astype(np.int64).reshape(len(self.task_names), n_days)
+
+    def period_index(self, period: str) -> Tuple[List[str], 'np.ndarray']:
+        """
+        Labels of the periods covering `dates` and, for each day, the index
+        of its period. Weeks are ISO weeks; sprints are `%U` weeks, which
+        start on Sunday, labelled by the year and week of their first day.
+        """
+        if period not in PERIODS:
+            raise ValueError(
+                f"unknown period {period!r}, expected one of {', '.join(PERIODS)}")
+        days = self.day_numbers
+        if period == 'day':
+            return list(self.dates), np.arange(len(self.dates))
+
+        if period in ('week', 'sprint'):
+            offset = _MONDAY_OFFSET if period == 'week' else _SUNDAY_OFFSET
+            keys = days - (days + offset) % 7
+        else:
+            months = days.astype('datetime64[D]').astype('datetime64[M]') \
+                .astype(np.int64)
+            keys = months - months % 3 if period == 'quarter' else months
+
+        keys, inverse = np.unique(keys, return_inverse=True)
+        return [_period_label(period, int(key)) for key in keys], inverse
+
+    def rollup(self, period: str = 'day',
+               percentiles: Tuple[int, ...] = PERCENTILES) -> Rollup:
+        """Totals per period plus mean and percentiles of its daily totals."""
+        labels, inverse = self.period_index(period)
+        day_totals = self.day_totals()
+        totals = np.bincount(inverse, weights=day_totals,
+                             minlength=len(labels)).astype(np.int64)
+        counts = np.bincount(inverse, minlength=len(labels))
+        mean = totals / np.maximum(counts, 1)
+
+        # Daily totals sorted within each period, one padded row per period
+        order = np.lexsort((day_totals, inverse))
+        firsts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        ranked = day_totals[order]
+        values = {}
+        for pct in percentiles:
+            # Linear interpolation between closest ranks, as np.percentile
+            position = (np.maximum(counts, 1) - 1) * (pct / 100)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            if len(ranked):
+                below = ranked[firsts + low]
+                above = ranked[firsts + high]
+                values[pct] = below + (above - below) * (position - low)
+            else:
+                values[pct] = np.zeros(len(labels))
+        return Rollup(period, labels, totals, counts, mean, values)
+
+    def task_pivot(self, period: str = 'day',
+                   limit: Optional[int] = None) -> Tuple[List[str], List[str], 'np.ndarray']:
+        """
+        (task names, period labels, task x period minutes), tasks ordered by
+        total time and cut to the top `limit`.
+        """
+        labels, inverse = self.period_index(period)
+        by_day = self.pivot()
+        if len(labels):
+            # Days are sorted, so each period is a contiguous run of columns
+            firsts = np.flatnonzero(np.diff(inverse, prepend=-1))
+            matrix = np.add.reduceat(by_day, firsts, axis=1)
+        else:
+            matrix = by_day
+
+        order = np.argsort(-matrix.sum(axis=1), kind='stable')[:limit]
+        return [self.task_names[i] for i in order], labels, matrix[order]
+
+
+def _period_label(period: str, key: int) -> str:
+    """Label for a period key: days since epoch, or months for months."""
+    if period in ('month', 'quarter'):
+        year, month = divmod(key, 12)
+        year += 1970
+        if period == 'quarter':
+            return f"{year}-Q{month // 3 + 1}"
+        return f"{year}-{month + 1:02d}"
+
+    start = np.datetime64(key, 'D').astype(object)
+    if period == 'week':
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    return start.strftime('%Y-%U')
+
+
+def format_heatmap(names: List[str], labels: List[str], matrix,
+                   shades: str = HEATMAP_SHADES, max_width: int = 100) -> str:
+    """
+    A text heatmap, one row per task and one column per period, shaded
+    relative to the busiest cell. When every label fits in `max_width`
+    columns each gets its own column, otherwise cells are one character
+    wide and only the first and last labels are shown.
+    """
+    if not names or not labels:
+        return ""
+    peak = int(matrix.max())
+    levels = len(shades) - 1
+    if peak > 0:
+        index = np.ceil(matrix * (levels / peak)).astype(np.int64)
+    else:
+        index = np.zeros(matrix.shape, dtype=np.int64)
+    cells = np.array(list(shades))[index]
+
+    width = max(len(name) for name in names)
+    cell = max(len(label) for label in labels) + 1
+    if len(labels) * cell > max_width:
+        cell = 1
+        span = len(labels)
+        header = labels[0]
+        if len(labels) > 1 and span >= len(labels[0]) + len(labels[-1]) + 1:
+            header = labels[0] + labels[-1].rjust(span - len(labels[0]))
+    else:
+        header = "".join(label.rjust(cell) for label in labels)
+
+    lines = [" " * (width + 2) + header] + [
+        f"{name:<{width}} |" + "".join(shade * cell for shade in row)
+        for name, row in zip(names, cells)
+    ]
+    lines.append(
+        f"{'':<{width}}  '{shades[1]}' > 0m, '{shades[-1]}' = {peak}m")
+    return "\n".join(lines)
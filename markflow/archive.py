@@ -0,0 +1,451 @@
+# markflow/archive.py
+"""
+Archive - Compacted binary copies of closed years and months.
+
+Past sprints never change once closed, so `--archive` folds every day
+file under a closed year (`root/YYYY/`) or, in the open year, a closed
+month (`root/YYYY/MM/`) into one `archive.mfa` file in that directory.
+An archive holds the days its files add up to - later files win for
+carried-over days, as in any report - as little-endian array columns:
+
+    header   magic, format version, CRC-32 of everything after it
+    strings  offsets + one UTF-8 blob; task names, notes and file names
+    sources  file name id, mtime_ns and size of every day file folded in
+    days     date ordinal and first occurrence of each day
+    columns  task name id, start, duration and first note per occurrence
+    notes    note ids, in occurrence order
+    summary  total minutes and days per task name id
+
+Reading one back is a single sequential read. An archive only stands in
+for its markdown while every source file is still there unchanged and
+no new day file appeared beside them; otherwise the files are parsed
+as usual. The per-task totals only report what `--archive` folded in;
+queries always aggregate the days themselves.
+"""
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date as Date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from markflow.date_range import DateRange
+from markflow.models.time_records import NO_NOTES, DaySummary
+from markflow.summary import SummaryAggregator, TaskTotal
+
+ARCHIVE_VERSION = 1
+ARCHIVE_FILE_NAME = 'archive.mfa'
+MAGIC = b'MFAR'
+
+# magic, version, reserved, CRC-32 of the body
+HEADER = struct.Struct('<4sHHI')
+LENGTH = struct.Struct('<I')
+
+_SWAP = sys.byteorder != 'little'
+
+
+class ArchiveError(ValueError):
+    """An archive file that is not one, is truncated or fails its checksum."""
+
+
+def _column(typecode: str, values: Iterable = ()) -> array:
+    return array(typecode, values)
+
+
+def _write_column(out: bytearray, column: array) -> None:
+    if _SWAP:
+        column = array(column.typecode, column)
+        column.byteswap()
+    out += LENGTH.pack(len(column))
+    out += column.tobytes()
+
+
+class _Reader:
+    """Columns read back in the order they were written."""
+    __slots__ = ('view', 'offset')
+
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.offset = 0
+
+    def column(self, typecode: str) -> array:
+        try:
+            (count,) = LENGTH.unpack_from(self.view, self.offset)
+        except struct.error:
+            raise ArchiveError("truncated archive") from None
+        column = array(typecode)
+        start = self.offset + LENGTH.size
+        end = start + count * column.itemsize
+        if end > len(self.view):
+            raise ArchiveError("truncated archive")
+        column.frombytes(self.view[start:end])
+        if _SWAP:
+            column.byteswap()
+        self.offset = end
+        return column
+
+
+class StringTable:
+    """Interned strings by id, each stored once."""
+    __slots__ = ('strings', 'ids')
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings: List[str] = strings if strings is not None else []
+        self.ids: Dict[str, int] = {s: i for i, s in enumerate(self.strings)}
+
+    def id(self, value: str) -> int:
+        found = self.ids.get(value)
+        if found is None:
+            found = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return found
+
+    def write(self, out: bytearray) -> None:
+        blob = bytearray()
+        offsets = _column('I', [0])
+        for value in self.strings:
+            blob += value.encode('utf-8')
+            offsets.append(len(blob))
+        _write_column(out, offsets)
+        _write_column(out, _column('B', blob))
+
+    @classmethod
+    def read(cls, reader: _Reader) -> 'StringTable':
+        offsets = reader.column('I')
+        blob = reader.column('B').tobytes()
+        strings = [
+            sys.intern(blob[offsets[i]:offsets[i + 1]].decode('utf-8'))
+            for i in range(len(offsets) - 1)
+        ]
+        return cls(strings)
+
+
+Source = Tuple[str, int, int]
+
+
+class Archive:
+    """
+    The days of one closed year or month directory, the day files they
+    came from, and totals per task.
+    """
+    __slots__ = ('path', 'sources', 'days', 'summary')
+
+    def __init__(self, path: Path, sources: List[Source],
+                 days: Dict[str, DaySummary], summary: SummaryAggregator):
+        self.path = path
+        # (file name relative to the archive's directory, mtime_ns, size)
+        self.sources = sources
+        self.days = days
+        self.summary = summary
+
+    @property
+    def directory(self) -> Path:
+        return self.path.parent
+
+    @classmethod
+    def build(cls, root_path: Path, directory: Path, file_paths: List[Path],
+              results: List[Dict[str, DaySummary]]) -> 'Archive':
+        """
+        The archive of `directory` from its day files (oldest first) and
+        their parsed days; later files win for carried-over days. The
+        summary only counts the days dated inside the period, so the
+        summaries of different archives never overlap.
+        """
+        directory = Path(directory)
+        sources = []
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            sources.append((Path(file_path).relative_to(directory).as_posix(),
+                            stat.st_mtime_ns, stat.st_size))
+
+        days: Dict[str, DaySummary] = {}
+        for file_results in results:
+            days.update(file_results)
+        days = dict(sorted(days.items()))
+
+        prefix = period_prefix(root_path, directory)
+        summary = SummaryAggregator()
+        for date_str, day in days.items():
+            if date_str.startswith(prefix):
+                summary.add_day(day)
+        return cls(directory / ARCHIVE_FILE_NAME, sources, days, summary)
+
+    def to_bytes(self) -> bytes:
+        strings = StringTable()
+        body = bytearray()
+
+        source_ids = _column('I', (strings.id(name) for name, _, _ in self.sources))
+        mtimes = _column('q', (mtime for _, mtime, _ in self.sources))
+        sizes = _column('q', (size for _, _, size in self.sources))
+
+        ordinals, day_starts = _column('i'), _column('I', [0])
+        task_ids, starts, durations = _column('I'), _column('h'), _column('h')
+        note_starts, note_ids = _column('I', [0]), _column('I')
+        for date_str, day in self.days.items():
+            ordinals.append(Date.fromisoformat(date_str).toordinal())
+            names = [strings.id(name) for name in day.names]
+            task_ids.extend(names[task_id] for task_id in day.task_ids)
+            starts.extend(day.starts)
+            durations.extend(day.durations)
+            for notes in day.notes:
+                note_ids.extend(strings.id(note) for note in notes)
+                note_starts.append(len(note_ids))
+            day_starts.append(len(task_ids))
+
+        tasks = list(self.summary.tasks.values())
+        summary_ids = _column('I', (strings.id(task.name) for task in tasks))
+        totals = _column('q', (task.total for task in tasks))
+        task_days = _column('I', (task.days for task in tasks))
+
+        strings.write(body)
+        for column in (source_ids, mtimes, sizes, ordinals, day_starts,
+                       task_ids, starts, durations, note_starts, note_ids,
+                       summary_ids, totals, task_days):
+            _write_column(body, column)
+        return HEADER.pack(MAGIC, ARCHIVE_VERSION, 0, zlib.crc32(body)) + body
+
+    @classmethod
+    def from_bytes(cls, path: Path, data: bytes) -> 'Archive':
+        """Decode an archive, raising ArchiveError if it is not valid."""
+        if len(data) < HEADER.size:
+            raise ArchiveError(f"{path} is truncated")
+        magic, version, _, checksum = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ArchiveError(f"{path} is not a markflow archive")
+        if version != ARCHIVE_VERSION:
+            raise ArchiveError(f"{path} has archive version {version}")
+        view = memoryview(data)[HEADER.size:]
+        if zlib.crc32(view) != checksum:
+            raise ArchiveError(f"{path} fails its checksum")
+
+        reader = _Reader(view)
+        strings = StringTable.read(reader).strings
+        source_ids, mtimes, sizes = \
+            reader.column('I'), reader.column('q'), reader.column('q')
+        ordinals, day_starts = reader.column('i'), reader.column('I')
+        task_ids, starts, durations = \
+            reader.column('I'), reader.column('h'), reader.column('h')
+        note_starts, note_ids = reader.column('I'), reader.column('I')
+        summary_ids, totals, task_days = \
+            reader.column('I'), reader.column('q'), reader.column('I')
+
+        sources = [(strings[i], mtime, size)
+                   for i, mtime, size in zip(source_ids, mtimes, sizes)]
+        notes = [
+            tuple(strings[i] for i in note_ids[note_starts[k]:note_starts[k + 1]])
+            or NO_NOTES
+            for k in range(len(task_ids))
+        ]
+        days = {}
+        for k, ordinal in enumerate(ordinals):
+            first, last = day_starts[k], day_starts[k + 1]
+            day = DaySummary(Date.fromordinal(ordinal).isoformat())
+            # Day-local ids in order of first appearance, as `add` assigns them
+            local: Dict[int, int] = {}
+            day.task_ids = array('I', (
+                local.setdefault(task_id, len(local))
+                for task_id in task_ids[first:last]))
+            day.names = [strings[task_id] for task_id in local]
+            day.starts = starts[first:last]
+            day.durations = durations[first:last]
+            day.notes = notes[first:last]
+            days[day.date] = day
+
+        summary = SummaryAggregator()
+        for i, total, count in zip(summary_ids, totals, task_days):
+            task = summary.tasks[strings[i]] = TaskTotal(strings[i], 0)
+            task.total, task.days = total, count
+        return cls(path, sources, days, summary)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['Archive']:
+        """The archive at `path`, None if missing or not readable."""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            return cls.from_bytes(Path(path), data)
+        except (OSError, ArchiveError):
+            return None
+
+    def save(self) -> None:
+        """
+        Write the archive to a temp file beside it, flush it to disk and
+        rename it into place, with the permissions of its day files.
+        """
+        import tempfile
+
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{self.path.stem}.',
+                                        dir=self.path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.to_bytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, self._mode())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        _fsync_directory(self.directory)
+
+    def _mode(self) -> int:
+        """Permission bits of the first source file, else what the umask allows."""
+        for name, _, _ in self.sources:
+            try:
+                return os.stat(self.directory / name).st_mode & 0o777
+            except OSError:
+                pass
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+    def is_current(self, names: Iterable[str]) -> bool:
+        """
+        Whether every source is unchanged and the day files `names`,
+        relative to the archive's directory, were all folded in.
+        """
+        directory = str(self.directory)
+        for name, mtime, size in self.sources:
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except OSError:
+                return False
+            if stat.st_mtime_ns != mtime or stat.st_size != size:
+                return False
+        sources = {name for name, _, _ in self.sources}
+        return all(name in sources for name in names)
+
+    def iter_days(self, date_range: Optional[DateRange] = None):
+        """Days oldest first, only those in `date_range` if given."""
+        for date_str, day in self.days.items():
+            if date_range is None or date_str in date_range:
+                yield day
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Make a rename inside `directory` durable, where the OS allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def period_directory(root_path: Path, file_path: Path,
+                     depth: int) -> Optional[Path]:
+    """The year (depth 1) or month (depth 2) directory of a day file."""
+    root_path = Path(root_path).absolute()
+    parts = Path(file_path).absolute().relative_to(root_path).parts
+    if len(parts) <= depth:
+        return None
+    return root_path.joinpath(*parts[:depth])
+
+
+def period_prefix(root_path: Path, directory: Path) -> str:
+    """'YYYY-' or 'YYYY-MM-', what the dates in a year or month start with."""
+    parts = Path(directory).absolute().relative_to(
+        Path(root_path).absolute()).parts
+    widths = (4, 2)
+    return ''.join(f'{int(part):0{width}d}-'
+                   for part, width in zip(parts, widths))
+
+
+def closed_periods(root_path: Path, file_paths: List[Path],
+                   latest: Path) -> Dict[Path, List[Path]]:
+    """
+    Day files per closed period, oldest first: every year before the one
+    of the `latest` day file, and every month before its month in that
+    year. Sprints can only still change in the latest month.
+    """
+    root_path = Path(root_path).absolute()
+    open_year = period_directory(root_path, latest, 1)
+    open_month = period_directory(root_path, latest, 2)
+    periods: Dict[Path, List[Path]] = {}
+    for file_path in file_paths:
+        directory = period_directory(root_path, file_path, 1)
+        if directory == open_year:
+            directory = period_directory(root_path, file_path, 2)
+            if directory is None or _period_key(directory) >= _period_key(open_month):
+                continue
+        elif directory is None or _period_key(directory) > _period_key(open_year):
+            continue
+        periods.setdefault(directory, []).append(file_path)
+    return periods
+
+
+def _period_key(directory: Path) -> int:
+    return int(directory.name) if directory.name.isdigit() else -1
+
+
+Group = Union[Path, Tuple[Archive, List[Path]]]
+
+
+class ArchiveSet:
+    """
+    The archives of a tracking root, swapped in for the day files they
+    cover when they are current.
+    """
+
+    def __init__(self, root_path: Path):
+        # Absolute: `group` matches it as a prefix of the manifest's paths
+        self.root_path = Path(root_path).absolute()
+        self._loaded: Dict[str, Optional[Archive]] = {}
+
+    def archive(self, directory: str) -> Optional[Archive]:
+        if directory not in self._loaded:
+            path = Path(directory, ARCHIVE_FILE_NAME)
+            self._loaded[directory] = Archive.load(path) \
+                if path.exists() else None
+        return self._loaded[directory]
+
+    def group(self, file_paths: List[Path], partial: bool = True) -> List[Group]:
+        """
+        `file_paths` in order, runs of files covered by a current archive
+        replaced by `(archive, files)`. Without `partial` an archive only
+        stands in for all of its files; with it also for the newest ones,
+        as a `--since` in the middle of the period discovers them - older
+        days then come along and are left to the date range to drop.
+        """
+        # Plain strings: this runs for every day file of the tree
+        root = os.path.join(str(self.root_path), '')
+        covering: List[Optional[str]] = []
+        members: Dict[str, List[str]] = {}
+        for file_path in file_paths:
+            path = str(file_path)
+            found = None
+            if path.startswith(root):
+                parts = path[len(root):].split(os.sep)
+                for depth in (1, 2):
+                    if len(parts) > depth + 1 and \
+                            self.archive(root + os.sep.join(parts[:depth])):
+                        found = root + os.sep.join(parts[:depth])
+                        members.setdefault(found, []).append(
+                            '/'.join(parts[depth:]))
+                        break
+            covering.append(found)
+
+        current = set()
+        for directory, names in members.items():
+            archive = self._loaded[directory]
+            sources = [name for name, _, _ in archive.sources]
+            if (names == sources or partial and names == sources[-len(names):]) \
+                    and archive.is_current(names):
+                current.add(directory)
+
+        groups: List[Group] = []
+        for file_path, directory in zip(file_paths, covering):
+            if directory not in current:
+                groups.append(file_path)
+            elif groups and isinstance(groups[-1], tuple) \
+                    and groups[-1][0] is self._loaded[directory]:
+                groups[-1][1].append(file_path)
+            else:
+                groups.append((self._loaded[directory], [file_path]))
+        return groups
@@ -0,0 +1,179 @@
+# markflow/cache.py
+"""
+Cache - On-disk cache of parsed day data, stored next to the config file.
+
+Entries are keyed on the absolute file path and validated against the
+file's mtime and size. When those change the content hash is compared
+before re-parsing, so touched-but-unchanged files are not parsed again.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from markflow.models.markdown_files import MarkdownFile
+from markflow.models.time_records import DaySummary
+from markflow.parser import iter_day_summaries
+
+CACHE_VERSION = 4
+CACHE_FILE_NAME = 'parse_cache.json'
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a temp file beside `path` and rename it into place."""
+    # tempfile is imported on first use: warm runs never write
+    import tempfile
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{path.stem}.', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def content_hash(data: bytes) -> str:
+    """Hash used to tell whether a file's content really changed."""
+    import hashlib
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_bytes(data: bytes) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse raw file content exactly as if read from disk in text mode,
+    returning the cacheable `{date: DaySummary.to_json()}` form.
+    """
+    markdown = MarkdownFile.from_bytes(data)
+    return {day.date: day.to_json() for day in iter_day_summaries(markdown)}
+
+
+def load_summaries(results: Dict[str, Dict[str, Any]]) -> Dict[str, DaySummary]:
+    """Rebuild `DaySummary` records from cached results."""
+    return {
+        date: DaySummary.from_json(date, data) for date, data in results.items()
+    }
+
+
+def parse_file_entry(file_path: Path) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse a file into a cache entry. Module level so it can run in a
+    worker process.
+    """
+    key = str(Path(file_path).absolute())
+    with open(key, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    return key, {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'lines': data.count(b'\n'),
+        'hash': content_hash(data),
+        'results': parse_bytes(data),
+    }
+
+
+class ParseCache:
+    """Parsed `{date: DaySummary}` results per file, persisted as JSON."""
+
+    def __init__(self, cache_path: Path, entries: Optional[Dict[str, Any]] = None):
+        self.cache_path = cache_path
+        self.entries: Dict[str, Any] = entries if entries is not None else {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    @classmethod
+    def default_path(cls) -> Path:
+        # Imported here so the cache can be used without the config model;
+        # beside config.yaml, wherever $PYTHON_HELPERS_CONFIG puts it
+        from markflow.models.yaml_config import YamlConfig
+        return YamlConfig.get_config_file_path().parent / CACHE_FILE_NAME
+
+    @classmethod
+    def load(cls, cache_path: Optional[Path] = None) -> 'ParseCache':
+        """Load the cache, starting empty if missing, unreadable or outdated."""
+        cache_path = cache_path or cls.default_path()
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(cache_path)
+
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return cls(cache_path)
+        return cls(cache_path, data.get('files', {}))
+
+    def lookup(self, file_path: Path) -> Optional[Dict[str, DaySummary]]:
+        """Return cached results if the file is unchanged, otherwise None."""
+        key = str(Path(file_path).absolute())
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+
+        try:
+            stat = os.stat(key)
+        except FileNotFoundError:  # deleted since it was cached
+            return None
+        if entry['mtime_ns'] == stat.st_mtime_ns \
+                and entry['size'] == stat.st_size:
+            self.hits += 1
+            return load_summaries(entry['results'])
+
+        with open(key, 'rb') as f:
+            digest = content_hash(f.read())
+        if entry['hash'] != digest:
+            return None
+
+        # Touched but not modified
+        entry['mtime_ns'] = stat.st_mtime_ns
+        entry['size'] = stat.st_size
+        self._dirty = True
+        self.hits += 1
+        return load_summaries(entry['results'])
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Store an entry built by `parse_file_entry`."""
+        self.misses += 1
+        self.entries[key] = entry
+        self._dirty = True
+
+    def get(self, file_path: Path) -> Dict[str, DaySummary]:
+        """Return parsed results for a file, parsing only if it changed."""
+        results = self.lookup(file_path)
+        if results is None:
+            key, entry = parse_file_entry(file_path)
+            self.put(key, entry)
+            results = load_summaries(entry['results'])
+        return results
+
+    def prune(self) -> int:
+        """Evict entries for files that no longer exist."""
+        stale = [key for key in self.entries if not os.path.exists(key)]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._dirty = True
+        return len(stale)
+
+    def forget(self, file_paths: Iterable[Path]) -> int:
+        """Evict entries for files read from elsewhere, like an archive."""
+        forgotten = 0
+        for file_path in file_paths:
+            if self.entries.pop(str(Path(file_path).absolute()), None):
+                forgotten += 1
+        if forgotten:
+            self._dirty = True
+        return forgotten
+
+    def save(self) -> None:
+        """Write the cache atomically, only if something changed."""
+        if not self._dirty:
+            return
+
+        write_json_atomic(self.cache_path,
+                          {'version': CACHE_VERSION, 'files': self.entries})
+        self._dirty = False
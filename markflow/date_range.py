@@ -0,0 +1,105 @@
+# markflow/date_range.py
+"""
+Date Range - Which days a report covers, and which parts of the sprint
+tree can possibly hold them.
+
+Day files are named after the day they were created and carry earlier
+days over, so a file never holds a day later than its own name. A sprint
+directory is created in the month (and year) its first day falls in and
+keeps the rest of that week, so a directory only holds days up to a week
+past the end of its month/year.
+"""
+import calendar
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+# How far past the end of its month/year a sprint directory can reach
+SPRINT_OVERHANG = timedelta(days=7)
+
+
+def parse_date(value: str) -> date:
+    """Parse a 'YYYY-MM-DD' or 'YYYYMMDD' date."""
+    return date.fromisoformat(value) if '-' in value \
+        else date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+
+class DateRange:
+    """
+    Inclusive `since`/`until` dates plus an optional sprint filter.
+    Any of them can be None for an open range.
+    """
+    __slots__ = ('since', 'until', 'sprint_year', 'sprint')
+
+    def __init__(self, since: Optional[date] = None, until: Optional[date] = None,
+                 sprint: Optional[int] = None, sprint_year: Optional[int] = None):
+        self.since = since
+        self.until = until
+        self.sprint = sprint
+        self.sprint_year = sprint_year
+
+    @classmethod
+    def from_args(cls, since: Optional[str] = None, until: Optional[str] = None,
+                  month: Optional[str] = None,
+                  sprint: Optional[str] = None) -> Optional['DateRange']:
+        """
+        Build a range from CLI strings, or None when nothing was given.
+
+        `month` is 'YYYY-MM' and narrows since/until to that month.
+        `sprint` is 'WW' (that sprint in any year) or 'YYYY-WW'.
+        """
+        if not any((since, until, month, sprint)):
+            return None
+
+        date_range = cls(parse_date(since) if since else None,
+                         parse_date(until) if until else None)
+
+        if month:
+            year, month_num = map(int, month.split('-'))
+            first = date(year, month_num, 1)
+            last = date(year, month_num,
+                        calendar.monthrange(year, month_num)[1])
+            date_range.since = max(first, date_range.since or first)
+            date_range.until = min(last, date_range.until or last)
+
+        if sprint:
+            year, _, week = sprint.rpartition('-')
+            date_range.sprint = int(week)
+            date_range.sprint_year = int(year) if year else None
+
+        return date_range
+
+    @property
+    def bounds(self) -> Tuple[Optional[str], Optional[str]]:
+        """since/until as ISO strings, as compared against day headers."""
+        return (self.since.isoformat() if self.since else None,
+                self.until.isoformat() if self.until else None)
+
+    def includes_year(self, year: int) -> bool:
+        if self.sprint_year is not None and year != self.sprint_year:
+            return False
+        return self.since is None \
+            or date(year, 12, 31) + SPRINT_OVERHANG >= self.since
+
+    def includes_month(self, year: int, month: int) -> bool:
+        last_day = calendar.monthrange(year, month)[1]
+        return self.since is None \
+            or date(year, month, last_day) + SPRINT_OVERHANG >= self.since
+
+    def includes_sprint(self, sprint: int) -> bool:
+        return self.sprint is None or sprint == self.sprint
+
+    def in_sprint(self, day: date) -> bool:
+        """Whether a day falls in the sprint week (`%U`, as new days use)."""
+        return self.sprint is None or (
+            int(day.strftime('%U')) == self.sprint
+            and (self.sprint_year is None or day.year == self.sprint_year))
+
+    def __contains__(self, date_str: str) -> bool:
+        """Whether an ISO 'YYYY-MM-DD' day is in the since/until range."""
+        since, until = self.bounds
+        return (since is None or date_str >= since) \
+            and (until is None or date_str <= until)
+
+    def __repr__(self):
+        since, until = self.bounds
+        return f"DateRange({since}, {until}, sprint={self.sprint})"
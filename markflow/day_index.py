@@ -0,0 +1,154 @@
+# markflow/day_index.py
+"""
+Day Index - Base for persistent indexes kept up to date one day at a time.
+
+Day files carry earlier days over, so each day is indexed once, from the
+newest file holding it. Files are compared by mtime and size; which days
+a changed file holds comes from its headings alone, and only the days
+whose newest copy changed, moved or disappeared are parsed again.
+
+Subclasses decide what a day contributes through `_add_day` and
+`_remove_day`, and what else they store through `_to_json`.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from markflow.cache import ParseCache, write_json_atomic
+from markflow.models.markdown_files import MarkdownFile
+from markflow.models.time_records import DaySummary
+from markflow.parser import parse_file_summaries
+from markflow.sprint_tree import day_file_key
+
+
+class DayIndex(ABC):
+    """Files of the tree, the day each was indexed from, and subclass data."""
+    VERSION = 1
+    FILE_NAME = 'day_index.json'
+
+    def __init__(self, index_path: Path,
+                 files: Optional[Dict[str, Any]] = None,
+                 days: Optional[Dict[str, Any]] = None):
+        self.index_path = index_path
+        # path -> mtime_ns, size and the dates the file holds
+        self.files: Dict[str, Any] = files if files is not None else {}
+        # date -> the file it was indexed from plus what the subclass keeps
+        self.days: Dict[str, Any] = days if days is not None else {}
+        self._dirty = False
+
+    @classmethod
+    def default_path(cls) -> Path:
+        from markflow.models.yaml_config import YamlConfig
+        return YamlConfig.get_config_file_path().parent / cls.FILE_NAME
+
+    @classmethod
+    def load(cls, index_path: Optional[Path] = None, **kwargs) -> 'DayIndex':
+        """Load the index, starting empty if missing, unreadable or outdated."""
+        index_path = index_path or cls.default_path()
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(index_path, **kwargs)
+
+        if not isinstance(data, dict) or data.get('version') != cls.VERSION:
+            return cls(index_path, **kwargs)
+        return cls._from_json(index_path, data, **kwargs)
+
+    @classmethod
+    def _from_json(cls, index_path: Path, data: Dict[str, Any],
+                   **kwargs) -> 'DayIndex':
+        return cls(index_path, data.get('files', {}), data.get('days', {}),
+                   **kwargs)
+
+    def _to_json(self) -> Dict[str, Any]:
+        return {}
+
+    def update(self, file_paths: Iterable[Path],
+               cache: Optional[ParseCache] = None) -> Tuple[int, int]:
+        """
+        Bring the index up to date with `file_paths`, the whole tree:
+        files missing from it are dropped. Returns the number of files
+        read and of days re-indexed. Cached parses are used when `cache`
+        has them, otherwise only the days to re-index are parsed.
+        """
+        dirty: Set[str] = set()
+        changed: Set[str] = set()
+        keys = [str(Path(p).absolute()) for p in file_paths]
+        for key in keys:
+            stat = os.stat(key)
+            entry = self.files.get(key)
+            if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns \
+                    and entry['size'] == stat.st_size:
+                continue
+            # Which days the file holds comes from its headings alone
+            with MarkdownFile(Path(key)) as markdown:
+                dates = sorted({day.heading.date for day in markdown.days()})
+            if entry is not None:
+                dirty.update(entry['dates'])
+            dirty.update(dates)
+            changed.add(key)
+            self.files[key] = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'dates': dates,
+            }
+
+        wanted = set(keys)
+        for key in [key for key in self.files if key not in wanted]:
+            dirty.update(self.files.pop(key)['dates'])
+
+        # The newest file holding a day is the one it is indexed from
+        owners: Dict[str, str] = {}
+        for key in sorted(self.files, key=day_file_key):
+            for date in self.files[key]['dates']:
+                if date in dirty:
+                    owners[date] = key
+
+        stale: Dict[str, List[str]] = {}
+        for date in sorted(dirty):
+            owner = owners.get(date)
+            old = self.days.get(date)
+            if old is not None and owner == old['file'] \
+                    and owner not in changed:
+                continue
+            if old is not None:
+                del self.days[date]
+                self._remove_day(date, old)
+            if owner is not None:
+                stale.setdefault(owner, []).append(date)
+
+        # Only the days a file is the newest copy of are parsed
+        reindexed = 0
+        for key, dates in stale.items():
+            results = cache.lookup(Path(key)) if cache is not None else None
+            if results is None:
+                results = parse_file_summaries(Path(key), dates[0], dates[-1])
+            for date in dates:
+                if date in results:
+                    self._add_day(date, key, results[date])
+                    reindexed += 1
+
+        if dirty:
+            self._dirty = True
+        return len(changed), reindexed
+
+    @abstractmethod
+    def _remove_day(self, date: str, data: Dict[str, Any]) -> None:
+        """Take back what `data`, the day's stored entry, contributed."""
+
+    @abstractmethod
+    def _add_day(self, date: str, file: str, day: DaySummary) -> None:
+        """Store the day in `days`, with its `file`, and add its data."""
+
+    def save(self) -> None:
+        """Write the index atomically, only if something changed."""
+        if not self._dirty:
+            return
+
+        write_json_atomic(self.index_path, dict(
+            {'version': self.VERSION, 'files': self.files, 'days': self.days},
+            **self._to_json()))
+        self._dirty = False
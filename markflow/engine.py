@@ -0,0 +1,420 @@
+# markflow/engine.py
+"""
+Engine - The discover / parse / aggregate / new-day pipeline as an API.
+
+`time_tracker_parser.py` is a thin command line wrapper over this
+module: what it prints is rendered from the structured results returned
+here, so other tools (a dashboard, a shell prompt) can import markflow
+and ask for days, totals or a new day file in-process.
+
+    engine = Engine.from_config()
+    days = engine.days(date_range=DateRange.from_args(month='2025-06'))
+    for task in engine.summary(days).top(5):
+        print(task.name, task.total)
+    engine.save()
+
+The parse cache and the executor are pluggable: any object with the
+`lookup` / `get` / `put` / `prune` / `save` methods of `ParseCache` can
+stand in for it, or None to always parse, and any
+`concurrent.futures.Executor` can run the parsing. Without one a process
+pool is started when there is more than one file left to parse.
+
+Closed years and months folded into an archive by `Engine.archive` are
+read from it rather than from their markdown while it is current (see
+`markflow.archive`); the open sprint always comes from the day files.
+"""
+import os
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional
+)
+
+from markflow.cache import ParseCache, load_summaries, parse_file_entry
+from markflow.date_range import DateRange, parse_date
+from markflow.models.time_records import DaySummary
+from markflow.parser import (
+    iter_time_tracking_summaries, parse_file_measured, parse_file_summaries
+)
+from markflow.sprint_tree import (
+    SprintManifest, find_latest_day_file, list_day_files
+)
+from markflow.stats import RunStats
+from markflow.summary import SummaryAggregator
+
+if TYPE_CHECKING:  # concurrent.futures pulls in logging, only load it to parse
+    from concurrent.futures import Executor
+
+    from markflow.archive import Archive, ArchiveSet
+
+
+def latest_day_file(root_path: Path, use_manifest: bool = True) -> Path:
+    """
+    The latest sprint day under `root_path`. Years, months, sprints and
+    days are compared by their numeric value. With `use_manifest` the
+    directory listings are cached next to the config file and only re-read
+    when a directory's mtime changes.
+    """
+    if not use_manifest:
+        return find_latest_day_file(root_path)
+
+    manifest = SprintManifest.load(root_path)
+    latest = manifest.latest_day_file()
+    manifest.save()
+    return latest
+
+
+def discover_day_files(root_path: Path, date_range: Optional[DateRange] = None,
+                       use_manifest: bool = True) -> List[Path]:
+    """Day files under `root_path`, oldest first, skipping by path."""
+    if not use_manifest:
+        return list_day_files(root_path, date_range)
+
+    manifest = SprintManifest.load(root_path)
+    day_files = manifest.day_files(date_range)
+    manifest.save()
+    return day_files
+
+
+def parse_files(file_paths: List[Path], cache: Optional[ParseCache] = None,
+                workers: Optional[int] = None,
+                date_range: Optional[DateRange] = None,
+                stats: Optional[RunStats] = None,
+                executor: Optional['Executor'] = None) -> List[Dict[str, DaySummary]]:
+    """
+    Parse many files, in the same order as given.
+    Cache hits are served directly and the rest are parsed on `executor`,
+    or on a pool of worker processes, when there is more than one file
+    left to parse. Without a cache, files are only read as far as the
+    `date_range` needs. Timings of pooled work are the sum over all workers.
+    """
+    stats = stats or RunStats(enabled=False)
+    stats.count('files', len(file_paths))
+
+    parsed: List[Optional[Dict[str, DaySummary]]] = [None] * len(file_paths)
+    pending = []
+    with stats.stage('cache'):
+        for i, file_path in enumerate(file_paths):
+            if cache is not None:
+                parsed[i] = cache.lookup(file_path)
+            if parsed[i] is None:
+                pending.append(i)
+
+    since, until = date_range.bounds if date_range else (None, None)
+    if stats.enabled:
+        parse_file = partial(parse_file_measured, since=since, until=until)
+    else:
+        parse_file = partial(parse_file_summaries, since=since, until=until)
+
+    def parsed_file(i, results):
+        if stats.enabled:
+            results, measured = results
+            stats.add_time('read', measured.pop('read'))
+            stats.add_time('parse', measured.pop('parse'))
+            for name, value in measured.items():
+                stats.count(name, value)
+        parsed[i] = results
+
+    def parse_on(pool: 'Executor', chunksize: int = 1):
+        pending_paths = [file_paths[i] for i in pending]
+        if cache is not None:
+            with stats.stage('parse'):
+                entries = pool.map(parse_file_entry, pending_paths,
+                                   chunksize=chunksize)
+                for i, (key, entry) in zip(pending, entries):
+                    parsed[i] = load_summaries(entry['results'])
+                    cache.put(key, entry)
+        else:
+            for i, results in zip(pending, pool.map(
+                    parse_file, pending_paths, chunksize=chunksize)):
+                parsed_file(i, results)
+
+    workers = workers or os.cpu_count() or 1
+    if executor is not None and len(pending) > 1:
+        parse_on(executor)
+    elif executor is None and workers > 1 and len(pending) > 1:
+        workers = min(workers, len(pending))
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parse_on(pool, max(1, len(pending) // (workers * 4)))
+    else:
+        for i in pending:
+            if cache is not None:
+                with stats.stage('parse'):
+                    parsed[i] = cache.get(file_paths[i])
+            else:
+                parsed_file(i, parse_file(file_paths[i]))
+
+    if stats.enabled and cache is not None:
+        # Files that came from (or went into) the cache
+        for file_path in file_paths:
+            entry = cache.entries.get(str(Path(file_path).absolute()), {})
+            stats.count('bytes', entry.get('size', 0))
+            stats.count('lines', entry.get('lines', 0))
+
+    if date_range is not None:
+        parsed = [
+            {date: day for date, day in results.items() if date in date_range}
+            for results in parsed
+        ]
+    return parsed
+
+
+def sprint_day_filter(tree_files: List[Path],
+                      date_range: DateRange) -> Callable[[str], bool]:
+    """
+    Whether a day belongs to the `--sprint`: it has its own file in the
+    sprint or falls in the sprint's week - not just carried over into it.
+    """
+    sprint_days = {path.stem for path in tree_files}
+    return lambda date: date.replace('-', '') in sprint_days \
+        or date_range.in_sprint(parse_date(date))
+
+
+class NewDay:
+    """The day file `Engine.new_day` created and the one it came from."""
+    __slots__ = ('path', 'previous', 'new_sprint')
+
+    def __init__(self, path: Path, previous: Path, new_sprint: bool):
+        self.path = path
+        self.previous = previous
+        self.new_sprint = new_sprint
+
+    def __repr__(self):
+        return f"NewDay({self.path}, new_sprint={self.new_sprint})"
+
+
+class Engine:
+    """
+    One tracking root with the cache, executor and stats every step of
+    the pipeline shares.
+    """
+
+    def __init__(self, root_path: Optional[Path] = None,
+                 cache: Optional[ParseCache] = None,
+                 executor: Optional['Executor'] = None,
+                 workers: Optional[int] = None,
+                 use_manifest: bool = True,
+                 stats: Optional[RunStats] = None,
+                 use_archive: bool = True,
+                 manifest: Optional[SprintManifest] = None):
+        # Absolute, like the manifest's paths that are matched against it
+        self.root_path = Path(root_path).absolute() \
+            if root_path is not None else None
+        self.cache = cache
+        self.executor = executor
+        self.workers = workers
+        self.use_manifest = use_manifest
+        self.stats = stats or RunStats(enabled=False)
+        self.use_archive = use_archive
+        # Kept in memory by a resident process instead of loaded per call
+        self.manifest = manifest
+        self._archives: Optional['ArchiveSet'] = None
+
+    @classmethod
+    def from_config(cls, root_path: Optional[Path] = None,
+                    use_cache: bool = True, **kwargs) -> 'Engine':
+        """
+        An engine for `root_path`, or the configured tracking root, with
+        the parse cache and sprint manifest unless `use_cache` is off.
+        Raises ValueError for an invalid config file.
+        """
+        if root_path is None:
+            from markflow.models.yaml_config import YamlConfig
+            root_path = YamlConfig.load_config().root_path
+        cache = ParseCache.load() if use_cache else None
+        kwargs.setdefault('use_archive', use_cache)
+        return cls(root_path, cache, use_manifest=use_cache, **kwargs)
+
+    def _root(self) -> Path:
+        if self.root_path is None:
+            raise ValueError("no tracking root directory, pass root_path")
+        return self.root_path
+
+    def discover(self, date_range: Optional[DateRange] = None) -> List[Path]:
+        """Day files of the tree, oldest first, skipping by path."""
+        with self.stats.stage('discovery'):
+            if self.manifest is not None:
+                return self.manifest.day_files(date_range)
+            return discover_day_files(self._root(), date_range,
+                                      self.use_manifest)
+
+    def latest_file(self) -> Path:
+        """The newest day file of the tree."""
+        with self.stats.stage('discovery'):
+            if self.manifest is not None:
+                return self.manifest.latest_day_file()
+            return latest_day_file(self._root(), self.use_manifest)
+
+    def parse(self, file_paths: List[Path],
+              date_range: Optional[DateRange] = None) -> List[Dict[str, DaySummary]]:
+        """`{date: DaySummary}` per file, in the order given."""
+        return parse_files(file_paths, self.cache, self.workers, date_range,
+                           self.stats, self.executor)
+
+    def _groups(self, file_paths: List[Path],
+                date_range: Optional[DateRange] = None) -> List[Any]:
+        """
+        `file_paths` with the runs a current archive covers replaced by
+        `(archive, files)`. A `--sprint` only picks some files of a
+        period, so there archives must cover every file of theirs.
+        """
+        if not self.use_archive or self.root_path is None or not file_paths:
+            return list(file_paths)
+        with self.stats.stage('archive'):
+            if self._archives is None:
+                from markflow.archive import ArchiveSet
+                self._archives = ArchiveSet(self.root_path)
+            groups = self._archives.group(
+                file_paths, date_range is None or date_range.sprint is None)
+        for group in groups:
+            if isinstance(group, tuple):
+                self.stats.count('archived', len(group[1]))
+        return groups
+
+    def _parse_groups(self, groups: List[Any],
+                      date_range: Optional[DateRange]) -> List[Dict[str, DaySummary]]:
+        """`{date: DaySummary}` per file or archive, in order."""
+        paths = [group for group in groups if not isinstance(group, tuple)]
+        parsed = iter(self.parse(paths, date_range))
+        results = []
+        for group in groups:
+            if isinstance(group, tuple):
+                with self.stats.stage('archive'):
+                    results.append({day.date: day
+                                    for day in group[0].iter_days(date_range)})
+            else:
+                results.append(next(parsed))
+        return results
+
+    def days(self, file_paths: Optional[List[Path]] = None,
+             date_range: Optional[DateRange] = None,
+             tree: Optional[bool] = None) -> Dict[str, DaySummary]:
+        """
+        Every day of `file_paths`, or of the whole tree when None. Later
+        files win for carried-over days. Tree files are expected oldest
+        first; their days come back sorted and limited to a `--sprint`'s
+        own days.
+        """
+        if tree is None:
+            tree = file_paths is None
+        if file_paths is None:
+            file_paths = self.discover(date_range)
+
+        if tree:
+            parsed = self._parse_groups(self._groups(file_paths, date_range),
+                                        date_range)
+        else:
+            parsed = self.parse(file_paths, date_range)
+        results: Dict[str, DaySummary] = {}
+        with self.stats.stage('aggregation'):
+            for file_results in parsed:
+                results.update(file_results)
+            if tree:
+                results = dict(sorted(results.items()))
+
+        if tree and date_range is not None and date_range.sprint is not None:
+            in_sprint = sprint_day_filter(file_paths, date_range)
+            results = {
+                date: day for date, day in results.items() if in_sprint(date)
+            }
+        return results
+
+    def iter_days(self, file_paths: Optional[List[Path]] = None,
+                  date_range: Optional[DateRange] = None,
+                  keep: Optional[Callable[[str], bool]] = None) -> Iterator[DaySummary]:
+        """
+        Stream the days of `file_paths` (oldest first, the tree when None)
+        newest day first, one file at a time, skipping carried-over copies
+        and days outside `date_range` or rejected by `keep`.
+        """
+        if file_paths is None:
+            file_paths = self.discover(date_range)
+        since, until = date_range.bounds if date_range else (None, None)
+
+        seen = set()
+        for group in reversed(self._groups(file_paths, date_range)):
+            if isinstance(group, tuple):
+                results: Optional[Dict[str, DaySummary]] = group[0].days
+            else:
+                results = self.cache.lookup(group) \
+                    if self.cache is not None else None
+            if results is not None:
+                days: Iterable[DaySummary] = (
+                    results[date] for date in sorted(results, reverse=True)
+                    if (not since or date >= since)
+                    and (not until or date <= until))
+            else:
+                days = iter_time_tracking_summaries(group, since, until)
+            for day in days:
+                if day.date in seen:
+                    continue
+                seen.add(day.date)
+                if (date_range is None or day.date in date_range) \
+                        and (keep is None or keep(day.date)):
+                    yield day
+
+    def summary(self, days: Dict[str, DaySummary],
+                max_notes: Optional[int] = None) -> SummaryAggregator:
+        """Totals per task across `days`, with up to `max_notes` notes each."""
+        with self.stats.stage('aggregation'):
+            overall = SummaryAggregator(max_notes)
+            for day in days.values():
+                overall.add_day(day)
+        return overall
+
+    def new_day(self, now: Optional[datetime] = None,
+                prune: bool = False) -> NewDay:
+        """
+        Start the day file for `now` from the latest one, in a new sprint
+        directory when the week changed.
+        """
+        from markflow.new_day import new_day_path, write_new_day
+
+        now = now or datetime.now()
+        previous = self.latest_file()
+        path, new_sprint = new_day_path(self._root(), previous, now)
+        with self.stats.stage('new-day'):
+            write_new_day(previous, path, now, prune=prune)
+        return NewDay(path, previous, new_sprint)
+
+    def archive(self) -> List['Archive']:
+        """
+        Fold the day files of every closed year, and of every closed month
+        of the open year, into its archive unless that is still current.
+        A year archive replaces the month archives inside it, and archived
+        files leave the parse cache. Returns the archives written.
+        """
+        from markflow.archive import ARCHIVE_FILE_NAME, Archive, closed_periods
+
+        root_path = self._root()
+        file_paths = self.discover()
+        if not file_paths:
+            return []
+        written = []
+        for directory, files in closed_periods(
+                root_path, file_paths, file_paths[-1]).items():
+            current = Archive.load(directory / ARCHIVE_FILE_NAME)
+            if current is not None and current.is_current(
+                    path.relative_to(directory).as_posix() for path in files):
+                continue
+            archive = Archive.build(root_path, directory, files,
+                                    self.parse(files))
+            with self.stats.stage('archive'):
+                archive.save()
+                if directory.parent == root_path:
+                    for month in directory.glob(f'*/{ARCHIVE_FILE_NAME}'):
+                        month.unlink()
+            if self.cache is not None:
+                self.cache.forget(files)
+            written.append(archive)
+        self._archives = None
+        return written
+
+    def save(self) -> None:
+        """Drop cache entries of deleted files and write the cache."""
+        if self.cache is not None:
+            with self.stats.stage('cache'):
+                self.cache.prune()
+                self.cache.save()
@@ -0,0 +1,109 @@
+# markflow/export.py
+"""
+Export - Stream time occurrences as CSV or JSON Lines.
+
+Days come from `Engine.iter_days` one file at a time and are written out
+as soon as they are parsed, one row per occurrence, so an export of the
+whole history never holds more than a file's days in memory.
+
+Day files carry earlier days over, so files are walked newest first and
+only the first (newest) copy of each day is exported. Rows therefore come
+newest day first - the order the files themselves list days in - and in
+tracked order within a day.
+"""
+import contextlib
+import csv
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+
+from markflow.models.time_records import DaySummary
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+FIELDS = ('date', 'start', 'end', 'duration', 'task', 'notes')
+
+Row = Tuple[str, str, str, int, str, Tuple[str, ...]]
+
+
+def _clock(minutes: int) -> str:
+    minutes %= 24 * 60  # Tasks running past midnight end the next day
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _note_text(note: str) -> str:
+    """A note without its indent and list marker."""
+    note = note.strip()
+    return note[2:] if note[:2] in ('- ', '* ', '+ ') else note
+
+
+def occurrence_rows(days: Iterable[DaySummary]) -> Iterator[Row]:
+    """(date, start, end, duration, task, notes) per occurrence."""
+    for day in days:
+        for occurrence in day.occurrences():
+            yield (day.date, occurrence.time,
+                   _clock(occurrence.start + occurrence.duration),
+                   occurrence.duration, occurrence.name,
+                   tuple(_note_text(note) for note in occurrence.notes))
+
+
+def write_csv(rows: Iterable[Row], out: TextIO) -> int:
+    """Write rows as CSV with a header, notes joined by '; '."""
+    writer = csv.writer(out)
+    writer.writerow(FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow(row[:-1] + ('; '.join(row[-1]),))
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[Row], out: TextIO) -> int:
+    """Write one JSON object per row, notes as a list."""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False))
+        out.write('\n')
+        count += 1
+    return count
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl}
+
+
+@contextlib.contextmanager
+def open_output(path: Optional[str]):
+    """
+    stdout for None or '-', otherwise a temp file beside `path` that is
+    renamed into place once the export completes.
+    """
+    if path is None or path == '-':
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+
+    target = Path(path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f'.{target.name}.', suffix='.tmp', dir=target.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            yield f
+        # mkstemp creates the file private, give it the usual mode
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def export_days(days: Iterable[DaySummary], export_format: str,
+                path: Optional[str] = None) -> int:
+    """Stream `days` to `path` (stdout by default), returning the row count."""
+    writer = WRITERS[export_format]
+    with open_output(path) as out:
+        return writer(occurrence_rows(days), out)
@@ -0,0 +1,243 @@
+# markflow/intervals.py
+"""
+Intervals - Tracked time as absolute, sorted intervals.
+
+Every task runs from its own line to the next one. Here that becomes an
+interval in absolute minutes (days since 0001-01-01 times 1440 plus the
+clock time), so a session running past midnight simply ends on the next
+day instead of needing a +24h correction, and days can be queried
+together.
+
+The last line of a day normally is "Bye", which only marks the end. When
+it is missing the final task has no end; `MISSING_BYE` decides whether
+it is dropped (what the summaries do), runs until midnight, or runs until
+now - capped at midnight for days already over.
+
+An `IntervalIndex` keeps the intervals of a period in start order as
+array columns. Clock windows ("13:00-15:00 every day") and focus blocks
+are then found with binary searches rather than by walking parsed days.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date as Date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from markflow.models.time_records import DaySummary
+from markflow.parser import parse_time
+
+DAY_MINUTES = 24 * 60
+
+MISSING_BYE = ('drop', 'midnight', 'now')
+
+# Tasks that break a focus block, matched case-insensitively in the name
+FOCUS_BREAKS = ('meeting', 'lunch', 'break', 'bye')
+
+Interval = Tuple[str, int, int]
+
+
+def day_start(date_str: str) -> int:
+    """Absolute minute of a day's midnight."""
+    return Date.fromisoformat(date_str).toordinal() * DAY_MINUTES
+
+
+def absolute_minute(when: datetime) -> int:
+    """Absolute minute of a point in time, seconds dropped."""
+    return when.toordinal() * DAY_MINUTES + when.hour * 60 + when.minute
+
+
+def minute_datetime(minute: int) -> datetime:
+    """The point in time of an absolute minute."""
+    days, minute = divmod(minute, DAY_MINUTES)
+    return datetime.fromordinal(days) + timedelta(minutes=minute)
+
+
+def parse_window(value: str) -> Tuple[int, int]:
+    """
+    'HH:MM-HH:MM' as minutes since midnight. An end at or before the
+    start means the window runs past midnight.
+    """
+    start, sep, end = value.partition('-')
+    if not sep:
+        raise ValueError(f"expected HH:MM-HH:MM, got {value!r}")
+    start_minute, end_minute = parse_time(start.strip()), parse_time(end.strip())
+    if end_minute <= start_minute:
+        end_minute += DAY_MINUTES
+    return start_minute, end_minute
+
+
+def task_intervals(date_str: str, tasks: List[Dict[str, Any]],
+                   missing_bye: str = 'drop',
+                   now: Optional[datetime] = None) -> Iterator[Interval]:
+    """
+    `(name, start, end)` of every task line of a day, in absolute
+    minutes. A clock time earlier than the one before it is on the next
+    day. Zero length tasks are skipped.
+    """
+    if missing_bye not in MISSING_BYE:
+        raise ValueError(
+            f"unknown missing Bye policy {missing_bye!r}, "
+            f"expected one of {', '.join(MISSING_BYE)}")
+    base = day_start(date_str)
+    times = []
+    previous = None
+    for task in tasks:
+        minute = parse_time(task['time'])
+        if previous is not None and minute < previous:
+            base += DAY_MINUTES
+        previous = minute
+        times.append(base + minute)
+
+    for i in range(len(tasks) - 1):
+        if times[i + 1] > times[i]:
+            yield tasks[i]['name'], times[i], times[i + 1]
+
+    last = tasks[-1] if tasks else None
+    if last is None or last['name'].lower() == 'bye' or missing_bye == 'drop':
+        return
+    start = times[-1]
+    end = start - start % DAY_MINUTES + DAY_MINUTES
+    if missing_bye == 'now':
+        end = min(end, absolute_minute(now or datetime.now()))
+    if end > start:
+        yield last['name'], start, end
+
+
+def summary_intervals(day: DaySummary) -> Iterator[Interval]:
+    """
+    `(name, start, end)` of a parsed day. Occurrences run back to back,
+    so each starts where the one before ended, midnight or not.
+    """
+    if not day:
+        return
+    start = day_start(day.date) + day.starts[0]
+    for task_id, duration in zip(day.task_ids, day.durations):
+        if duration > 0:
+            yield day.names[task_id], start, start + duration
+        start += duration
+
+
+class IntervalIndex:
+    """
+    Intervals sorted by start: `starts`, `ends` and `task_ids` columns,
+    ids into `names`. `max_length` bounds how far before a point an
+    interval covering it can start.
+    """
+    __slots__ = ('names', 'starts', 'ends', 'task_ids', 'max_length',
+                 '_blocks')
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        ids: Dict[str, int] = {}
+        rows = sorted(
+            (start, end, ids.setdefault(name, len(ids)))
+            for name, start, end in intervals)
+        self.names: List[str] = list(ids)
+        self.starts = array('q', (row[0] for row in rows))
+        self.ends = array('q', (row[1] for row in rows))
+        self.task_ids = array('l', (row[2] for row in rows))
+        self.max_length = max(
+            (end - start for start, end, _ in rows), default=0)
+        self._blocks: Dict[Tuple[str, ...], Tuple[array, array]] = {}
+
+    @classmethod
+    def from_summaries(cls, results: Dict[str, DaySummary]) -> 'IntervalIndex':
+        """From parsed days, which drop a final task without "Bye"."""
+        return cls(interval for day in results.values()
+                   for interval in summary_intervals(day))
+
+    @classmethod
+    def from_tasks(cls, days: Iterable[Tuple[str, List[Dict[str, Any]]]],
+                   missing_bye: str = 'drop',
+                   now: Optional[datetime] = None) -> 'IntervalIndex':
+        """From `(date, task lines)` pairs, applying `missing_bye`."""
+        return cls(interval for date_str, tasks in days
+                   for interval in task_intervals(date_str, tasks,
+                                                  missing_bye, now))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Interval]:
+        for task_id, start, end in zip(self.task_ids, self.starts, self.ends):
+            yield self.names[task_id], start, end
+
+    def matching(self, text: Optional[str]) -> Optional[set]:
+        """Ids of the tasks whose name holds `text`, None for every task."""
+        if not text:
+            return None
+        text = text.lower()
+        return {i for i, name in enumerate(self.names) if text in name.lower()}
+
+    def overlap(self, start: int, end: int,
+                task_ids: Optional[set] = None) -> Dict[int, int]:
+        """Minutes of `[start, end)` per task id, only `task_ids` if given."""
+        totals: Dict[int, int] = {}
+        self._add_overlap(start, end, task_ids, totals)
+        return totals
+
+    def _add_overlap(self, start: int, end: int, task_ids: Optional[set],
+                     totals: Dict[int, int]) -> int:
+        # Intervals covering `start` began at most `max_length` before it
+        first = bisect_left(self.starts, start - self.max_length)
+        last = bisect_left(self.starts, end)
+        starts, ends, ids = self.starts, self.ends, self.task_ids
+        added = 0
+        for i in range(first, last):
+            minutes = min(ends[i], end) - max(starts[i], start)
+            if minutes > 0 and (task_ids is None or ids[i] in task_ids):
+                totals[ids[i]] = totals.get(ids[i], 0) + minutes
+                added += minutes
+        return added
+
+    def window(self, window: Tuple[int, int], since: Date, until: Date,
+               match: Optional[str] = None) -> Tuple[Dict[str, int], int]:
+        """
+        Minutes per task inside the daily clock `window` (from
+        `parse_window`) on every day from `since` to `until`, and the
+        number of days with any. Only tasks holding `match`, if given.
+        """
+        task_ids = self.matching(match)
+        totals: Dict[int, int] = {}
+        days = 0
+        for ordinal in range(since.toordinal(), until.toordinal() + 1):
+            base = ordinal * DAY_MINUTES
+            if self._add_overlap(base + window[0], base + window[1],
+                                 task_ids, totals):
+                days += 1
+        named = {self.names[task_id]: minutes
+                 for task_id, minutes in totals.items()}
+        return named, days
+
+    def focus_blocks(self, breaks: Tuple[str, ...] = FOCUS_BREAKS) -> Tuple[array, array]:
+        """
+        (starts, ends) of the runs of back to back intervals with none of
+        the `breaks` in their task name, in start order.
+        """
+        if breaks in self._blocks:
+            return self._blocks[breaks]
+        lowered = [name.lower() for name in self.names]
+        focus = [not any(word in name for word in breaks) for name in lowered]
+        starts, ends = array('q'), array('q')
+        for task_id, start, end in zip(self.task_ids, self.starts, self.ends):
+            if not focus[task_id]:
+                continue
+            if ends and ends[-1] == start:
+                ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._blocks[breaks] = (starts, ends)
+        return starts, ends
+
+    def longest_focus(self, since: Optional[Date] = None,
+                      until: Optional[Date] = None,
+                      breaks: Tuple[str, ...] = FOCUS_BREAKS) -> Optional[Tuple[int, int]]:
+        """(start, end) of the longest focus block starting in the range."""
+        starts, ends = self.focus_blocks(breaks)
+        first = 0 if since is None else \
+            bisect_left(starts, since.toordinal() * DAY_MINUTES)
+        last = len(starts) if until is None else \
+            bisect_right(starts, (until.toordinal() + 1) * DAY_MINUTES - 1)
+        if first >= last:
+            return None
+        best = max(range(first, last), key=lambda i: ends[i] - starts[i])
+        return starts[best], ends[best]
@@ -1,19 +1,178 @@
-from pathlib import Path
+import mmap
+import os
+import re
 from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+# ATX headings (`## Title`) and `---` rules, matched at a line start
+HEADING_RE = re.compile(
+    rb'(#{1,6})(?:[ \t]+([^\r\n]*?))?[ \t]*\r?$', re.MULTILINE)
+RULE_RE = re.compile(rb'---+[ \t]*\r?$', re.MULTILINE)
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+TASK_LINE_RE = re.compile(r'- \d{2}:\d{2}(?: - )?(.*)')
+LIST_LINE_RE = re.compile(rb'^[ \t]*- [^\r\n]*', re.MULTILINE)
+
+
+def _text(data: Union[bytes, memoryview]) -> str:
+    """Decode like a file opened in text mode, universal newlines and all."""
+    text = str(data, 'utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _line_matches(buffer, pattern: 're.Pattern', first: bytes) -> Iterator['re.Match']:
+    """
+    Matches of `pattern` on lines starting with `first`. Candidates are
+    found with `find`, much faster than a `^` pattern tried at every byte.
+    """
+    marker = b'\n' + first
+    pos = 0
+    if buffer[:len(first)] != first:
+        pos = buffer.find(marker) + 1
+        if not pos:
+            return
+    while True:
+        match = pattern.match(buffer, pos)
+        if match:
+            yield match
+        pos = buffer.find(marker, pos) + 1
+        if not pos:
+            return
+
+
+def _copy_range(source: BinaryIO, target: BinaryIO, buffer,
+                start: int, end: int) -> None:
+    """
+    Append `start:end` of the source file to `target`, inside the kernel
+    with `os.copy_file_range` where the platform has it, otherwise from
+    the mapped buffer.
+    """
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is not None:
+        try:
+            while start < end:
+                copied = copy_file_range(
+                    source.fileno(), target.fileno(), end - start, start)
+                if not copied:
+                    break
+                start += copied
+        except OSError:  # e.g. unsupported by the filesystem
+            pass
+    if start < end:
+        with memoryview(buffer) as view, view[start:end] as part:
+            target.write(part)
+
+
+class Heading:
+    """
+    One heading of a file: `start` is the offset of the `#` line and
+    `body` the offset of the line after it.
+    """
+    __slots__ = ('level', 'title', 'start', 'body')
+
+    def __init__(self, level: int, title: str, start: int, body: int):
+        self.level = level
+        self.title = title
+        self.start = start
+        self.body = body
+
+    @property
+    def date(self) -> Optional[str]:
+        """'YYYY-MM-DD' for `#### YYYY-MM-DD ...` day headings."""
+        if self.level == 4 and DATE_RE.match(self.title):
+            return self.title[:10]
+        return None
+
+    def __repr__(self):
+        return f"Heading({'#' * self.level} {self.title!r} @{self.start})"
 
 
 class MarkdownFile:
+    """
+    A markdown file, memory mapped rather than read into a string.
+
+    Headings and `---` rules are indexed by byte offset on first use, so
+    sections can be handed out as offsets into the one buffer and only
+    the parts a caller asks for are ever decoded.
+
+    `content` is read-only; small edits go through `patch` and the task
+    and checkbox helpers built on it.
+    """
+
     def __init__(self, file_path: Path, *args, **kwargs):
         abs_file_path = file_path.absolute()
         if not abs_file_path.exists():
             raise FileNotFoundError(f"{file_path}")
         self.file_path = abs_file_path
+        self._buffer: Union[bytes, mmap.mmap, None] = None
+        # (mtime_ns, size) of the file when it was mapped
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._reset_index()
+
+    @classmethod
+    def from_bytes(cls, data: bytes,
+                   file_path: Optional[Path] = None) -> 'MarkdownFile':
+        """A file over content already in memory."""
+        markdown = cls.__new__(cls)
+        markdown.file_path = file_path
+        markdown._buffer = data
+        markdown._stamp = None
+        markdown._reset_index()
+        return markdown
 
-        with open(abs_file_path, 'r', encoding="UTF-8") as file:
-            self.__raw_content = file.read()
+    def _reset_index(self) -> None:
+        # Headings found so far and the scan that finds the rest
+        self._headings: List[Heading] = []
+        self._scan: Optional[Iterator[Heading]] = self._scan_headings()
+        self._rules: Optional[List[int]] = None
+        self.__raw_content: Optional[str] = None
+
+    @property
+    def buffer(self) -> Union[bytes, mmap.mmap]:
+        """The raw bytes, mapped on first use."""
+        if self._buffer is None:
+            with open(self.file_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                self._stamp = (stat.st_mtime_ns, stat.st_size)
+                try:
+                    self._buffer = mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # Empty files cannot be mapped
+                    self._buffer = b''
+        return self._buffer
+
+    def close(self) -> None:
+        """Unmap the file. Views from `section.view()` must be released."""
+        if self._stamp is None:
+            return  # content given as bytes
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._buffer = None
+        self._stamp = None
+        self._reset_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """Decoded content between two offsets."""
+        buffer = self.buffer
+        with memoryview(buffer) as view, view[start:end] as part:
+            return _text(part)
 
     # @property
     def _get_content(self):
+        if self.__raw_content is None:
+            self.__raw_content = self.text()
         return self.__raw_content
 
     # @property.setter
@@ -22,7 +181,7 @@ class MarkdownFile:
 
     # @property.deleter
     def _del_content(self):
-        del self.__raw_content
+        self.__raw_content = None
 
     content = property(
         fget=_get_content,
@@ -31,6 +190,237 @@ class MarkdownFile:
         doc="Raw content from Markdown File"
     )
 
+    @property
+    def newline(self) -> bytes:
+        """The line ending used by the first line."""
+        buffer = self.buffer
+        end = buffer.find(b'\n')
+        return b'\r\n' if end > 0 and buffer[end - 1:end] == b'\r' else b'\n'
+
+    def _scan_headings(self) -> Iterator[Heading]:
+        buffer = self.buffer
+        size = len(buffer)
+        for match in _line_matches(buffer, HEADING_RE, b'#'):
+            start, body = match.span()
+            title = match.group(2)
+            yield Heading(
+                len(match.group(1)), title.decode('utf-8') if title else '',
+                start, body + 1 if body < size else body)  # past the newline
+
+    def iter_headings(self) -> Iterator[Heading]:
+        """
+        Headings in order. The file is only indexed as far as they are
+        read, so looking up a section near the top stays cheap.
+        """
+        headings = self._headings
+        i = 0
+        while True:
+            if i == len(headings):
+                if self._scan is None:
+                    return
+                heading = next(self._scan, None)
+                if heading is None:
+                    self._scan = None
+                    return
+                headings.append(heading)
+            yield headings[i]
+            i += 1
+
+    @property
+    def headings(self) -> List[Heading]:
+        """Every heading in the file, in order."""
+        if self._scan is not None:
+            self._headings.extend(self._scan)
+            self._scan = None
+        return self._headings
+
+    @property
+    def rules(self) -> List[int]:
+        """Offsets of the `---` lines."""
+        if self._rules is None:
+            self._rules = [
+                match.start()
+                for match in _line_matches(self.buffer, RULE_RE, b'---')
+            ]
+        return self._rules
+
+    def heading(self, title: str, level: Optional[int] = None,
+                after: int = 0) -> Optional[Heading]:
+        """The first heading with this title (and level) at or after `after`."""
+        for heading in self.iter_headings():
+            if heading.start >= after and heading.title == title and (
+                    level is None or heading.level == level):
+                return heading
+        return None
+
+    def section(self, title: str, level: Optional[int] = None,
+                after: int = 0) -> Optional['MarkdownSection']:
+        """The first section with this title (and level) at or after `after`."""
+        found = None
+        for heading in self.iter_headings():
+            if found is not None:
+                # A section runs up to the next heading of its level or above
+                if heading.level <= found.level:
+                    return MarkdownSection(self, found, heading.start)
+            elif heading.start >= after and heading.title == title and (
+                    level is None or heading.level == level):
+                found = heading
+        if found is not None:
+            return MarkdownSection(self, found, len(self.buffer))
+        return None
+
+    def sections(self, level: Optional[int] = None) -> Iterator['MarkdownSection']:
+        """Every section, or only those of one level."""
+        headings = self.headings
+        for i, heading in enumerate(headings):
+            if level is not None and heading.level != level:
+                continue
+            end = len(self.buffer)
+            for j in range(i + 1, len(headings)):
+                if headings[j].level <= heading.level:
+                    end = headings[j].start
+                    break
+            yield MarkdownSection(self, heading, end)
+
+    def days(self) -> Iterator['MarkdownSection']:
+        """
+        `#### YYYY-MM-DD` sections in file order. A day runs up to the
+        next day or the next `##` heading; other headings and `---` rules
+        inside it are part of the day.
+        """
+        day = None
+        for heading in self.iter_headings():
+            date = heading.date
+            if date is None and heading.level != 2:
+                continue
+            if day is not None:
+                yield MarkdownSection(self, day, heading.start)
+            day = heading if date is not None else None
+        if day is not None:
+            yield MarkdownSection(self, day, len(self.buffer))
+
+    def day(self, date: str) -> Optional['MarkdownSection']:
+        """The `#### date` section, 'YYYY-MM-DD'."""
+        for section in self.days():
+            if section.heading.date == date:
+                return section
+        return None
+
+    def patch(self, start: int, end: int, data: bytes) -> None:
+        """
+        Replace bytes `start:end` of the file with `data`.
+
+        A change at the very end is appended to the file. Anything else
+        is written to a temp file beside it - the untouched head and tail
+        copied by the kernel where possible - and renamed into place. The
+        file is re-mapped and re-indexed on next use.
+        """
+        if self.file_path is None:
+            raise ValueError("Cannot patch content that has no file")
+        buffer = self.buffer
+        size = len(buffer)
+        if not 0 <= start <= end <= size:
+            raise ValueError(f"Bad patch range {start}:{end} of {size} bytes")
+        stat = os.stat(self.file_path)
+        if self._stamp != (stat.st_mtime_ns, stat.st_size):
+            raise RuntimeError(f"{self.file_path} changed since it was read")
+
+        if start == size:
+            with open(self.file_path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self.close()
+            return
+
+        import shutil
+        import tempfile
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f'.{self.file_path.stem}.', suffix='.tmp',
+            dir=self.file_path.parent)
+        try:
+            with open(self.file_path, 'rb') as source, \
+                    os.fdopen(fd, 'wb', buffering=0) as target:
+                _copy_range(source, target, buffer, 0, start)
+                target.write(data)
+                _copy_range(source, target, buffer, end, size)
+                os.fsync(target.fileno())
+            shutil.copymode(self.file_path, tmp_path)
+            self.close()
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _today(self, when: datetime) -> 'MarkdownSection':
+        date = when.strftime('%Y-%m-%d')
+        day = self.day(date)
+        if day is None:
+            raise ValueError(f"No '#### {date}' day in {self.file_path}")
+        return day
+
+    def append_task(self, name: str, when: Optional[datetime] = None,
+                    notes: Sequence[str] = ()) -> None:
+        """
+        Add `- HH:MM - name` (and `  - note` lines) after the last task or
+        note of the day `when` falls on, now by default. A `---` end marker
+        inside the day stays below the new task.
+        """
+        when = when or datetime.now()
+        day = self._today(when)
+        buffer = self.buffer
+        newline = self.newline
+        lines = [f"- {when.strftime('%H:%M')} - {name}"]
+        lines += [f"  - {note}" for note in notes]
+        data = newline.join(line.encode('utf-8') for line in lines)
+
+        last = None
+        for last in LIST_LINE_RE.finditer(
+                buffer, day.body, day.end_marker() or day.end):
+            pass
+        if last is None:
+            # Nothing tracked yet: the task goes right under the heading
+            self.patch(day.body, day.body, newline + data + newline)
+        else:
+            # After the day's last task or note, before its line ending
+            self.patch(last.end(), last.end(), newline + data)
+
+    def end_day(self, when: Optional[datetime] = None) -> None:
+        """Close the day `when` falls on with `- HH:MM - Bye`."""
+        when = when or datetime.now()
+        day = self._today(when)
+        tasks = [
+            match.group(1).strip()
+            for match in map(TASK_LINE_RE.match, day.content.split('\n'))
+            if match
+        ]
+        if tasks and tasks[-1].lower() == 'bye':
+            raise ValueError(f"{day.heading.date} is already closed")
+        self.append_task('Bye', when)
+
+    def tick(self, item: str, section: Optional[str] = None) -> None:
+        """
+        Tick the first open `- [ ] item` checkbox, optionally only within
+        the section with this heading title.
+        """
+        buffer = self.buffer
+        start, end = 0, len(buffer)
+        if section is not None:
+            found = self.section(section)
+            if found is None:
+                raise ValueError(f"No '{section}' section in {self.file_path}")
+            start, end = found.body, found.end
+        checkbox = re.compile(
+            rb'^[ \t]*[-*+] \[( )\][ \t]+' + re.escape(item.encode('utf-8'))
+            + rb'[ \t]*\r?$', re.MULTILINE)
+        match = checkbox.search(buffer, start, end)
+        if match is None:
+            raise ValueError(f"No open item '{item}' in {self.file_path}")
+        self.patch(match.start(1), match.end(1), b'x')
+
+
 # TODO: Make ABC -> Then have Specific sections with specific rules
 # But each section reacts to CLI input - hence ABC
 
@@ -39,20 +429,22 @@ class AbstractMarkdownSection(ABC):
     """
     Abstract class so each section has similar details
 
-    No abstract methods yet...
+    Sections only decode their content when it is asked for.
     """
+    __slots__ = ()
 
-    def _get_content(self):
-        return self.__raw_content
+    @abstractmethod
+    def _get_content(self) -> str:
+        ...
 
     def _set_content(self, value):
         raise Exception("Cannot set value.")
 
     def _del_content(self):
-        del self.__raw_content
+        pass
 
     content = property(
-        fget=_get_content,
+        fget=lambda self: self._get_content(),
         fset=_set_content,
         fdel=_del_content,
         doc="Raw content from Markdown File"
@@ -60,5 +452,46 @@ class AbstractMarkdownSection(ABC):
 
 
 class MarkdownSection(AbstractMarkdownSection):
-    def __init__(self, text: str):
-        self.__raw_content = text
+    """
+    A heading and its body as offsets into the file's buffer: `start` is
+    the heading line, `body` the line after it and `end` where the next
+    section starts.
+    """
+    __slots__ = ('file', 'heading', 'end')
+
+    def __init__(self, file: MarkdownFile, heading: Heading, end: int):
+        self.file = file
+        self.heading = heading
+        self.end = end
+
+    @property
+    def start(self) -> int:
+        return self.heading.start
+
+    @property
+    def body(self) -> int:
+        return self.heading.body
+
+    @property
+    def title(self) -> str:
+        return self.heading.title
+
+    def _get_content(self) -> str:
+        return self.file.text(self.body, self.end)
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the body; release it before closing the file."""
+        return memoryview(self.file.buffer)[self.body:self.end]
+
+    def end_marker(self) -> Optional[int]:
+        """Offset of the first `---` line in the body, if any."""
+        for offset in self.file.rules:
+            if self.body <= offset < self.end:
+                return offset
+        return None
+
+    def __len__(self):
+        return self.end - self.body
+
+    def __repr__(self):
+        return f"MarkdownSection({self.heading!r}, {self.body}:{self.end})"
@@ -0,0 +1,149 @@
+from array import array
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Shared by every occurrence without notes
+NO_NOTES: Tuple[str, ...] = ()
+
+
+class TaskOccurrence:
+    """A single stretch of time spent on a task."""
+    __slots__ = ('name', 'start', 'duration', 'notes')
+
+    def __init__(self, name: str, start: int, duration: int,
+                 notes: Tuple[str, ...] = NO_NOTES):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.notes = notes
+
+    @property
+    def time(self) -> str:
+        """Start as 'HH:MM'."""
+        return f"{self.start // 60:02d}:{self.start % 60:02d}"
+
+    def __repr__(self):
+        return (f"TaskOccurrence({self.name!r}, {self.time}, "
+                f"{self.duration}m, {len(self.notes)} notes)")
+
+
+class DaySummary:
+    """
+    Columnar record of one tracked day.
+
+    Occurrences are stored as parallel `array` columns (task id, start
+    minute, duration) rather than a dict per task. Task names and notes
+    are interned, and each occurrence holds a reference to one tuple of
+    notes that grouped views reuse instead of copying.
+    """
+    __slots__ = ('date', 'names', 'task_ids', 'starts', 'durations', 'notes')
+
+    def __init__(self, date: str):
+        self.date = date
+        self.names: List[str] = []
+        self.task_ids = array('I')
+        self.starts = array('h')
+        self.durations = array('h')
+        self.notes: List[Tuple[str, ...]] = []
+
+    def add(self, name: str, start: int, duration: int,
+            notes: Tuple[str, ...] = NO_NOTES) -> None:
+        """Append an occurrence, interning its name and notes."""
+        name = sys.intern(name)
+        try:
+            task_id = self.names.index(name)
+        except ValueError:
+            task_id = len(self.names)
+            self.names.append(name)
+
+        self.task_ids.append(task_id)
+        self.starts.append(start)
+        self.durations.append(duration)
+        self.notes.append(
+            tuple(sys.intern(note) for note in notes) if notes else NO_NOTES)
+
+    def __len__(self):
+        return len(self.task_ids)
+
+    def __bool__(self):
+        return len(self.task_ids) > 0
+
+    def __iter__(self) -> Iterator[TaskOccurrence]:
+        return self.occurrences()
+
+    def occurrences(self) -> Iterator[TaskOccurrence]:
+        """Occurrences in the order they were tracked."""
+        names = self.names
+        for task_id, start, duration, notes in zip(
+                self.task_ids, self.starts, self.durations, self.notes):
+            yield TaskOccurrence(names[task_id], start, duration, notes)
+
+    def task_totals(self) -> Dict[str, int]:
+        """Total minutes per task, in order of first occurrence."""
+        totals = [0] * len(self.names)
+        for task_id, duration in zip(self.task_ids, self.durations):
+            totals[task_id] += duration
+        return dict(zip(self.names, totals))
+
+    def task_notes(self, name: str) -> Iterator[str]:
+        """Notes of every occurrence of a task, in tracked order."""
+        task_id = self.names.index(name)
+        for occurrence_id, notes in zip(self.task_ids, self.notes):
+            if occurrence_id == task_id:
+                yield from notes
+
+    def notes_by_task(self) -> List[List[str]]:
+        """Every task's notes in tracked order, indexed like `names`."""
+        grouped: List[List[str]] = [[] for _ in self.names]
+        for task_id, notes in zip(self.task_ids, self.notes):
+            if notes:
+                grouped[task_id].extend(notes)
+        return grouped
+
+    @property
+    def total_duration(self) -> int:
+        return sum(self.durations)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The grouped `{task: {...}}` layout returned by `parse_day_tasks`."""
+        grouped = {}
+        for occurrence in self.occurrences():
+            task = grouped.setdefault(occurrence.name, {
+                'total_duration': 0,
+                'notes': [],
+                'occurrences': []
+            })
+            task['total_duration'] += occurrence.duration
+            task['notes'].extend(occurrence.notes)
+            task['occurrences'].append({
+                'time': occurrence.time,
+                'duration': occurrence.duration,
+                'notes': list(occurrence.notes)
+            })
+        return grouped
+
+    def to_json(self) -> Dict[str, Any]:
+        """Plain data for caches - columns become lists."""
+        return {
+            'names': self.names,
+            'task_ids': self.task_ids.tolist(),
+            'starts': self.starts.tolist(),
+            'durations': self.durations.tolist(),
+            'notes': [list(notes) for notes in self.notes],
+        }
+
+    @classmethod
+    def from_json(cls, date: str, data: Dict[str, Any]) -> 'DaySummary':
+        day = cls(date)
+        day.names = [sys.intern(name) for name in data['names']]
+        day.task_ids = array('I', data['task_ids'])
+        day.starts = array('h', data['starts'])
+        day.durations = array('h', data['durations'])
+        day.notes = [
+            tuple(sys.intern(note) for note in notes) if notes else NO_NOTES
+            for notes in data['notes']
+        ]
+        return day
+
+    def __repr__(self):
+        return f"DaySummary({self.date!r}, {len(self)} occurrences)"
@@ -1,43 +1,137 @@
+import json
+import os
 from pathlib import Path
-import yaml
-from typing import Self
+from typing import List, Optional, Self, Tuple
+
+# Point at another config.yaml, or skip the config file entirely
+CONFIG_ENV_VAR = 'PYTHON_HELPERS_CONFIG'
+ROOT_ENV_VAR = 'PYTHON_HELPERS_ROOT'
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FILE_NAME = 'config_snapshot.json'
 
 
 class YamlConfig():
-    def __init__(self, root_path: Path, *args, **kwargs):
+    def __init__(self, root_path: Path,
+                 ticket_patterns: Optional[List[str]] = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.root_path = root_path
+        # Regexes of ticket ids in task names, None for the default
+        self.ticket_patterns = ticket_patterns
 
     @classmethod
-    def load_config(cls) -> dict:
-        """Load config from file, create if it doesn't exist."""
-        config_file = cls.get_config_file_path()
+    def load_config(cls) -> 'YamlConfig':
+        """
+        Load config from file, create if it doesn't exist.
+        $PYTHON_HELPERS_ROOT wins over any file. Otherwise the JSON snapshot
+        beside config.yaml is used while the file's mtime and size match it,
+        so YAML is only parsed after the config has been edited.
+        """
+        root = os.environ.get(ROOT_ENV_VAR)
+        if root:
+            return cls(Path(root).expanduser())
 
-        # Should bubble up exception handling maybe error logging eventually
-        if not config_file.exists():
+        config_file = cls.get_config_file_path()
+        try:
+            stat = config_file.stat()
+        except FileNotFoundError:
+            # Should bubble up exception handling maybe error logging eventually
             print("Config file not found. Creating new configuration...")
-            cls.create_config()
+            return cls.create_config()
+
+        stamp = [str(config_file), stat.st_mtime_ns, stat.st_size]
+        snapshot_path = config_file.parent / SNAPSHOT_FILE_NAME
+        settings = cls._read_snapshot(snapshot_path, stamp)
+        if settings is None:
+            settings = cls._read_config_file(config_file)
+            cls._write_snapshot(snapshot_path, stamp, *settings)
+        root, ticket_patterns = settings
+        return cls(Path(root), ticket_patterns)
+
+    @staticmethod
+    def _read_config_file(config_file: Path) -> Tuple[str, Optional[List[str]]]:
+        """Parse config.yaml and return the validated tracking root and ticket patterns."""
+        import yaml
 
         with open(config_file, 'r') as f:
             config_data = yaml.safe_load(f)
-            return YamlConfig(Path(config_data.get("tracking_root_directory")))
+        root = config_data.get("tracking_root_directory") \
+            if isinstance(config_data, dict) else None
+        if not isinstance(root, str) or not root:
+            raise ValueError(
+                f"{config_file} has no tracking_root_directory, "
+                "run with --config to set it")
+
+        ticket_patterns = config_data.get("ticket_patterns")
+        if isinstance(ticket_patterns, str):
+            ticket_patterns = [ticket_patterns]
+        if ticket_patterns is not None and (
+                not isinstance(ticket_patterns, list)
+                or not all(isinstance(p, str) and p for p in ticket_patterns)):
+            raise ValueError(
+                f"{config_file} ticket_patterns must be a list of regexes")
+        return root, ticket_patterns or None
+
+    @staticmethod
+    def _read_snapshot(snapshot_path: Path,
+                       stamp: list) -> Optional[Tuple[str, Optional[List[str]]]]:
+        try:
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION \
+                or data.get('config') != stamp:
+            return None
+        root = data.get('tracking_root_directory')
+        if not isinstance(root, str) or not root:
+            return None
+        return root, data.get('ticket_patterns')
+
+    @staticmethod
+    def _write_snapshot(snapshot_path: Path, stamp: list, root: str,
+                        ticket_patterns: Optional[List[str]]) -> None:
+        # Only a shortcut - a config dir we can't write to just stays slower
+        from markflow.cache import write_json_atomic
+        try:
+            write_json_atomic(snapshot_path, {
+                'version': SNAPSHOT_VERSION,
+                'config': stamp,
+                'tracking_root_directory': root,
+                'ticket_patterns': ticket_patterns,
+            })
+        except OSError:
+            pass
 
     @staticmethod
     def get_config_file_path() -> Path:
         """Get the path to the config file.
-        If the path does not already exist, it is created. 
-        The final path looks like: $HOME/.config/python-helpers/config.yaml
+        $PYTHON_HELPERS_CONFIG overrides the default location, which looks
+        like: $HOME/.config/python-helpers/config.yaml
 
         Returns:
             Path: location of config.yaml file
         """
-        config_dir = Path.home() / '.config' / 'python-helpers'
-        config_dir.mkdir(parents=True, exist_ok=True)
-        return config_dir / 'config.yaml'
+        override = os.environ.get(CONFIG_ENV_VAR)
+        if override:
+            return Path(override).expanduser()
+        return YamlConfig.get_config_dir() / 'config.yaml'
+
+    @staticmethod
+    def get_config_dir() -> Path:
+        """Get the directory holding the config file and its caches.
+        Nothing is created here, writers create it when they first save.
+
+        Returns:
+            Path: $HOME/.config/python-helpers
+        """
+        return Path.home() / '.config' / 'python-helpers'
 
     @classmethod
     def create_config(cls) -> Self:
         """Create a new config file by prompting the user for the tracking root directory."""
+        import yaml
+
         print("Setting up time tracker configuration...")
 
         while True:
@@ -66,6 +160,7 @@ class YamlConfig():
             yamlConfig = cls(path)
 
             config_file = yamlConfig.get_config_file_path()
+            config_file.parent.mkdir(parents=True, exist_ok=True)
             with open(config_file, 'w') as f:
                 yaml.dump(config, f, default_flow_style=False)
 
@@ -0,0 +1,179 @@
+# markflow/new_day.py
+"""
+New Day - Start a new sprint-day file from the previous one.
+
+The previous file's heading index locates the `### Daily Tracker` anchor.
+The new file gets the new title, the part above the tracker (pruned of
+completed items if asked), the new `#### date` block and then the whole
+tracker history copied straight from the mapped previous file. It is
+written to a temp file next to the target and renamed over it, so a crash
+never leaves a half-written day file behind.
+"""
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from markflow.models.markdown_files import MarkdownFile
+
+DAILY_TRACKER_TITLE = "Daily Tracker"
+DAILY_TASKS_TITLE = "Daily Tasks"
+
+COMPLETED_ITEM_RE = re.compile(r'^(\s*)[-*+] \[[xX]\]')
+# Where the new day goes: a blank line or a `####` heading, at a line start
+INSERT_AT_RE = re.compile(rb'^(?:[ \t\f\v\r]*$|####)', re.MULTILINE)
+
+
+def new_day_block(now: datetime) -> List[str]:
+    """Lines of the new day section."""
+    return [
+        "",  # Empty line before
+        f"#### {now.strftime('%Y-%m-%d')} ({now.strftime('%a')})",
+        "",  # Empty line after
+        f"- {now.strftime('%H:%M')} - Admin"
+    ]
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def prune_completed(lines: Iterable[str], untick: bool = False) -> Iterator[str]:
+    """
+    Drop completed `[x]` items and the lines nested under them, or just
+    untick them when `untick` is set (recurring `## Daily Tasks` items).
+    """
+    skip_indent: Optional[int] = None
+
+    for line in lines:
+        if skip_indent is not None:
+            if line.strip() and _indent(line) > skip_indent:
+                continue
+            skip_indent = None
+
+        completed = COMPLETED_ITEM_RE.match(line)
+        if completed:
+            if untick:
+                start = completed.end() - 3
+                line = f"{line[:start]}[ ]{line[start + 3:]}"
+            else:
+                skip_indent = len(completed.group(1))
+                continue
+
+        yield line
+
+
+def _pruned(source: MarkdownFile, start: int, end: int) -> Iterator[str]:
+    """
+    Lines from `start` to `end` run through `prune_completed`, section by
+    section: items under `## Daily Tasks` are unticked, everywhere else
+    they are dropped. Like `str.split`, a final newline gives a last ''.
+    """
+    bounds = [(start, False)]
+    for heading in source.iter_headings():
+        if heading.start >= end:
+            break
+        if heading.start >= start and heading.level <= 2:
+            if heading.start == start:
+                bounds.pop()
+            bounds.append(
+                (heading.start, heading.level == 2
+                 and heading.title == DAILY_TASKS_TITLE))
+    bounds.append((end, False))
+
+    for (section_start, untick), (section_end, _) in zip(bounds, bounds[1:]):
+        lines = source.text(section_start, section_end).split('\n')
+        if section_end < end:
+            lines.pop()  # the next section starts after the final newline
+        yield from prune_completed(lines, untick)
+
+
+def write_new_day_content(source: MarkdownFile, out: BinaryIO, now: datetime,
+                          prune: bool = False) -> None:
+    """
+    Write the new day file to `out`: the first line becomes the title and
+    the new day block goes after the Daily Tracker heading, ahead of the
+    first blank line or `####` heading. Everything from the tracker on is
+    written straight from views of the previous file, line endings as is.
+    """
+    buffer = source.buffer
+    newline = source.newline
+    out.write(f"# Today {now.strftime('%Y-%m-%d')}".encode())
+
+    title_end = buffer.find(b'\n')
+    if title_end < 0:
+        return
+    body = title_end + 1
+    if buffer[title_end - 1:title_end] == b'\r':
+        title_end -= 1
+
+    tracker = source.heading(DAILY_TRACKER_TITLE, level=3, after=body)
+    kept = tracker.start if tracker is not None else len(buffer)
+    with memoryview(buffer) as view:
+        if prune:
+            for line in _pruned(source, body, kept):
+                out.write(newline + line.encode())
+        else:
+            out.write(view[title_end:kept])
+        if tracker is None:
+            return
+
+        block = newline.join(line.encode() for line in new_day_block(now))
+        insert_at = INSERT_AT_RE.search(buffer, tracker.body)
+        if insert_at is None:
+            out.write(view[kept:])
+            out.write(newline + block)
+        else:
+            out.write(view[kept:insert_at.start()])
+            out.write(block + newline)
+            out.write(view[insert_at.start():])
+
+
+def new_day_path(root_path: Path, latest_path: Path,
+                 now: datetime) -> Tuple[Path, bool]:
+    """
+    Where the day file for `now` goes, and whether it starts a new sprint.
+    The sprint is the `%U` week: the latest file's sprint directory while
+    it is the same week, else `root/YYYY/MM/WW`, which is created.
+    """
+    # WARN: There will come a time in 2026 where week will be 00...
+    new_file_name = f"{now.strftime('%Y%m%d')}.md"
+    sprint = now.strftime("%U")
+
+    # Check if in the same week
+    # Week switches to 00 for new year
+    if latest_path.parts[-2] == sprint or int(sprint) == 0:
+        # Adding to same sprint
+        return latest_path.parent.absolute() / new_file_name, False
+
+    sprint_path = Path(root_path) / now.strftime("%Y") / now.strftime("%m") / sprint
+    sprint_path.mkdir(parents=True, exist_ok=True)
+    return sprint_path / new_file_name, True
+
+
+def write_new_day(source_path: Path, target_path: Path, now: datetime,
+                  prune: bool = False) -> Path:
+    """
+    Write the new day file for `source_path` to `target_path` and
+    atomically move it into place.
+    """
+    target_path = Path(target_path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f'.{target_path.stem}.', suffix='.tmp', dir=target_path.parent)
+    try:
+        with MarkdownFile(Path(source_path)) as source, \
+                os.fdopen(fd, 'wb') as target:
+            write_new_day_content(source, target, now, prune)
+            target.flush()
+            os.fsync(target.fileno())
+        # mkstemp creates the file private, keep the previous day's mode
+        shutil.copymode(source_path, tmp_path)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return target_path
@@ -0,0 +1,284 @@
+# markflow/parser.py
+"""
+Parser - Parsing of the "Daily Tracker" days.
+
+Days are found through the heading index of a `MarkdownFile`, so only the
+`#### YYYY-MM-DD` sections that are wanted are decoded and fed line by
+line to a `DayTaskParser`; days outside a date range are never decoded.
+"""
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from markflow.models.markdown_files import MarkdownFile
+from markflow.models.time_records import DaySummary, TaskOccurrence
+
+TIME_RE = re.compile(r'\d{2}:\d{2}')
+
+
+def parse_time(time_str: str) -> int:
+    """Convert time string like '09:00' to minutes since midnight."""
+    hour, minute = map(int, time_str.split(':'))
+    return hour * 60 + minute
+
+
+class DayTaskParser:
+    """
+    Collects the task lines of one day, fed a line at a time.
+
+    Mirrors the rules of the original slice based parser: leading blank
+    lines and indentation of the first line are ignored, a `- HH:MM` line
+    starts a task and any other `- ` line is a note on the current task.
+    """
+    __slots__ = ('tasks', '_current', '_started', '_last_note')
+
+    def __init__(self):
+        self.tasks: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._started = False
+        self._last_note: Optional[List[str]] = None
+
+    def feed(self, line: str) -> None:
+        if not self._started:
+            line = line.lstrip()
+            if not line:
+                return
+            self._started = True
+        elif not line:
+            return
+
+        stripped = line.strip()
+        if stripped:
+            self._last_note = None
+
+        # Main task line (starts with -)
+        if line.startswith('- '):
+            time_match = TIME_RE.search(line)
+            if time_match:
+                if self._current:
+                    self.tasks.append(self._current)
+
+                task_name = line[time_match.end():].strip()
+                if task_name.startswith('- '):
+                    task_name = task_name[2:]
+
+                self._current = {
+                    'time': time_match.group(),
+                    'name': task_name,
+                    'notes': []
+                }
+                return
+
+        # Sub-bullet point (notes)
+        if stripped.startswith('- ') and self._current:
+            notes = self._current['notes']
+            notes.append(line)
+            self._last_note = notes
+
+    def finish_tasks(self) -> List[Dict[str, Any]]:
+        """Close the day and return the raw task lines."""
+        # Trailing whitespace of the final line is not part of the day
+        if self._last_note:
+            self._last_note[-1] = self._last_note[-1].rstrip()
+        if self._current:
+            self.tasks.append(self._current)
+            self._current = None
+        return self.tasks
+
+    def finish(self) -> Dict[str, Any]:
+        """Close the day and return the tasks grouped by name."""
+        return group_tasks(self.finish_tasks())
+
+    def finish_summary(self, date_str: str) -> DaySummary:
+        """Close the day and return it as a compact `DaySummary`."""
+        self.finish_tasks()
+        return summarize_tasks(date_str, self.tasks)
+
+
+def group_tasks(tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calculate durations and group by task label."""
+    grouped_tasks = {}
+
+    for task, _, duration in task_durations(tasks):
+        # Group by task name
+        task_name = task['name']
+        if task_name not in grouped_tasks:
+            grouped_tasks[task_name] = {
+                'total_duration': 0,
+                'notes': [],
+                'occurrences': []
+            }
+
+        grouped_tasks[task_name]['total_duration'] += duration
+        grouped_tasks[task_name]['notes'].extend(task['notes'])
+        grouped_tasks[task_name]['occurrences'].append({
+            'time': task['time'],
+            'duration': duration,
+            'notes': task['notes']
+        })
+
+    return grouped_tasks
+
+
+def task_durations(tasks: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """
+    Yield `(task, start, duration)` for every task but the last, which
+    only marks the end time ("Bye").
+    """
+    for i in range(len(tasks) - 1):
+        start_time = parse_time(tasks[i]['time'])
+        duration = parse_time(tasks[i + 1]['time']) - start_time
+        if duration < 0:  # Handle day boundary crossing
+            duration += 24 * 60
+        yield tasks[i], start_time, duration
+
+
+def summarize_tasks(date_str: str, tasks: List[Dict[str, Any]]) -> DaySummary:
+    """Build a `DaySummary` from the raw task lines of a day."""
+    day = DaySummary(date_str)
+    for task, start_time, duration in task_durations(tasks):
+        day.add(task['name'], start_time, duration, task['notes'])
+    return day
+
+
+def parse_day_tasks(day_content: str) -> Dict[str, Any]:
+    """Parse tasks for a single day."""
+    day = DayTaskParser()
+    for line in day_content.split('\n'):
+        day.feed(line)
+    return day.finish()
+
+
+def _iter_day_parsers(markdown: MarkdownFile, since: Optional[str] = None,
+                      until: Optional[str] = None) -> Iterator[Tuple[str, DayTaskParser]]:
+    """
+    Yield `(date, parser)` for every `#### YYYY-MM-DD` section of a file,
+    fed with the rest of the heading line and the lines of its body.
+
+    A day ends at the next day heading or at the next `##` section.
+    Days outside `since`/`until` (inclusive ISO dates) are skipped without
+    being decoded, and the scan stops once the headings, in the order they
+    appear (newest first for carried-over files), have moved past the range.
+    """
+    date_str: Optional[str] = None
+    for section in markdown.days():
+        previous, date_str = date_str, section.heading.date
+        if previous is not None and (
+                (since and date_str < previous and date_str < since)
+                or (until and date_str > previous and date_str > until)):
+            return
+        if (since and date_str < since) or (until and date_str > until):
+            continue
+        day = DayTaskParser()
+        day.feed(section.title[10:])
+        for line in section.content.split('\n'):
+            day.feed(line)
+        yield date_str, day
+
+
+def iter_day_sections(markdown: MarkdownFile) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield `(date, tasks)` for every day section that has tracked time."""
+    for date_str, day in _iter_day_parsers(markdown):
+        task_data = day.finish()
+        if task_data:
+            yield date_str, task_data
+
+
+def iter_day_summaries(markdown: MarkdownFile, since: Optional[str] = None,
+                       until: Optional[str] = None) -> Iterator[DaySummary]:
+    """
+    Yield a `DaySummary` for every day section that has tracked time,
+    optionally limited to the inclusive ISO date range `since`/`until`.
+    """
+    for date_str, day in _iter_day_parsers(markdown, since, until):
+        summary = day.finish_summary(date_str)
+        if summary:
+            yield summary
+
+
+def iter_time_tracking_tasks(file_path: Path, since: Optional[str] = None,
+                             until: Optional[str] = None) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Stream `(date, task lines)` for the days of a file, the final line -
+    "Bye" or a task left running - included.
+    """
+    with MarkdownFile(Path(file_path)) as markdown:
+        for date_str, day in _iter_day_parsers(markdown, since, until):
+            tasks = day.finish_tasks()
+            if tasks:
+                yield date_str, tasks
+
+
+def iter_time_tracking_days(file_path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream the days of a time tracking markdown file."""
+    with MarkdownFile(Path(file_path)) as markdown:
+        yield from iter_day_sections(markdown)
+
+
+def iter_time_tracking_summaries(file_path: Path, since: Optional[str] = None,
+                                 until: Optional[str] = None) -> Iterator[DaySummary]:
+    """Stream the days of a time tracking markdown file as `DaySummary`s."""
+    with MarkdownFile(Path(file_path)) as markdown:
+        yield from iter_day_summaries(markdown, since, until)
+
+
+def parse_file_summaries(file_path: Path, since: Optional[str] = None,
+                         until: Optional[str] = None) -> Dict[str, DaySummary]:
+    """Parse a file into `{date: DaySummary}`."""
+    return {
+        day.date: day
+        for day in iter_time_tracking_summaries(file_path, since, until)
+    }
+
+
+def parse_file_measured(file_path: Path, since: Optional[str] = None,
+                        until: Optional[str] = None) -> Tuple[Dict[str, DaySummary], Dict[str, Any]]:
+    """
+    `parse_file_summaries` that reads the whole file first so the time
+    spent reading and parsing can be reported separately, along with the
+    bytes and lines seen.
+    """
+    start = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    read_done = time.perf_counter()
+
+    markdown = MarkdownFile.from_bytes(data, Path(file_path))
+    results = {
+        day.date: day for day in iter_day_summaries(markdown, since, until)
+    }
+    return results, {
+        'read': read_done - start,
+        'parse': time.perf_counter() - read_done,
+        'bytes': len(data),
+        'lines': data.count(b'\n'),
+    }
+
+
+def read_open_day(file_path: Path, date_str: str) -> Tuple[Optional[DaySummary], Optional[TaskOccurrence]]:
+    """
+    Parse only the `#### date_str` section of a file.
+
+    Returns the day's finished occurrences and the task still in progress,
+    i.e. the last task line when it is not "Bye". Only that section is
+    decoded, whatever the size of the history below it.
+    """
+    with MarkdownFile(Path(file_path)) as markdown:
+        for found_date, day in _iter_day_parsers(markdown, date_str, date_str):
+            tasks = day.finish_tasks()
+            summary = summarize_tasks(found_date, tasks)
+
+            current = None
+            if tasks and tasks[-1]['name'].lower() != 'bye':
+                last = tasks[-1]
+                current = TaskOccurrence(
+                    last['name'], parse_time(last['time']), 0,
+                    tuple(last['notes']))
+            return summary, current
+    return None, None
+
+
+def parse_time_tracking_file(file_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Parse a time tracking markdown file and return grouped task data."""
+    return dict(iter_time_tracking_days(file_path))
@@ -0,0 +1,147 @@
+# markflow/search.py
+"""
+Search - Persistent inverted index over task names and notes.
+
+Every token of a task name or note maps to the occurrences mentioning it
+as `[date, occurrence index]` pairs. Day files carry earlier days over,
+so each day is indexed once, from the newest file holding it, and its
+occurrences are stored with the file they came from.
+
+The index is kept as JSON next to the config and updated incrementally
+by `DayIndex`: only the days of new, changed or removed files are
+re-indexed.
+"""
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from markflow.date_range import DateRange, parse_date
+from markflow.day_index import DayIndex
+from markflow.models.time_records import DaySummary, TaskOccurrence
+
+# Words, keeping `TICKET-12345`, `v1.2` and `api/v2` together
+TOKEN_RE = re.compile(r'\w+(?:[-./]\w+)*')
+WORD_RE = re.compile(r'\w+')
+
+Posting = Tuple[str, int]
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Lower-cased tokens, compound ones followed by their parts."""
+    for match in TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        yield token
+        if not token.isalnum():
+            yield from WORD_RE.findall(token)
+
+
+def occurrence_tokens(name: str, notes: Iterable[str]) -> Set[str]:
+    """Every token of a task name and its notes."""
+    tokens = set(tokenize(name))
+    for note in notes:
+        tokens.update(tokenize(note))
+    return tokens
+
+
+class Hit:
+    """One occurrence matching a query, with the file it was indexed from."""
+    __slots__ = ('date', 'file', 'occurrence')
+
+    def __init__(self, date: str, file: str, occurrence: TaskOccurrence):
+        self.date = date
+        self.file = file
+        self.occurrence = occurrence
+
+    def __repr__(self):
+        return f"Hit({self.date}, {self.occurrence!r})"
+
+
+class SearchIndex(DayIndex):
+    """Token -> occurrence postings plus the days they point into."""
+    VERSION = 1
+    FILE_NAME = 'search_index.json'
+
+    def __init__(self, index_path: Path,
+                 files: Optional[Dict[str, Any]] = None,
+                 days: Optional[Dict[str, Any]] = None,
+                 postings: Optional[Dict[str, List[List[Any]]]] = None):
+        # days: date -> the file it was indexed from and `DaySummary.to_json()`
+        super().__init__(index_path, files, days)
+        self.postings: Dict[str, List[List[Any]]] = \
+            postings if postings is not None else {}
+        self._sorted_tokens: Optional[List[str]] = None
+
+    @classmethod
+    def _from_json(cls, index_path: Path,
+                   data: Dict[str, Any]) -> 'SearchIndex':
+        return cls(index_path, data.get('files', {}), data.get('days', {}),
+                   data.get('postings', {}))
+
+    def _to_json(self) -> Dict[str, Any]:
+        return {'postings': self.postings}
+
+    def _remove_day(self, date: str, data: Dict[str, Any]) -> None:
+        self._sorted_tokens = None
+        day = DaySummary.from_json(date, data)
+        tokens = set()
+        for occurrence in day.occurrences():
+            tokens.update(occurrence_tokens(occurrence.name, occurrence.notes))
+        for token in tokens:
+            postings = [p for p in self.postings.get(token, ()) if p[0] != date]
+            if postings:
+                self.postings[token] = postings
+            else:
+                self.postings.pop(token, None)
+
+    def _add_day(self, date: str, file: str, day: DaySummary) -> None:
+        self._sorted_tokens = None
+        self.days[date] = dict(day.to_json(), file=file)
+        for i, occurrence in enumerate(day.occurrences()):
+            for token in occurrence_tokens(occurrence.name, occurrence.notes):
+                self.postings.setdefault(token, []).append([date, i])
+
+    def _matching(self, term: str) -> Set[Posting]:
+        """Postings of one query term; `term*` matches a token prefix."""
+        if term.endswith('*') and len(term) > 1:
+            if self._sorted_tokens is None:
+                self._sorted_tokens = sorted(self.postings)
+            tokens = self._sorted_tokens
+            prefix = term[:-1].lower()
+            found: Set[Posting] = set()
+            i = bisect_left(tokens, prefix)
+            while i < len(tokens) and tokens[i].startswith(prefix):
+                found.update(map(tuple, self.postings[tokens[i]]))
+                i += 1
+            return found
+
+        found = None
+        for match in TOKEN_RE.finditer(term.lower()):
+            postings = set(map(tuple, self.postings.get(match.group(), ())))
+            found = postings if found is None else found & postings
+        return found if found is not None else set()
+
+    def search(self, query: str,
+               date_range: Optional[DateRange] = None) -> List[Hit]:
+        """
+        Occurrences whose name or notes hold every term of `query`,
+        oldest first.
+        """
+        terms = [term for term in query.split() if TOKEN_RE.search(term)]
+        if not terms:
+            return []
+        postings = sorted((self._matching(term) for term in terms), key=len)
+        found = postings[0].intersection(*postings[1:])
+
+        hits = []
+        days: Dict[str, List[TaskOccurrence]] = {}
+        for date, i in sorted(found):
+            if date_range is not None and not (
+                    date in date_range
+                    and date_range.in_sprint(parse_date(date))):
+                continue
+            if date not in days:
+                days[date] = list(
+                    DaySummary.from_json(date, self.days[date]).occurrences())
+            hits.append(Hit(date, self.days[date]['file'], days[date][i]))
+        return hits
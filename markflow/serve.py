@@ -0,0 +1,368 @@
+# markflow/serve.py
+"""
+Serve - Resident query daemon over a Unix domain socket.
+
+`python -m markflow serve` keeps the parsed sprint tree in memory. Every
+day file is parsed once; before each answer only files whose mtime or
+size changed are parsed again, so a query costs a directory check and a
+stat per day file instead of Python start-up, the config and the parse
+cache. A background thread does the same every `--interval` seconds so
+edits are usually parsed before anyone asks.
+
+The protocol is one JSON object per line in each direction:
+
+    -> {"op": "summary", "month": "2025-06", "top": 5}
+    <- {"ok": true, "result": {"days": 21, "tasks": [...]}}
+    <- {"ok": false, "error": "..."}
+
+Operations are `ping`, `days` (a date range, or the latest day file with
+`"latest": true`), `summary` (task totals, `"top"` / `"max_notes"`),
+`search` (`"query"`) and `stop`. Ranges use the `since` / `until` /
+`month` / `sprint` fields of `DateRange.from_args`; `"root"` asks for a
+specific tracking root and is refused when the daemon serves another.
+
+`time_tracker_parser.py` asks the daemon first and parses directly when
+nothing is listening. Only this module's client half is imported there.
+"""
+import json
+import os
+import socket
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from markflow.cache import ParseCache
+    from markflow.engine import Engine
+    from markflow.models.time_records import DaySummary
+
+SOCKET_FILE_NAME = 'markflow.sock'
+
+# Answers come from memory; a daemon slower than this is treated as absent
+CLIENT_TIMEOUT = 5.0
+
+
+class DaemonError(RuntimeError):
+    """The daemon answered a request with an error."""
+
+
+def default_socket_path() -> Path:
+    from markflow.models.yaml_config import YamlConfig
+    return YamlConfig.get_config_file_path().parent / SOCKET_FILE_NAME
+
+
+def query(request: Dict[str, Any], socket_path: Optional[Path] = None,
+          timeout: float = CLIENT_TIMEOUT) -> Optional[Any]:
+    """
+    The daemon's result for `request`, None when no daemon is listening.
+    Raises DaemonError when it answers with an error.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    socket_path = socket_path or default_socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as f:
+                line = f.readline()
+    except OSError:  # no socket, nobody listening, or a stuck daemon
+        return None
+    if not line:
+        return None
+    response = json.loads(line)
+    if not response.get('ok'):
+        raise DaemonError(response.get('error') or 'request failed')
+    return response['result']
+
+
+class ResidentCache:
+    """
+    Parsed days of every file kept in memory in front of a `ParseCache`,
+    validated by mtime and size. Unchanged files are handed out as they
+    are, without decoding anything; callers must not modify them.
+    """
+
+    def __init__(self, cache: Optional['ParseCache'] = None):
+        self.cache = cache
+        # absolute path -> (mtime_ns, size, {date: DaySummary})
+        self.files: Dict[str, Tuple[int, int, Dict[str, 'DaySummary']]] = {}
+
+    @property
+    def entries(self) -> Dict[str, Any]:
+        return self.cache.entries if self.cache is not None else {}
+
+    def lookup(self, file_path: Path) -> Optional[Dict[str, 'DaySummary']]:
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        found = self.files.get(key)
+        if found is not None and found[0] == stat.st_mtime_ns \
+                and found[1] == stat.st_size:
+            return found[2]
+        results = self.cache.lookup(file_path) \
+            if self.cache is not None else None
+        if results is not None:
+            self.files[key] = (stat.st_mtime_ns, stat.st_size, results)
+        return results
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        from markflow.cache import load_summaries
+
+        if self.cache is not None:
+            self.cache.put(key, entry)
+        self.files[os.path.abspath(key)] = (
+            entry['mtime_ns'], entry['size'], load_summaries(entry['results']))
+
+    def get(self, file_path: Path) -> Dict[str, 'DaySummary']:
+        results = self.lookup(file_path)
+        if results is None:
+            from markflow.cache import parse_file_entry
+
+            key, entry = parse_file_entry(file_path)
+            self.put(key, entry)
+            results = self.files[os.path.abspath(key)][2]
+        return results
+
+    def forget(self, file_paths) -> int:
+        file_paths = list(file_paths)
+        for file_path in file_paths:
+            self.files.pop(os.path.abspath(file_path), None)
+        return self.cache.forget(file_paths) if self.cache is not None else 0
+
+    def prune(self) -> int:
+        for key in [key for key in self.files if not os.path.exists(key)]:
+            del self.files[key]
+        return self.cache.prune() if self.cache is not None else 0
+
+    def save(self) -> None:
+        if self.cache is not None:
+            self.cache.save()
+
+
+def _days_json(days: Dict[str, 'DaySummary']) -> Dict[str, Any]:
+    return {date: day.to_json() for date, day in days.items()}
+
+
+def load_days(data: Dict[str, Any]) -> Dict[str, 'DaySummary']:
+    """The days of a `days` answer."""
+    from markflow.models.time_records import DaySummary
+    return {date: DaySummary.from_json(date, day) for date, day in data.items()}
+
+
+def load_hits(data: list) -> list:
+    """The `search.Hit`s of a `search` answer."""
+    from markflow.models.time_records import TaskOccurrence
+    from markflow.search import Hit
+
+    return [
+        Hit(hit['date'], hit['file'], TaskOccurrence(
+            hit['name'], hit['start'], hit['duration'], tuple(hit['notes'])))
+        for hit in data
+    ]
+
+
+class Daemon:
+    """The resident engine and search index behind the socket."""
+
+    def __init__(self, engine: 'Engine', from_config: bool = False):
+        import threading
+
+        self.engine = engine
+        # Started for the configured root: refuse once the config moves on
+        self.from_config = from_config
+        self.lock = threading.Lock()
+        self.search_index = None
+        self.stopping = False
+
+    def refresh(self) -> None:
+        """Parse what changed since the last query and save the caches."""
+        with self.lock:
+            self.engine.days()
+            if self.search_index is not None:
+                self._update_search()
+            self.engine.save()
+
+    def _update_search(self) -> Tuple[int, int, int]:
+        """Files, files changed and days re-indexed of the search index."""
+        from markflow.search import SearchIndex
+
+        if self.search_index is None:
+            self.search_index = SearchIndex.load()
+        file_paths = self.engine.discover()
+        changed, reindexed = self.search_index.update(file_paths,
+                                                      self.engine.cache)
+        if changed:
+            self.search_index.save()
+        return len(file_paths), changed, reindexed
+
+    def _check_root(self, request: Dict[str, Any]) -> None:
+        root = self.engine.root_path.absolute()
+        if request.get('root') is not None:
+            if Path(request['root']).absolute() != root:
+                raise ValueError(f"serving {root}, not {request['root']}")
+        elif self.from_config:
+            from markflow.models.yaml_config import YamlConfig
+            configured = YamlConfig.load_config().root_path
+            if Path(configured).absolute() != root:
+                raise ValueError(
+                    f"serving {root}, the config now points at {configured}")
+
+    def _date_range(self, request: Dict[str, Any]):
+        from markflow.date_range import DateRange
+        return DateRange.from_args(request.get('since'), request.get('until'),
+                                   request.get('month'), request.get('sprint'))
+
+    def _tree_days(self, request: Dict[str, Any]):
+        date_range = self._date_range(request)
+        file_paths = self.engine.discover(date_range)
+        return file_paths, self.engine.days(file_paths, date_range, tree=True)
+
+    def op_ping(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {'root': str(self.engine.root_path), 'pid': os.getpid(),
+                'files': len(self.engine.discover())}
+
+    def op_days(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get('latest'):
+            file_path = self.engine.latest_file()
+            days = self.engine.days([file_path], self._date_range(request))
+            return {'root': str(self.engine.root_path), 'file': str(file_path),
+                    'days': _days_json(days)}
+        file_paths, days = self._tree_days(request)
+        return {'root': str(self.engine.root_path), 'files': len(file_paths),
+                'days': _days_json(days)}
+
+    def op_summary(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        _, days = self._tree_days(request)
+        overall = self.engine.summary(days, request.get('max_notes'))
+        return {'days': len(days), 'tasks': [
+            {'name': task.name, 'total': task.total, 'days': task.days,
+             'notes': list(task.notes)}
+            for task in overall.top(request.get('top'))
+        ]}
+
+    def op_search(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        import time
+
+        files, changed, reindexed = self._update_search()
+        start = time.perf_counter()
+        hits = self.search_index.search(request.get('query') or '',
+                                        self._date_range(request))
+        seconds = time.perf_counter() - start
+        return {
+            'root': str(self.engine.root_path), 'files': files,
+            'changed': changed, 'reindexed': reindexed, 'seconds': seconds,
+            'hits': [
+                {'date': hit.date, 'file': hit.file,
+                 'name': hit.occurrence.name, 'start': hit.occurrence.start,
+                 'duration': hit.occurrence.duration,
+                 'notes': list(hit.occurrence.notes)}
+                for hit in hits
+            ],
+        }
+
+    def op_stop(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.stopping = True
+        return {'pid': os.getpid()}
+
+    def respond(self, line: bytes) -> bytes:
+        """The JSON answer line to one request line."""
+        try:
+            request = json.loads(line)
+            handler = getattr(self, f"op_{request.get('op')}", None) \
+                if isinstance(request, dict) else None
+            if handler is None:
+                raise ValueError(f"unknown request {line[:80]!r}")
+            with self.lock:
+                if request['op'] != 'ping':
+                    self._check_root(request)
+                result = handler(request)
+            response = {'ok': True, 'result': result}
+        except (ValueError, OSError) as e:
+            response = {'ok': False, 'error': str(e)}
+        except Exception as e:  # a malformed field; keep the connection
+            response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        return json.dumps(response, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def serve(root_path: Optional[Path] = None, socket_path: Optional[Path] = None,
+          interval: float = 5.0, workers: Optional[int] = None) -> None:
+    """
+    Answer queries on `socket_path` until stopped, refreshing every
+    `interval` seconds. Raises RuntimeError when a daemon already listens.
+    """
+    import contextlib
+    import signal
+    import socketserver
+    import sys
+    import threading
+
+    from markflow.engine import Engine
+    from markflow.search import SearchIndex
+    from markflow.sprint_tree import SprintManifest
+
+    if not hasattr(socket, 'AF_UNIX'):
+        raise RuntimeError("Unix domain sockets are not available here")
+    socket_path = Path(socket_path or default_socket_path())
+    if query({'op': 'ping'}, socket_path) is not None:
+        raise RuntimeError(f"a daemon is already listening on {socket_path}")
+
+    engine = Engine.from_config(root_path, workers=workers)
+    engine.cache = ResidentCache(engine.cache)
+    engine.manifest = SprintManifest(engine.root_path)
+    daemon = Daemon(engine, from_config=root_path is None)
+    # Keep the search index warm too once it has been built
+    if SearchIndex.default_path().exists():
+        daemon.search_index = SearchIndex.load()
+    daemon.refresh()
+    # Later refreshes parse a few edited files at a time: do that in-process
+    # rather than fork a pool out of a threaded server
+    engine.workers = 1
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                self.wfile.write(daemon.respond(line))
+                self.wfile.flush()
+                if daemon.stopping:
+                    server.shutdown()
+                    return
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        # Editor and shell hooks fire in bursts; the default backlog is 5
+        request_queue_size = 128
+
+    # A crashed daemon leaves its socket file behind
+    if socket_path.exists():
+        socket_path.unlink()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    server = Server(str(socket_path), Handler)
+    os.chmod(socket_path, 0o600)
+
+    stopped = threading.Event()
+
+    def refresh_loop():
+        while not stopped.wait(interval):
+            try:
+                daemon.refresh()
+            except OSError as e:  # a file went away mid-scan, next round
+                print(f"⚠️  Refresh failed: {e}", file=sys.stderr)
+
+    def terminate(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+    threading.Thread(target=refresh_loop, daemon=True).start()
+    print(f"🛰️  Serving {len(engine.discover())} files under {engine.root_path} "
+          f"on {socket_path}, Ctrl+C to stop", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+        with daemon.lock:
+            engine.save()
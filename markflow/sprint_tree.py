@@ -0,0 +1,243 @@
+# markflow/sprint_tree.py
+"""
+Sprint Tree - Discovery of day files under the tracking root.
+
+The tree is laid out as `root/YYYY/MM/WW/YYYYMMDD.md`. Directories are
+listed with `os.scandir` and ordered by their numeric value, so results
+never depend on the order the filesystem happens to return.
+
+`SprintManifest` remembers every directory listing together with the
+directory's mtime. Adding or removing an entry changes the mtime of its
+parent, so a listing is only repeated for directories that changed and
+an unchanged tree costs one `stat` per directory instead of one listing.
+"""
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from markflow.cache import write_json_atomic
+from markflow.date_range import DateRange, parse_date
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE_NAME = 'sprint_manifest.json'
+
+# year / month / sprint directories sit between the root and the day files
+DIR_LEVELS = 3
+
+SortKey = Tuple[int, Union[int, str]]
+
+
+def _dir_key(name: str) -> Optional[int]:
+    """Numeric value of a year/month/sprint directory name."""
+    return int(name) if name.isdigit() else None
+
+
+def _day_key(name: str) -> Optional[SortKey]:
+    """Sort key of a day file name - `YYYYMMDD.md` sorts by date."""
+    if not name.endswith('.md'):
+        return None
+    stem = name[:-3]
+    return (0, int(stem)) if stem.isdigit() else (1, stem)
+
+
+def day_file_key(path: Union[str, Path]) -> Tuple[Any, ...]:
+    """
+    Sort key of a day file path in the order `SprintManifest` lists them:
+    numeric year, month and sprint, then the day file name.
+    """
+    *dirs, name = Path(path).parts[-(DIR_LEVELS + 1):]
+    dir_keys = tuple(-1 if key is None else key for key in map(_dir_key, dirs))
+    return dir_keys + (_day_key(name) or (2, name),)
+
+
+def _scan(path: str, depth: int) -> List[str]:
+    """Names of the interesting children of `path`, sorted by their key."""
+    is_sprint = depth == DIR_LEVELS
+    key_of = _day_key if is_sprint else _dir_key
+
+    with os.scandir(path) as it:
+        children = []
+        for entry in it:
+            key = key_of(entry.name)
+            if key is None:
+                continue
+            if (entry.is_file() if is_sprint else entry.is_dir()):
+                children.append((key, entry.name))
+    children.sort()
+    return [name for _, name in children]
+
+
+def _latest(path: str, depth: int) -> Optional[str]:
+    """Child of `path` with the highest key, without building a listing."""
+    is_sprint = depth == DIR_LEVELS
+    key_of = _day_key if is_sprint else _dir_key
+
+    best_key, best_path = None, None
+    with os.scandir(path) as it:
+        for entry in it:
+            key = key_of(entry.name)
+            if key is None or (best_key is not None and key <= best_key):
+                continue
+            if (entry.is_file() if is_sprint else entry.is_dir()):
+                best_key, best_path = key, entry.path
+    return best_path
+
+
+def find_latest_day_file(root_path: Path) -> Path:
+    """
+    The newest day file, chosen by the numeric year, month, sprint and
+    date at each level rather than by listing order.
+    """
+    path = str(root_path)
+    for depth in range(DIR_LEVELS + 1):
+        latest = _latest(path, depth)
+        if latest is None:
+            raise FileNotFoundError(f"No sprint day files found under {path}")
+        path = latest
+    return Path(path)
+
+
+def _included(date_range: DateRange, parents: List[int], name: str) -> bool:
+    """Whether a directory can hold days on or after the range start."""
+    depth = len(parents)
+    if depth == 0:
+        return date_range.includes_year(int(name))
+    if depth == 1:
+        return date_range.includes_month(parents[0], int(name))
+    return date_range.includes_sprint(int(name))
+
+
+def _file_date(name: str) -> Optional[date]:
+    try:
+        return parse_date(name[:-3])
+    except ValueError:
+        return None
+
+
+def list_day_files(root_path: Path,
+                   date_range: Optional[DateRange] = None) -> List[Path]:
+    """
+    Every day file under the root, oldest first. With a `date_range`
+    directories and files are pruned by path alone.
+    """
+    return SprintManifest(root_path).day_files(date_range)
+
+
+class SprintManifest:
+    """Directory listings of the sprint tree, refreshed by directory mtime."""
+
+    def __init__(self, root_path: Path, manifest_path: Optional[Path] = None,
+                 dirs: Optional[Dict[str, Any]] = None):
+        self.root_path = Path(root_path).absolute()
+        self.manifest_path = manifest_path
+        self.dirs: Dict[str, Any] = dirs if dirs is not None else {}
+        self._dirty = False
+
+    @classmethod
+    def default_path(cls) -> Path:
+        from markflow.models.yaml_config import YamlConfig
+        return YamlConfig.get_config_file_path().parent / MANIFEST_FILE_NAME
+
+    @classmethod
+    def load(cls, root_path: Path,
+             manifest_path: Optional[Path] = None) -> 'SprintManifest':
+        """Load the manifest for `root_path`, starting empty if unusable."""
+        manifest_path = manifest_path or cls.default_path()
+        manifest = cls(root_path, manifest_path)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+
+        if isinstance(data, dict) and data.get('version') == MANIFEST_VERSION \
+                and data.get('root') == str(manifest.root_path):
+            manifest.dirs = data.get('dirs', {})
+        return manifest
+
+    def _children(self, path: str, depth: int) -> List[str]:
+        """Listing of `path`, reused while its mtime is unchanged."""
+        mtime_ns = os.stat(path).st_mtime_ns
+        entry = self.dirs.get(path)
+        if entry and entry['mtime_ns'] == mtime_ns:
+            return entry['children']
+
+        children = _scan(path, depth)
+        self.dirs[path] = {'mtime_ns': mtime_ns, 'children': children}
+        self._dirty = True
+        return children
+
+    def day_files(self, date_range: Optional[DateRange] = None) -> List[Path]:
+        """
+        Every day file under the root, oldest first.
+
+        With a `date_range` directories and files are pruned by path alone.
+        The first file after the range is kept, as it carries over the
+        range's last days when they have no file of their own.
+        """
+        day_files = []
+        seen = set()
+        closed = False
+
+        def walk(path: str, parents: List[int]):
+            nonlocal closed
+            seen.add(path)
+            children = self._children(path, len(parents))
+
+            if len(parents) == DIR_LEVELS:
+                for name in children:
+                    if date_range is not None:
+                        file_date = _file_date(name)
+                        if file_date is None or (
+                                date_range.since and file_date < date_range.since):
+                            continue
+                        if date_range.until and file_date > date_range.until:
+                            closed = True
+                    day_files.append(Path(path, name))
+                    if closed:
+                        return
+                return
+
+            for name in children:
+                if date_range is not None and \
+                        not _included(date_range, parents, name):
+                    continue
+                walk(os.path.join(path, name), parents + [int(name)])
+                if closed:
+                    return
+
+        walk(str(self.root_path), [])
+
+        # Forget directories that are no longer part of the tree
+        if date_range is None:
+            for path in [path for path in self.dirs if path not in seen]:
+                del self.dirs[path]
+                self._dirty = True
+        return day_files
+
+    def latest_day_file(self) -> Path:
+        """
+        The newest day file. Only the directories along the newest
+        year/month/sprint chain are checked.
+        """
+        path = str(self.root_path)
+        for depth in range(DIR_LEVELS + 1):
+            children = self._children(path, depth)
+            if not children:
+                raise FileNotFoundError(
+                    f"No sprint day files found under {path}")
+            path = os.path.join(path, children[-1])
+        return Path(path)
+
+    def save(self) -> None:
+        """Write the manifest atomically, only if something changed."""
+        if not self._dirty or self.manifest_path is None:
+            return
+        write_json_atomic(self.manifest_path, {
+            'version': MANIFEST_VERSION,
+            'root': str(self.root_path),
+            'dirs': self.dirs,
+        })
+        self._dirty = False
@@ -0,0 +1,83 @@
+# markflow/stats.py
+"""
+Stats - Per-stage timings and counters for a single CLI run.
+
+Stages are timed with `with stats.stage('parse'):` and counters bumped
+with `stats.count('files', n)`. A disabled `RunStats` turns both into
+no-ops so call sites never need to check whether profiling is on.
+"""
+import contextlib
+import time
+from typing import Any, ContextManager, Dict, Optional
+
+# Display order - anything else is listed after these
+STAGES = (
+    'startup', 'config', 'daemon', 'discovery', 'cache', 'archive', 'read',
+    'parse', 'aggregation', 'rendering',
+)
+COUNTERS = ('files', 'archived', 'bytes', 'lines', 'days', 'tasks', 'notes')
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+class RunStats:
+    """Accumulated seconds per stage and totals per counter."""
+
+    def __init__(self, enabled: bool = True, started: Optional[float] = None):
+        self.enabled = enabled
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        # perf_counter() of process start, if known, so totals include it
+        self.started = time.perf_counter() if started is None else started
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """Time the enclosed block and add it to `name`."""
+        if not self.enabled:
+            return _NO_STAGE
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def total(self) -> float:
+        """Wall time since the stats were created."""
+        return time.perf_counter() - self.started
+
+    def _ordered(self, values: Dict[str, Any], order: tuple):
+        names = [name for name in order if name in values]
+        names += sorted(name for name in values if name not in order)
+        return [(name, values[name]) for name in names]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'total_seconds': self.total,
+            'stages': dict(self._ordered(self.timings, STAGES)),
+            'counters': dict(self._ordered(self.counters, COUNTERS)),
+        }
+
+    def format_table(self) -> str:
+        total = self.total
+        lines = [f"{'stage':<14}{'ms':>10}{'%':>8}"]
+        for name, seconds in self._ordered(self.timings, STAGES):
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"{name:<14}{seconds * 1000:>10.2f}{share:>7.1f}%")
+        lines.append(f"{'total':<14}{total * 1000:>10.2f}")
+        lines.append("")
+        lines.append(f"{'counter':<14}{'value':>10}")
+        for name, value in self._ordered(self.counters, COUNTERS):
+            lines.append(f"{name:<14}{value:>10}")
+        return "\n".join(lines)
@@ -0,0 +1,111 @@
+# markflow/summary.py
+"""
+Summary - Task totals across many days, bounded by what gets printed.
+
+Only the `--top N` tasks are ever sorted, picked with `heapq.nlargest`,
+and each task keeps at most `--max-notes K` distinct notes - the most
+recent ones - instead of every note of every day it was worked on.
+"""
+import heapq
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from markflow.models.time_records import DaySummary
+
+
+def top_items(totals: Dict[str, int],
+              limit: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    (name, total) pairs, largest first and ties in their original order,
+    cut to `limit` without sorting the rest.
+    """
+    if limit is None or limit >= len(totals):
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return heapq.nlargest(limit, totals.items(), key=lambda item: item[1])
+
+
+class NoteSet:
+    """The `limit` most recent distinct notes, in the order last seen."""
+    __slots__ = ('limit', '_notes')
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        # stripped text -> the note as written
+        self._notes: 'OrderedDict[str, str]' = OrderedDict()
+
+    def update(self, notes: Iterable[str]) -> None:
+        if self.limit <= 0:
+            return
+        for note in notes:
+            key = note.strip()
+            if key in self._notes:
+                self._notes.move_to_end(key)
+            self._notes[key] = note
+            if len(self._notes) > self.limit:
+                self._notes.popitem(last=False)
+
+    def __len__(self):
+        return len(self._notes)
+
+    def __iter__(self):
+        return iter(self._notes.values())
+
+
+def capped_notes(notes: Sequence[str], limit: Optional[int]) -> List[str]:
+    """
+    `notes` deduplicated and cut to the last `limit`, in the order last
+    seen like `NoteSet`; all of them when `limit` is None.
+    """
+    if limit is None:
+        return list(notes)
+    latest: Dict[str, str] = {}
+    for note in reversed(notes):
+        if len(latest) >= limit:
+            break
+        latest.setdefault(note.strip(), note)
+    return list(reversed(latest.values()))
+
+
+class TaskTotal:
+    """One task across every day added to a `SummaryAggregator`."""
+    __slots__ = ('name', 'total', 'days', 'notes')
+
+    def __init__(self, name: str, max_notes: int):
+        self.name = name
+        self.total = 0
+        self.days = 0
+        self.notes = NoteSet(max_notes)
+
+    def __repr__(self):
+        return f"TaskTotal({self.name}, {self.total}m, {self.days} days)"
+
+
+class SummaryAggregator:
+    """Totals, day counts and capped notes per task across days."""
+    __slots__ = ('max_notes', 'tasks')
+
+    def __init__(self, max_notes: Optional[int] = None):
+        # None keeps no notes, the overall summary only lists totals
+        self.max_notes = max_notes or 0
+        self.tasks: Dict[str, TaskTotal] = {}
+
+    def add_day(self, day: DaySummary) -> None:
+        tasks = []
+        for name, duration in day.task_totals().items():
+            task = self.tasks.get(name)
+            if task is None:
+                task = self.tasks[name] = TaskTotal(name, self.max_notes)
+            task.total += duration
+            task.days += 1
+            tasks.append(task)
+        if self.max_notes:
+            for task, notes in zip(tasks, day.notes_by_task()):
+                task.notes.update(notes)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def top(self, limit: Optional[int] = None) -> List[TaskTotal]:
+        """Tasks with the most time first, cut to `limit`."""
+        totals = {name: task.total for name, task in self.tasks.items()}
+        return [self.tasks[name] for name, _ in top_items(totals, limit)]
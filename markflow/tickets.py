@@ -0,0 +1,144 @@
+# markflow/tickets.py
+"""
+Tickets - Materialized per-ticket rollup across every sprint.
+
+Task names are matched against the ticket patterns (`TICKET-12345` by
+default, more through `ticket_patterns` in config.yaml). Each ticket
+keeps its minutes per day, and from them its total, first and last day,
+number of days worked and the sprints it touched, so how long a ticket
+took is a dictionary lookup.
+
+The rollup is kept as JSON next to the config and updated incrementally
+by `DayIndex`: only the days of new, changed or removed files are
+re-counted, and only the tickets on those days are rolled up again.
+"""
+import re
+from datetime import date as Date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+from markflow.cache import ParseCache
+from markflow.day_index import DayIndex
+from markflow.models.time_records import DaySummary
+
+DEFAULT_TICKET_PATTERNS = (r'TICKET-\d+',)
+
+
+def compile_ticket_patterns(patterns: Iterable[str]) -> Pattern[str]:
+    """One regex matching any of `patterns`."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+def sprint_label(date: str) -> str:
+    """'YYYY-WW' of the sprint week (`%U`) a day falls in, as `--sprint` takes."""
+    return Date.fromisoformat(date).strftime('%Y-%U')
+
+
+class TicketTotal:
+    """Time spent on one ticket across the history."""
+    __slots__ = ('ticket', 'total', 'first', 'last', 'days', 'sprints')
+
+    def __init__(self, ticket: str, total: int, first: str, last: str,
+                 days: int, sprints: List[str]):
+        self.ticket = ticket
+        self.total = total
+        self.first = first
+        self.last = last
+        self.days = days
+        self.sprints = sprints
+
+    def __repr__(self):
+        return f"TicketTotal({self.ticket}, {self.total}m, {self.first}..{self.last})"
+
+
+class TicketIndex(DayIndex):
+    """Ticket -> minutes per day and the rollup of them."""
+    VERSION = 1
+    FILE_NAME = 'ticket_index.json'
+
+    def __init__(self, index_path: Path,
+                 files: Optional[Dict[str, Any]] = None,
+                 days: Optional[Dict[str, Any]] = None,
+                 tickets: Optional[Dict[str, Dict[str, Any]]] = None,
+                 patterns: Iterable[str] = DEFAULT_TICKET_PATTERNS):
+        # days: date -> the file it was indexed from and the tickets on it
+        super().__init__(index_path, files, days)
+        self.tickets: Dict[str, Dict[str, Any]] = \
+            tickets if tickets is not None else {}
+        self.patterns = list(patterns)
+        self._ticket_re = compile_ticket_patterns(self.patterns)
+        self._touched: Set[str] = set()
+
+    @classmethod
+    def _from_json(cls, index_path: Path, data: Dict[str, Any],
+                   patterns: Iterable[str] = DEFAULT_TICKET_PATTERNS) -> 'TicketIndex':
+        patterns = list(patterns)
+        # Other patterns find other tickets, so the rollup starts over
+        if data.get('patterns') != patterns:
+            return cls(index_path, patterns=patterns)
+        return cls(index_path, data.get('files', {}), data.get('days', {}),
+                   data.get('tickets', {}), patterns)
+
+    def _to_json(self) -> Dict[str, Any]:
+        return {'patterns': self.patterns, 'tickets': self.tickets}
+
+    def update(self, file_paths: Iterable[Path],
+               cache: Optional[ParseCache] = None) -> Tuple[int, int]:
+        result = super().update(file_paths, cache)
+        for ticket in self._touched:
+            self._roll_up(ticket)
+        self._touched.clear()
+        return result
+
+    def day_tickets(self, day: DaySummary) -> Dict[str, int]:
+        """Minutes per ticket on a day, from the tickets in its task names."""
+        minutes: Dict[str, int] = {}
+        for name, duration in day.task_totals().items():
+            for ticket in {m.group() for m in self._ticket_re.finditer(name)}:
+                minutes[ticket] = minutes.get(ticket, 0) + duration
+        return minutes
+
+    def _remove_day(self, date: str, data: Dict[str, Any]) -> None:
+        for ticket in data['tickets']:
+            entry = self.tickets.get(ticket)
+            if entry is not None:
+                entry['dates'].pop(date, None)
+                self._touched.add(ticket)
+
+    def _add_day(self, date: str, file: str, day: DaySummary) -> None:
+        minutes = self.day_tickets(day)
+        self.days[date] = {'file': file, 'tickets': sorted(minutes)}
+        for ticket, duration in minutes.items():
+            entry = self.tickets.setdefault(ticket, {'dates': {}})
+            entry['dates'][date] = duration
+            self._touched.add(ticket)
+
+    def _roll_up(self, ticket: str) -> None:
+        entry = self.tickets[ticket]
+        dates = entry['dates']
+        if not dates:
+            del self.tickets[ticket]
+            return
+        ordered = sorted(dates)
+        self.tickets[ticket] = {
+            'total': sum(dates.values()),
+            'first': ordered[0],
+            'last': ordered[-1],
+            'days': len(ordered),
+            'sprints': sorted({sprint_label(date) for date in ordered}),
+            'dates': {date: dates[date] for date in ordered},
+        }
+
+    def get(self, ticket: str) -> Optional[TicketTotal]:
+        """The rollup of one ticket, None if it was never worked on."""
+        entry = self.tickets.get(ticket)
+        if entry is None:
+            return None
+        return TicketTotal(ticket, entry['total'], entry['first'],
+                           entry['last'], entry['days'], entry['sprints'])
+
+    def totals(self) -> List[TicketTotal]:
+        """Every ticket, most time first."""
+        totals = [self.get(ticket) for ticket in self.tickets]
+        totals.sort(key=lambda t: (-t.total, t.ticket))
+        return totals
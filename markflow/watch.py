@@ -0,0 +1,62 @@
+# markflow/watch.py
+"""
+Watch - Keep the latest sprint-day file under observation.
+
+The file's mtime is polled and only today's `####` section is re-parsed
+when it changes, so a resident process can show a live total without
+paying start-up, config loading and a full parse on every update.
+"""
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from markflow.models.time_records import DaySummary, TaskOccurrence
+from markflow.parser import read_open_day
+
+DayStatus = Tuple[str, Optional[DaySummary], Optional[TaskOccurrence], int]
+
+
+def day_status(file_path: Path, now: datetime) -> DayStatus:
+    """
+    Today's date, finished occurrences, task in progress and the live
+    total in minutes (finished time plus the running task up to `now`).
+    """
+    date_str = now.strftime('%Y-%m-%d')
+    summary, current = read_open_day(file_path, date_str)
+
+    total = summary.total_duration if summary else 0
+    if current is not None:
+        running = now.hour * 60 + now.minute - current.start
+        if running < 0:  # Started before midnight
+            running += 24 * 60
+        current.duration = running
+        total += running
+    return date_str, summary, current, total
+
+
+def watch_day_file(find_file: Callable[[], Path],
+                   render: Callable[[Path, DayStatus], None],
+                   interval: float = 5.0,
+                   should_stop: Callable[[], bool] = lambda: False) -> None:
+    """
+    Poll the file returned by `find_file` every `interval` seconds and call
+    `render` whenever it changes, when a newer day file appears or when the
+    date rolls over.
+    """
+    last_seen = None
+    while not should_stop():
+        file_path = find_file()
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+
+        now = datetime.now()
+        seen = (file_path, mtime_ns, now.date())
+        if mtime_ns is not None and seen != last_seen:
+            render(file_path, day_status(file_path, now))
+            last_seen = seen
+
+        time.sleep(interval)
@@ -0,0 +1,44 @@
+# tests/conftest.py
+"""Shared fixtures: a generated sprint tree and a private config directory."""
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from benchmarks.generate import generate_sprint_tree
+
+REPO = Path(__file__).resolve().parent.parent
+CLI = REPO / 'time_tracker_parser.py'
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch) -> Path:
+    """$HOME for the test, so caches and manifests never touch the real one."""
+    home = tmp_path / 'home'
+    home.mkdir()
+    monkeypatch.setenv('HOME', str(home))
+    return home
+
+
+@pytest.fixture
+def tree(tmp_path, home, monkeypatch) -> Path:
+    """
+    A year of working days under `tmp_path/root`, the working directory,
+    so `Path('root')` is a relative root. Every month but December is closed.
+    """
+    root = tmp_path / 'root'
+    generate_sprint_tree(root, years=1, tasks_per_day=3, notes_per_task=1,
+                         carry_days=5, start=date(2025, 1, 1))
+    monkeypatch.chdir(tmp_path)
+    return root
+
+
+@pytest.fixture
+def cli(home):
+    """Run time_tracker_parser.py in the current directory and test $HOME."""
+    def run(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, str(CLI), '--no-daemon', *args],
+                              capture_output=True, text=True)
+    return run
@@ -0,0 +1,96 @@
+# tests/test_analytics.py
+"""Rollups and the heatmap over four hand-checked days."""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from markflow.analytics import OccurrenceTable, format_heatmap  # noqa: E402
+
+# date -> (start, task) lines, each day closed with Bye
+DAYS = {
+    '2025-01-31': [('09:00', 'Alpha'), ('10:00', 'Beta'), ('10:30', 'Bye')],
+    '2025-02-03': [('09:00', 'Alpha'), ('11:00', 'Bye')],
+    '2025-02-04': [('09:00', 'Beta'), ('09:45', 'Alpha'), ('10:00', 'Bye')],
+    '2025-04-01': [('13:00', 'Gamma'), ('13:30', 'Bye')],
+}
+# Day totals: 90, 120, 60 and 30 minutes
+# Alpha 60 + 120 + 15 = 195, Beta 30 + 45 = 75, Gamma 30
+
+
+def _day_file(date: str) -> str:
+    lines = [f"# Today {date}", "", "### Daily Tracker", "", f"#### {date}", ""]
+    lines += [f"- {time} - {task}" for time, task in DAYS[date]]
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def days_tree(tmp_path, home, monkeypatch):
+    root = tmp_path / 'root'
+    for date, sprint in (('2025-01-31', '04'), ('2025-02-03', '05'),
+                         ('2025-02-04', '05'), ('2025-04-01', '13')):
+        sprint_dir = root / date[:4] / date[5:7] / sprint
+        sprint_dir.mkdir(parents=True, exist_ok=True)
+        (sprint_dir / f"{date.replace('-', '')}.md").write_text(
+            _day_file(date), encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return root
+
+
+@pytest.fixture
+def table(days_tree):
+    from markflow.engine import Engine
+    return OccurrenceTable.from_summaries(Engine(days_tree, workers=1).days())
+
+
+def _rows(rollup):
+    return [(label, total, days, mean, pcts[50], round(pcts[90], 6))
+            for label, total, days, mean, pcts in rollup.rows()]
+
+
+def test_totals(table):
+    assert list(table.day_totals()) == [90, 120, 60, 30]
+    assert dict(zip(table.task_names, table.task_totals())) \
+        == {'Alpha': 195, 'Beta': 75, 'Gamma': 30}
+
+
+def test_month_and_quarter_rollups(table):
+    # February: days of 120 and 60 minutes; p90 = 60 + 0.9 * 60
+    assert _rows(table.rollup('month')) == [
+        ('2025-01', 90, 1, 90.0, 90.0, 90.0),
+        ('2025-02', 180, 2, 90.0, 90.0, 114.0),
+        ('2025-04', 30, 1, 30.0, 30.0, 30.0),
+    ]
+    # Q1 days sorted 60, 90, 120; p90 sits 0.8 of the way from 90 to 120
+    assert _rows(table.rollup('quarter')) == [
+        ('2025-Q1', 270, 3, 90.0, 90.0, 114.0),
+        ('2025-Q2', 30, 1, 30.0, 30.0, 30.0),
+    ]
+
+
+def test_week_and_sprint_labels(table):
+    # ISO weeks start on Monday, %U sprints on the Sunday before
+    assert table.rollup('week').labels == ['2025-W05', '2025-W06', '2025-W14']
+    assert table.rollup('sprint').labels == ['2025-04', '2025-05', '2025-13']
+    assert list(table.rollup('day').totals) == [90, 120, 60, 30]
+
+
+def test_heatmap(table):
+    names, labels, matrix = table.task_pivot('month', limit=2)
+    assert names == ['Alpha', 'Beta']
+    assert labels == ['2025-01', '2025-02', '2025-04']
+    assert matrix.tolist() == [[60, 135, 0], [30, 45, 0]]
+    # Shade index is ceil(minutes * 9 / 135): 60 -> 4, 30 -> 2, 45 -> 3
+    assert format_heatmap(names, labels, matrix).split('\n') == [
+        '        2025-01 2025-02 2025-04',
+        'Alpha |========@@@@@@@@        ',
+        'Beta  |::::::::--------        ',
+        "       '.' > 0m, '@' = 135m",
+    ]
+
+
+def test_cli_rollup(days_tree, cli):
+    result = cli('--root', 'root', '--rollup', 'month', '--heatmap')
+    assert result.returncode == 0, result.stderr
+    assert f"{'2025-02':<12}{'3h':>10}{2:>6}{'1h 30m':>10}{'1h 30m':>10}" \
+        f"{'1h 54m':>10}" in result.stdout
+    assert 'Alpha |========@@@@@@@@' in result.stdout
@@ -0,0 +1,76 @@
+# tests/test_archive.py
+"""Archives of closed periods stand in for their day files, unchanged output."""
+import os
+import stat
+from pathlib import Path
+
+from markflow.archive import ARCHIVE_FILE_NAME, Archive
+from markflow.engine import Engine
+from markflow.stats import RunStats
+
+
+def _report(output: str) -> str:
+    """CLI output without the lines that name the root."""
+    return '\n'.join(line for line in output.splitlines()
+                     if not line.startswith('📂'))
+
+
+def _as_json(days) -> dict:
+    return {date: day.to_json() for date, day in days.items()}
+
+
+def test_archive_with_relative_root(tree, cli):
+    result = cli('--root', 'root', '--archive')
+    assert result.returncode == 0, result.stderr
+    assert (tree / '2025' / '01' / ARCHIVE_FILE_NAME).exists()
+    assert (tree / '2025' / '11' / ARCHIVE_FILE_NAME).exists()
+    # The open month is never archived
+    assert not (tree / '2025' / '12' / ARCHIVE_FILE_NAME).exists()
+
+
+def test_relative_root_reads_archives(tree, cli):
+    plain = cli('--root', 'root', '--summary', '--no-cache')
+    assert cli('--root', 'root', '--archive').returncode == 0
+
+    stats = RunStats()
+    engine = Engine(Path('root'), stats=stats)
+    days = engine.days()
+    assert stats.counters.get('archived', 0) > 0
+    assert _as_json(days) \
+        == _as_json(Engine(Path('root'), use_archive=False).days())
+
+    archived = cli('--root', 'root', '--summary', '--profile')
+    assert 'archived' in archived.stderr
+    assert _report(archived.stdout) == _report(plain.stdout)
+
+
+def test_changed_file_falls_back_to_markdown(tree, cli):
+    assert cli('--root', 'root', '--archive').returncode == 0
+    day_file = next((tree / '2025' / '03').glob('*/*.md'))
+    day_file.write_text(day_file.read_text(encoding='utf-8') + '\n',
+                        encoding='utf-8')
+
+    stats = RunStats()
+    days = Engine(Path('root'), stats=stats).days()
+    assert _as_json(days) \
+        == _as_json(Engine(Path('root'), use_archive=False).days())
+    assert stats.counters['archived'] < len(Engine(Path('root')).discover())
+
+
+def test_saved_archive_mode_and_contents(tree):
+    old_umask = os.umask(0o022)
+    try:
+        engine = Engine(Path('root'))
+        written = engine.archive()
+    finally:
+        os.umask(old_umask)
+    assert written
+
+    archive = written[0]
+    source = archive.directory / archive.sources[0][0]
+    assert stat.S_IMODE(archive.path.stat().st_mode) \
+        == stat.S_IMODE(source.stat().st_mode)
+    loaded = Archive.load(archive.path)
+    assert loaded is not None
+    assert _as_json(loaded.days) == _as_json(archive.days)
+    assert loaded.sources == archive.sources
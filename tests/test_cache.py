@@ -0,0 +1,90 @@
+# tests/test_cache.py
+"""The parse cache trusts mtime and size, then the content hash."""
+import json
+import os
+
+from markflow.cache import CACHE_FILE_NAME, ParseCache
+from markflow.search import SearchIndex
+from markflow.serve import SOCKET_FILE_NAME, default_socket_path
+from markflow.sprint_tree import MANIFEST_FILE_NAME, SprintManifest
+
+DAY = """### Daily Tracker
+
+#### 2025-06-27 (Fr)
+
+- 09:00 - {task}
+- 10:30 - Bye
+"""
+
+
+def _write(path, task='TICKET-1'):
+    path.write_text(DAY.format(task=task), encoding='utf-8')
+
+
+def test_round_trip_through_disk(tmp_path):
+    day_file = tmp_path / '20250627.md'
+    _write(day_file)
+    cache = ParseCache(tmp_path / CACHE_FILE_NAME)
+    assert cache.lookup(day_file) is None
+    assert cache.get(day_file)['2025-06-27'].task_totals() == {'TICKET-1': 90}
+    cache.save()
+
+    loaded = ParseCache.load(tmp_path / CACHE_FILE_NAME)
+    assert loaded.lookup(day_file)['2025-06-27'].task_totals() == {'TICKET-1': 90}
+    assert (loaded.hits, loaded.misses) == (1, 0)
+
+
+def test_touched_file_is_checked_by_hash(tmp_path):
+    day_file = tmp_path / '20250627.md'
+    _write(day_file)
+    cache = ParseCache(tmp_path / CACHE_FILE_NAME)
+    cache.get(day_file)
+    cache.save()
+
+    stat = day_file.stat()
+    os.utime(day_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.lookup(day_file) is not None
+    # The new mtime is remembered, so the next lookup skips the hash
+    entry = cache.entries[str(day_file.absolute())]
+    assert entry['mtime_ns'] == day_file.stat().st_mtime_ns
+
+    # Same size, different content
+    _write(day_file, task='TICKET-2')
+    os.utime(day_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert day_file.stat().st_size == entry['size']
+    assert cache.lookup(day_file) is None
+    assert cache.get(day_file)['2025-06-27'].task_totals() == {'TICKET-2': 90}
+
+
+def test_deleted_file(tmp_path):
+    day_file = tmp_path / '20250627.md'
+    _write(day_file)
+    cache = ParseCache(tmp_path / CACHE_FILE_NAME)
+    cache.get(day_file)
+    day_file.unlink()
+
+    assert cache.lookup(day_file) is None
+    assert cache.prune() == 1
+    assert cache.entries == {}
+
+
+def test_other_versions_start_empty(tmp_path):
+    cache_path = tmp_path / CACHE_FILE_NAME
+    cache_path.write_text(json.dumps({'version': -1, 'files': {'x': {}}}),
+                          encoding='utf-8')
+    assert ParseCache.load(cache_path).entries == {}
+    cache_path.write_text('not json', encoding='utf-8')
+    assert ParseCache.load(cache_path).entries == {}
+
+
+def test_caches_and_socket_live_beside_the_config_override(tmp_path, home, monkeypatch):
+    config_dir = tmp_path / 'elsewhere'
+    monkeypatch.setenv('PYTHON_HELPERS_CONFIG', str(config_dir / 'config.yaml'))
+    assert ParseCache.default_path() == config_dir / CACHE_FILE_NAME
+    assert SprintManifest.default_path() == config_dir / MANIFEST_FILE_NAME
+    assert SearchIndex.default_path() == config_dir / SearchIndex.FILE_NAME
+    assert default_socket_path() == config_dir / SOCKET_FILE_NAME
+
+    monkeypatch.delenv('PYTHON_HELPERS_CONFIG')
+    assert ParseCache.default_path().parent \
+        == home / '.config' / 'python-helpers'
@@ -0,0 +1,26 @@
+# tests/test_cli.py
+"""Command line arguments the CLI refuses before doing any work."""
+import pytest
+
+
+@pytest.mark.parametrize('args', [
+    ('--top', '0'), ('--top', '-3'), ('--max-notes', '0'),
+    ('--max-notes', '-1'), ('--interval', '0'), ('--interval', '-0.5'),
+    ('--workers', '0'), ('--workers', '-2'),
+])
+def test_rejects_out_of_range_values(tmp_path, monkeypatch, cli, args):
+    monkeypatch.chdir(tmp_path)
+    result = cli('--root', 'missing', '--summary', *args)
+    assert result.returncode == 2
+    assert args[0] in result.stderr
+
+
+@pytest.mark.parametrize('args', [
+    ('--summary',), ('--all', '--workers', '2'), ('--archive',), ('--tickets',),
+])
+def test_missing_root_is_reported(tmp_path, monkeypatch, cli, args):
+    monkeypatch.chdir(tmp_path)
+    result = cli('--root', 'missing', *args)
+    assert result.returncode == 1
+    assert result.stdout.strip() == '❌ Tracking root not found: missing'
+    assert 'Traceback' not in result.stderr
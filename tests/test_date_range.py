@@ -0,0 +1,102 @@
+# tests/test_date_range.py
+"""Range bounds are inclusive and pruning by path never loses a day."""
+from datetime import date
+
+import pytest
+
+from benchmarks.generate import generate_sprint_tree
+from markflow.date_range import DateRange, parse_date
+from markflow.engine import Engine
+from markflow.sprint_tree import SprintManifest
+
+
+def test_bounds_are_inclusive():
+    date_range = DateRange.from_args('2024-12-31', '2025-01-31')
+    assert '2024-12-30' not in date_range
+    assert '2024-12-31' in date_range
+    assert '2025-01-31' in date_range
+    assert '2025-02-01' not in date_range
+
+
+def test_month_narrows_since_and_until():
+    assert DateRange.from_args(month='2024-02').bounds \
+        == ('2024-02-01', '2024-02-29')
+    assert DateRange.from_args(since='2024-02-10', until='2024-03-05',
+                               month='2024-02').bounds \
+        == ('2024-02-10', '2024-02-29')
+    assert DateRange.from_args() is None
+
+
+@pytest.mark.parametrize('since, year, included', [
+    # A sprint started in late December reaches up to a week into January
+    ('2025-01-01', 2024, True),
+    ('2025-01-07', 2024, True),
+    ('2025-01-08', 2024, False),
+    ('2024-12-31', 2024, True),
+    ('2025-06-01', 2025, True),
+])
+def test_includes_year_edges(since, year, included):
+    assert DateRange(since=parse_date(since)).includes_year(year) is included
+
+
+@pytest.mark.parametrize('since, year, month, included', [
+    ('2025-03-01', 2025, 2, True),
+    ('2025-03-07', 2025, 2, True),
+    ('2025-03-08', 2025, 2, False),
+    ('2025-01-07', 2024, 12, True),
+    ('2025-01-08', 2024, 12, False),
+    ('2024-03-07', 2024, 2, True),   # leap year: Feb 29 + 7 days
+    ('2024-03-08', 2024, 2, False),
+])
+def test_includes_month_edges(since, year, month, included):
+    assert DateRange(since=parse_date(since)).includes_month(year, month) \
+        is included
+
+
+@pytest.fixture(scope='module')
+def year_end_tree(tmp_path_factory):
+    """Nov 2024 - Feb 2025; 2025-01-01..03 sit in the 2024/12/52 sprint."""
+    root = tmp_path_factory.mktemp('tree') / 'root'
+    generate_sprint_tree(root, years=1, tasks_per_day=2, notes_per_task=0,
+                         carry_days=3, start=date(2024, 11, 1))
+    for year_dir in root.iterdir():
+        for month_dir in list(year_dir.iterdir()):
+            if (year_dir.name, month_dir.name) > ('2025', '02'):
+                for day_file in month_dir.glob('*/*.md'):
+                    day_file.unlink()
+                for sprint_dir in list(month_dir.iterdir()):
+                    sprint_dir.rmdir()
+                month_dir.rmdir()
+    return root
+
+
+EDGES = ['2024-11-30', '2024-12-01', '2024-12-31', '2025-01-01',
+         '2025-01-03', '2025-01-31', '2025-02-01', '2025-02-28']
+RANGES = [(since, until) for since in [None] + EDGES for until in EDGES + [None]
+          if (since or until) and not (since and until and since > until)]
+
+
+@pytest.mark.parametrize('since, until', RANGES)
+def test_pruned_discovery_at_year_and_month_edges(year_end_tree, since, until):
+    date_range = DateRange.from_args(since, until)
+    every_file = SprintManifest(year_end_tree).day_files()
+
+    # Every file in the range, plus the first one after it, which carries
+    # the range's last days over when they have no file of their own
+    low = date_range.since or date.min
+    high = date_range.until or date.max
+    expected = [path for path in every_file
+                if low <= parse_date(path.stem) <= high]
+    later = [path for path in every_file if parse_date(path.stem) > high]
+    expected += later[:1]
+    assert SprintManifest(year_end_tree).day_files(date_range) == expected
+
+    engine = Engine(year_end_tree, use_manifest=False, workers=1)
+    days = engine.days(date_range=date_range)
+    every_day = engine.days(every_file, tree=True)
+    assert list(days) == [day for day in every_day if day in date_range]
+
+
+def test_new_year_days_sit_in_last_years_sprint(year_end_tree):
+    new_year = year_end_tree / '2024' / '12' / '52'
+    assert sorted(path.stem for path in new_year.glob('*.md'))[-1] == '20250103'
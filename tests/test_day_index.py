@@ -0,0 +1,60 @@
+# tests/test_day_index.py
+"""A carried-over day is indexed from its newest file, by numeric order."""
+from pathlib import Path
+
+import pytest
+
+from markflow.day_index import DayIndex
+from markflow.engine import Engine
+from markflow.sprint_tree import day_file_key
+
+DAY = """# Today {date}
+
+### Daily Tracker
+
+#### 2025-03-07 (Fr)
+
+- 09:00 - {task}
+- 10:00 - Bye
+
+---
+"""
+
+
+class OwnerIndex(DayIndex):
+    """Only remembers which file each day was indexed from."""
+
+    def _remove_day(self, date, data):
+        pass
+
+    def _add_day(self, date, file, day):
+        self.days[date] = {'file': file, 'task': day.names[0]}
+
+
+def test_newest_file_is_numeric_not_lexicographic(tmp_path, home):
+    root = tmp_path / 'root'
+    # Unpadded sprints: '10' sorts before '9' as text
+    old = root / '2025' / '03' / '9' / '20250307.md'
+    new = root / '2025' / '03' / '10' / '20250310.md'
+    for path, task in ((old, 'first copy'), (new, 'carried over')):
+        path.parent.mkdir(parents=True)
+        path.write_text(DAY.format(date=path.stem, task=task), encoding='utf-8')
+
+    file_paths = Engine(root).discover()
+    assert file_paths == sorted(file_paths, key=day_file_key)
+    assert sorted(map(str, file_paths)) != list(map(str, file_paths))
+
+    index = OwnerIndex(tmp_path / 'index.json')
+    index.update(file_paths)
+    assert index.days['2025-03-07'] == {
+        'file': str(new.absolute()), 'task': 'carried over'}
+
+
+def test_subclasses_must_implement_both_hooks(tmp_path):
+    class AddOnly(DayIndex):
+        def _add_day(self, date, file, day):
+            pass
+
+    for cls in (DayIndex, AddOnly):
+        with pytest.raises(TypeError, match='_remove_day'):
+            cls(tmp_path / 'index.json')
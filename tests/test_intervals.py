@@ -0,0 +1,143 @@
+# tests/test_intervals.py
+"""Intervals past midnight, missing Bye policies, windows and focus blocks."""
+from datetime import date as Date, datetime
+
+import pytest
+
+from markflow.intervals import (
+    IntervalIndex, day_start, parse_window, summary_intervals, task_intervals
+)
+from markflow.parser import parse_time, summarize_tasks
+
+
+def _tasks(*lines: str):
+    """'HH:MM name' lines as parsed task lines."""
+    return [{'time': line[:5], 'name': line[6:], 'notes': []} for line in lines]
+
+
+def _at(date_str: str, clock: str) -> int:
+    return day_start(date_str) + parse_time(clock)
+
+
+LATE_NIGHT = ('2025-03-03', _tasks('22:00 TICKET-1 hotfix', '23:30 deploy',
+                                   '00:45 Bye'))
+MORNING = ('2025-03-04', _tasks('09:00 TICKET-2 ui', '09:00 Admin',
+                                '10:00 Bye'))
+FOCUS_DAY = ('2025-03-05', _tasks(
+    '09:00 TICKET-1 hotfix', '10:00 TICKET-2 ui', '11:30 Stand-up Meeting',
+    '11:45 code review', '12:15 Lunch', '13:00 writing docs',
+    '16:00 Coffee break', '16:15 TICKET-1 hotfix', '17:00 Bye'))
+
+
+def test_task_running_past_midnight_ends_next_day():
+    assert list(task_intervals(*LATE_NIGHT)) == [
+        ('TICKET-1 hotfix', _at('2025-03-03', '22:00'), _at('2025-03-03', '23:30')),
+        ('deploy', _at('2025-03-03', '23:30'), _at('2025-03-04', '00:45')),
+    ]
+    # Parsed days give the same intervals, zero length tasks dropped
+    for date_str, tasks in (LATE_NIGHT, MORNING):
+        assert list(summary_intervals(summarize_tasks(date_str, tasks))) \
+            == list(task_intervals(date_str, tasks))
+    assert list(task_intervals(*MORNING)) \
+        == [('Admin', _at('2025-03-04', '09:00'), _at('2025-03-04', '10:00'))]
+
+
+OPEN_DAY = _tasks('09:00 TICKET-1 hotfix', '10:00 code review')
+OPEN_NIGHT = _tasks('23:00 TICKET-1 hotfix', '01:00 deploy')
+
+
+@pytest.mark.parametrize('tasks, missing_bye, now, last', [
+    (OPEN_DAY, 'drop', None, None),
+    (OPEN_DAY, 'midnight', None, ('10:00', '24:00')),
+    (OPEN_DAY, 'now', datetime(2025, 3, 3, 15, 30), ('10:00', '15:30')),
+    # A day already over runs to its midnight, one not started yet not at all
+    (OPEN_DAY, 'now', datetime(2025, 3, 5, 8, 0), ('10:00', '24:00')),
+    (OPEN_DAY, 'now', datetime(2025, 3, 3, 9, 30), None),
+    # A last task after midnight runs to the midnight after it
+    (OPEN_NIGHT, 'drop', None, None),
+    (OPEN_NIGHT, 'midnight', None, ('25:00', '48:00')),
+    (OPEN_NIGHT, 'now', datetime(2025, 3, 4, 2, 15), ('25:00', '26:15')),
+])
+def test_missing_bye_policies(tasks, missing_bye, now, last):
+    intervals = list(task_intervals('2025-03-03', tasks, missing_bye, now))
+    assert intervals[:1] == list(task_intervals('2025-03-03', tasks))
+    if last is None:
+        assert len(intervals) == 1
+    else:
+        base = day_start('2025-03-03')
+        start, end = (int(clock[:2]) * 60 + int(clock[3:]) for clock in last)
+        assert intervals[1:] == [(tasks[-1]['name'], base + start, base + end)]
+
+
+@pytest.mark.parametrize('missing_bye', ['midnight', 'now'])
+def test_days_with_bye_ignore_the_policy(missing_bye):
+    assert list(task_intervals(*LATE_NIGHT, missing_bye, datetime(2025, 3, 4))) \
+        == list(task_intervals(*LATE_NIGHT))
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError, match='drop, midnight, now'):
+        list(task_intervals('2025-03-03', OPEN_DAY, 'forever'))
+
+
+def test_parse_window():
+    assert parse_window('13:00-15:00') == (780, 900)
+    assert parse_window(' 22:00 - 02:00 ') == (1320, 1560)
+    # The same start and end is a whole day
+    assert parse_window('09:00-09:00') == (540, 1980)
+    with pytest.raises(ValueError, match='HH:MM-HH:MM'):
+        parse_window('13:00')
+
+
+@pytest.fixture
+def index():
+    return IntervalIndex.from_tasks([LATE_NIGHT, MORNING, FOCUS_DAY])
+
+
+def test_window_past_midnight(index):
+    late = parse_window('23:00-01:00')
+    # 03-03 23:00 to 03-04 01:00 holds the end of the hotfix and the deploy
+    assert index.window(late, Date(2025, 3, 3), Date(2025, 3, 4)) \
+        == ({'TICKET-1 hotfix': 30, 'deploy': 75}, 1)
+    assert index.window(late, Date(2025, 3, 3), Date(2025, 3, 3), 'ticket') \
+        == ({'TICKET-1 hotfix': 30}, 1)
+    # The deploy's minutes after midnight belong to 03-04's window
+    assert index.window(parse_window('00:00-01:00'), Date(2025, 3, 4),
+                        Date(2025, 3, 5)) == ({'deploy': 45}, 1)
+    assert index.window(late, Date(2025, 3, 4), Date(2025, 3, 6)) == ({}, 0)
+
+
+def test_window_counts_each_day(index):
+    assert index.window(parse_window('09:30-10:30'), Date(2025, 3, 1),
+                        Date(2025, 3, 31)) \
+        == ({'Admin': 30, 'TICKET-1 hotfix': 30, 'TICKET-2 ui': 30}, 2)
+    assert index.window(parse_window('09:30-10:30'), Date(2025, 3, 1),
+                        Date(2025, 3, 31), match='nothing') == ({}, 0)
+
+
+def test_focus_blocks(index):
+    day = '2025-03-05'
+    starts, ends = index.focus_blocks()
+    assert [(start, end) for start, end in zip(starts, ends)
+            if start >= day_start(day)] == [
+        (_at(day, '09:00'), _at(day, '11:30')),   # two tickets back to back
+        (_at(day, '11:45'), _at(day, '12:15')),
+        (_at(day, '13:00'), _at(day, '16:00')),
+        (_at(day, '16:15'), _at(day, '17:00')),
+    ]
+    assert index.longest_focus(Date(2025, 3, 5), Date(2025, 3, 5)) \
+        == (_at(day, '13:00'), _at(day, '16:00'))
+    # Only meetings break focus here, so lunch and the coffee break do not
+    assert index.longest_focus(Date(2025, 3, 5), Date(2025, 3, 5), ('meeting',)) \
+        == (_at(day, '11:45'), _at(day, '17:00'))
+
+
+def test_focus_block_belongs_to_the_day_it_starts(index):
+    # The late night block runs into 03-04, where a morning block starts too
+    night = (_at('2025-03-03', '22:00'), _at('2025-03-04', '00:45'))
+    assert index.longest_focus(Date(2025, 3, 3), Date(2025, 3, 3)) == night
+    assert index.longest_focus(Date(2025, 3, 4), Date(2025, 3, 4)) \
+        == (_at('2025-03-04', '09:00'), _at('2025-03-04', '10:00'))
+    assert index.longest_focus(Date(2025, 3, 6)) is None
+    assert index.longest_focus() == (_at('2025-03-05', '13:00'),
+                                     _at('2025-03-05', '16:00'))
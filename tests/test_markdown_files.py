@@ -0,0 +1,187 @@
+# tests/test_markdown_files.py
+"""In-place edits: patch, tick, append_task and end_day."""
+import os
+import stat
+from datetime import datetime
+
+import pytest
+
+from markflow.models.markdown_files import MarkdownFile
+
+DAY_FILE = """# Today 2025-06-27
+
+## Daily Tasks
+
+- [x] Log your times
+- [ ] Copy Daily Task List
+  - [ ] Log your times
+- [ ] Log your times today
+- [ ] Log your times
+
+### Daily Tracker
+
+#### 2025-06-27 (Fr)
+
+- 09:00 - Admin
+  - emails ü
+- 09:30 - TICKET-1
+
+---
+
+#### 2025-06-26 (Th)
+
+- 09:00 - Admin
+- 17:00 - Bye
+
+## Other Stuff
+
+- [ ] Log your times
+"""
+
+FRIDAY = datetime(2025, 6, 27, 16, 45)
+
+
+@pytest.fixture(params=['\n', '\r\n'], ids=['lf', 'crlf'])
+def newline(request):
+    return request.param
+
+
+@pytest.fixture
+def day_file(tmp_path, newline):
+    path = tmp_path / '20250627.md'
+    path.write_bytes(DAY_FILE.replace('\n', newline).encode('utf-8'))
+    os.chmod(path, 0o640)
+    return path
+
+
+def _expected(text, newline):
+    return text.replace('\n', newline).encode('utf-8')
+
+
+def test_patch_rewrites_through_a_temp_file(day_file):
+    data = day_file.read_bytes()
+    inode = day_file.stat().st_ino
+    start = data.index(b'TICKET-1')
+    with MarkdownFile(day_file) as markdown:
+        markdown.patch(start, start + len(b'TICKET-1'), b'TICKET-22')
+        # Re-mapped and re-indexed after the edit
+        assert bytes(markdown.buffer) == data.replace(b'TICKET-1', b'TICKET-22')
+        assert markdown.day('2025-06-26').heading.start \
+            == data.index(b'#### 2025-06-26') + 1
+
+    assert day_file.read_bytes() == data.replace(b'TICKET-1', b'TICKET-22')
+    assert day_file.stat().st_ino != inode
+    assert stat.S_IMODE(day_file.stat().st_mode) == 0o640
+    assert os.listdir(day_file.parent) == [day_file.name]
+
+
+def test_patch_at_the_end_appends(day_file):
+    data = day_file.read_bytes()
+    inode = day_file.stat().st_ino
+    with MarkdownFile(day_file) as markdown:
+        markdown.patch(len(data), len(data), b'tail')
+        assert bytes(markdown.buffer) == data + b'tail'
+    assert day_file.read_bytes() == data + b'tail'
+    assert day_file.stat().st_ino == inode
+
+
+def test_patch_refuses_bad_or_stale_edits(day_file):
+    data = day_file.read_bytes()
+    with MarkdownFile(day_file) as markdown:
+        with pytest.raises(ValueError, match='Bad patch range'):
+            markdown.patch(5, 4, b'')
+        with pytest.raises(ValueError, match='Bad patch range'):
+            markdown.patch(0, len(data) + 1, b'')
+
+        day_file.write_bytes(data + b'edited elsewhere')
+        with pytest.raises(RuntimeError, match='changed since it was read'):
+            markdown.patch(0, 0, b'x')
+    assert day_file.read_bytes() == data + b'edited elsewhere'
+
+    with pytest.raises(ValueError, match='no file'):
+        MarkdownFile.from_bytes(data).patch(0, 0, b'x')
+
+
+def test_tick_first_open_exact_item(day_file, newline):
+    with MarkdownFile(day_file) as markdown:
+        markdown.tick('Log your times')
+    # The ticked one is skipped; the nested box is the first open one.
+    # A longer item of the same prefix is left alone.
+    assert day_file.read_bytes() == _expected(DAY_FILE.replace(
+        '  - [ ] Log your times\n', '  - [x] Log your times\n'), newline)
+
+    with MarkdownFile(day_file) as markdown:
+        markdown.tick('Log your times', section='Other Stuff')
+    assert day_file.read_bytes().endswith(
+        _expected('## Other Stuff\n\n- [x] Log your times\n', newline))
+    open_box = b'[ ] Log your times' + newline.encode('ascii')
+    assert day_file.read_bytes().count(open_box) == 1
+
+
+def test_tick_missing_item_or_section(day_file):
+    data = day_file.read_bytes()
+    with MarkdownFile(day_file) as markdown:
+        with pytest.raises(ValueError, match="No open item 'Connect to VPN'"):
+            markdown.tick('Connect to VPN')
+        with pytest.raises(ValueError, match="No 'Nowhere' section"):
+            markdown.tick('Log your times', section='Nowhere')
+        # Boxes outside the section are not looked at
+        with pytest.raises(ValueError, match='No open item'):
+            markdown.tick('Copy Daily Task List', section='Daily Tracker')
+    assert day_file.read_bytes() == data
+
+
+def test_append_task_before_end_marker(day_file, newline):
+    with MarkdownFile(day_file) as markdown:
+        markdown.append_task('TICKET-2', FRIDAY, notes=['review', 'déploy'])
+    assert day_file.read_bytes() == _expected(DAY_FILE.replace(
+        '- 09:30 - TICKET-1\n',
+        '- 09:30 - TICKET-1\n- 16:45 - TICKET-2\n  - review\n  - déploy\n'),
+        newline)
+
+
+def test_append_task_after_notes_of_a_carried_over_day(day_file, newline):
+    with MarkdownFile(day_file) as markdown:
+        markdown.append_task('Late fix', datetime(2025, 6, 26, 18, 5))
+    assert day_file.read_bytes() == _expected(DAY_FILE.replace(
+        '- 17:00 - Bye\n', '- 17:00 - Bye\n- 18:05 - Late fix\n'), newline)
+
+
+def test_append_task_to_an_empty_day(tmp_path, newline):
+    path = tmp_path / '20250630.md'
+    path.write_bytes(_expected('#### 2025-06-30 (Mo)\n\n---\n', newline))
+    with MarkdownFile(path) as markdown:
+        markdown.append_task('Admin', datetime(2025, 6, 30, 9, 0))
+    assert path.read_bytes() \
+        == _expected('#### 2025-06-30 (Mo)\n\n- 09:00 - Admin\n\n---\n', newline)
+
+
+def test_missing_day(day_file):
+    data = day_file.read_bytes()
+    with MarkdownFile(day_file) as markdown:
+        with pytest.raises(ValueError, match="No '#### 2025-06-28' day"):
+            markdown.append_task('Admin', datetime(2025, 6, 28, 9, 0))
+        with pytest.raises(ValueError, match="No '#### 2025-06-28' day"):
+            markdown.end_day(datetime(2025, 6, 28, 17, 0))
+    assert day_file.read_bytes() == data
+
+
+def test_end_day(day_file, newline):
+    with MarkdownFile(day_file) as markdown:
+        markdown.end_day(FRIDAY)
+    closed = DAY_FILE.replace('- 09:30 - TICKET-1\n',
+                              '- 09:30 - TICKET-1\n- 16:45 - Bye\n')
+    assert day_file.read_bytes() == _expected(closed, newline)
+
+    # A day whose last task is Bye, in any case, is not closed twice
+    for when in (FRIDAY, datetime(2025, 6, 26, 18, 0)):
+        with MarkdownFile(day_file) as markdown:
+            with pytest.raises(ValueError, match='is already closed'):
+                markdown.end_day(when)
+    assert day_file.read_bytes() == _expected(closed, newline)
+
+    day_file.write_bytes(_expected(
+        '#### 2025-06-27 (Fr)\n\n- 09:00 - Admin\n- 12:00 - BYE\n', newline))
+    with MarkdownFile(day_file) as markdown:
+        with pytest.raises(ValueError, match='2025-06-27 is already closed'):
+            markdown.end_day(FRIDAY)
@@ -0,0 +1,36 @@
+# tests/test_parser.py
+"""Date-limited parsing stops once the day headings leave the range."""
+from markflow.models.markdown_files import MarkdownFile
+from markflow.parser import iter_day_summaries
+
+
+def _file(*dates: str) -> MarkdownFile:
+    days = [f"#### {date}\n\n- 09:00 - Admin\n- 10:00 - Bye\n" for date in dates]
+    return MarkdownFile.from_bytes(
+        ("### Daily Tracker\n\n" + "\n".join(days) + "\n## Other\n").encode())
+
+
+def _dates(markdown, since=None, until=None):
+    return [day.date for day in iter_day_summaries(markdown, since, until)]
+
+
+def test_newest_first_stops_past_since():
+    # A day out of order after the range was left is never reached
+    markdown = _file('2025-06-27', '2025-06-26', '2025-06-20', '2025-06-28')
+    assert _dates(markdown, since='2025-06-26') == ['2025-06-27', '2025-06-26']
+    assert _dates(markdown) \
+        == ['2025-06-27', '2025-06-26', '2025-06-20', '2025-06-28']
+
+
+def test_oldest_first_stops_past_until():
+    markdown = _file('2025-06-20', '2025-06-26', '2025-06-27', '2025-06-21')
+    assert _dates(markdown, until='2025-06-26') == ['2025-06-20', '2025-06-26']
+
+
+def test_days_before_the_range_are_skipped_not_stopped_at():
+    # Headings still rising towards the range, or falling towards it
+    markdown = _file('2025-06-20', '2025-06-26', '2025-06-27')
+    assert _dates(markdown, since='2025-06-26') == ['2025-06-26', '2025-06-27']
+    markdown = _file('2025-06-30', '2025-06-27', '2025-06-26')
+    assert _dates(markdown, until='2025-06-27') == ['2025-06-27', '2025-06-26']
+    assert _dates(markdown, '2025-06-27', '2025-06-27') == ['2025-06-27']
@@ -0,0 +1,156 @@
+# tests/test_search.py
+"""Search terms, prefixes and ranges over a small hand-written tree."""
+from pathlib import Path
+
+import pytest
+
+from markflow.date_range import DateRange
+from markflow.engine import Engine
+from markflow.search import SearchIndex, tokenize
+
+JUNE_26 = """#### 2025-06-26 (Th)
+
+- 09:00 - TICKET-123 login bug
+  - api/v2 timeout
+- 10:00 - Code review
+  - PR 45{extra}
+- 11:00 - Bye
+"""
+
+JUNE_27 = """#### 2025-06-27 (Fr)
+
+- 09:00 - Admin
+  - ticket triage
+- 09:30 - Bye
+"""
+
+JULY_1 = """#### 2025-07-01 (Tu)
+
+- 09:00 - TICKET-1234 deploy
+- 09:30 - Ticketing meeting
+- 10:00 - Bye
+"""
+
+
+def _write(path: Path, *days: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("### Daily Tracker\n\n" + "\n".join(days) + "\n---\n",
+                    encoding='utf-8')
+
+
+@pytest.fixture
+def files(tmp_path):
+    root = tmp_path / 'root'
+    june = root / '2025' / '06' / '25'
+    files = {
+        'first': june / '20250626.md',
+        # 06-26 carried over, with a note added the next day
+        'carried': june / '20250627.md',
+        'july': root / '2025' / '07' / '26' / '20250701.md',
+    }
+    _write(files['first'], JUNE_26.format(extra=''))
+    _write(files['carried'], JUNE_27, JUNE_26.format(extra='\n  - fixed in v1.2'))
+    _write(files['july'], JULY_1)
+    return files
+
+
+@pytest.fixture
+def index(files, tmp_path):
+    index = SearchIndex(tmp_path / 'search_index.json')
+    index.update(Engine(tmp_path / 'root', use_archive=False).discover())
+    return index
+
+
+def _found(index, query, date_range=None):
+    return [(hit.date, hit.occurrence.name)
+            for hit in index.search(query, date_range)]
+
+
+def test_tokenize_keeps_compounds_and_their_parts():
+    assert list(tokenize('TICKET-123 api/v2, v1.2!')) == [
+        'ticket-123', 'ticket', '123', 'api/v2', 'api', 'v2',
+        'v1.2', 'v1', '2']
+
+
+def test_compound_tokens_and_parts(index):
+    assert _found(index, 'TICKET-123') == [('2025-06-26', 'TICKET-123 login bug')]
+    assert _found(index, 'ticket-1234') == [('2025-07-01', 'TICKET-1234 deploy')]
+    # A part matches every compound holding it, and whole words only
+    assert _found(index, 'ticket') == [
+        ('2025-06-26', 'TICKET-123 login bug'),
+        ('2025-06-27', 'Admin'),
+        ('2025-07-01', 'TICKET-1234 deploy'),
+    ]
+    assert _found(index, '123') == [('2025-06-26', 'TICKET-123 login bug')]
+    assert _found(index, 'v2') == _found(index, 'API/V2') \
+        == [('2025-06-26', 'TICKET-123 login bug')]
+    # A compound in the query is looked up whole, not split
+    assert _found(index, 'review-45') == []
+
+
+def test_prefixes(index):
+    assert _found(index, 'tick*') == [
+        ('2025-06-26', 'TICKET-123 login bug'),
+        ('2025-06-27', 'Admin'),
+        ('2025-07-01', 'TICKET-1234 deploy'),
+        ('2025-07-01', 'Ticketing meeting'),
+    ]
+    assert _found(index, 'ticket-12*') == [
+        ('2025-06-26', 'TICKET-123 login bug'),
+        ('2025-07-01', 'TICKET-1234 deploy'),
+    ]
+    assert _found(index, 'zzz*') == []
+    assert _found(index, '*') == _found(index, '-- !') == []
+
+
+def test_every_term_must_match(index):
+    assert _found(index, 'ticket login') == [('2025-06-26', 'TICKET-123 login bug')]
+    assert _found(index, 'tick* deploy') == [('2025-07-01', 'TICKET-1234 deploy')]
+    assert _found(index, 'login deploy') == []
+    # Terms can come from the name and the notes
+    assert _found(index, 'code 45') == [('2025-06-26', 'Code review')]
+
+
+def test_carried_over_day_is_indexed_once_from_its_newest_file(index, files):
+    hits = index.search('review')
+    assert [(hit.date, hit.file) for hit in hits] \
+        == [('2025-06-26', str(files['carried'].absolute()))]
+    assert tuple(hits[0].occurrence.notes) == ('  - PR 45', '  - fixed in v1.2')
+    assert _found(index, 'v1.2') == [('2025-06-26', 'Code review')]
+
+
+def test_incremental_update_after_edit_and_delete(index, files, tmp_path):
+    engine = Engine(tmp_path / 'root', use_archive=False)
+    files['july'].write_text(files['july'].read_text(encoding='utf-8')
+                             .replace('deploy', 'rollback'), encoding='utf-8')
+    # Only the edited file is read and its one day re-indexed
+    assert index.update(engine.discover()) == (1, 1)
+    assert _found(index, 'deploy') == []
+    assert _found(index, 'rollback') == [('2025-07-01', 'TICKET-1234 rollback')]
+
+    # 06-26 falls back to the older file; 06-27 is gone
+    files['carried'].unlink()
+    assert index.update(engine.discover()) == (0, 1)
+    assert _found(index, 'v1.2') == _found(index, 'admin') == []
+    assert [hit.file for hit in index.search('review')] \
+        == [str(files['first'].absolute())]
+
+    index.save()
+    loaded = SearchIndex.load(tmp_path / 'search_index.json')
+    assert loaded.update(engine.discover()) == (0, 0)
+    for query in ('ticket', 'tick*', 'rollback', 'api/v2'):
+        assert _found(loaded, query) == _found(index, query)
+
+
+def test_date_ranges(index):
+    june = DateRange.from_args(month='2025-06')
+    assert _found(index, 'ticket', june) == [
+        ('2025-06-26', 'TICKET-123 login bug'), ('2025-06-27', 'Admin')]
+    assert _found(index, 'ticket', DateRange.from_args('2025-06-27', '2025-07-01')) \
+        == [('2025-06-27', 'Admin'), ('2025-07-01', 'TICKET-1234 deploy')]
+    assert _found(index, 'ticket', DateRange.from_args(until='2025-06-26')) \
+        == [('2025-06-26', 'TICKET-123 login bug')]
+    # 2025-07-01 is in the %U sprint 26, June 26-27 in 25
+    assert _found(index, 'ticket', DateRange.from_args(sprint='2025-26')) \
+        == [('2025-07-01', 'TICKET-1234 deploy')]
+    assert _found(index, 'ticket', DateRange.from_args(sprint='24')) == []
@@ -0,0 +1,78 @@
+# tests/test_serve.py
+"""The daemon answers every request line, malformed ones with an error."""
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from markflow.date_range import DateRange
+from markflow.engine import Engine
+from markflow.serve import Daemon, DaemonError, ResidentCache, query
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def daemon(tree):
+    engine = Engine(Path('root'), ResidentCache(), workers=1)
+    return Daemon(engine)
+
+
+@pytest.mark.parametrize('line', [
+    b'not json\n',
+    b'[1, 2]\n',
+    b'{"op": "nothing"}\n',
+    b'{"op": "summary", "top": "five"}\n',
+    b'{"op": "days", "since": 20250101}\n',
+    b'{"op": "days", "month": "2025-13"}\n',
+])
+def test_malformed_requests_get_an_error(daemon, line):
+    response = json.loads(daemon.respond(line))
+    assert response['ok'] is False
+    assert response['error']
+
+
+def test_summary_matches_engine(daemon):
+    response = json.loads(daemon.respond(
+        b'{"op": "summary", "month": "2025-06", "top": 3}\n'))
+    assert response['ok'] is True
+
+    engine = Engine(Path('root'))
+    days = engine.days(date_range=DateRange.from_args(month='2025-06'))
+    result = response['result']
+    assert result['days'] == len(days)
+    assert [(task['name'], task['total']) for task in result['tasks']] \
+        == [(task.name, task.total) for task in engine.summary(days).top(3)]
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'),
+                    reason='needs Unix domain sockets')
+def test_socket_round_trip(tree, home):
+    socket_path = home / 'markflow.sock'
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'markflow', 'serve', '--root', 'root',
+         '--socket', str(socket_path), '--workers', '1'],
+        cwd=tree.parent, env={'HOME': str(home), 'PYTHONPATH': str(REPO)},
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        deadline = time.monotonic() + 30
+        while query({'op': 'ping'}, socket_path) is None:
+            assert process.poll() is None, process.stderr.read()
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        with pytest.raises(DaemonError):
+            query({'op': 'summary', 'top': 'five'}, socket_path)
+        # The daemon is still there after a bad request
+        assert query({'op': 'summary', 'top': 1}, socket_path)['days'] > 0
+        assert query({'op': 'stop'}, socket_path)['pid'] == process.pid
+        assert process.wait(timeout=10) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    assert not socket_path.exists()
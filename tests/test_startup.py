@@ -0,0 +1,30 @@
+# tests/test_startup.py
+"""Modules only some commands need stay out of the CLI's import."""
+import subprocess
+import sys
+from pathlib import Path
+
+from markflow import intervals
+
+REPO = Path(__file__).resolve().parent.parent
+
+# Loaded by the commands that use them, never at import
+LAZY = ('yaml', 'numpy', 'concurrent.futures', 'markflow.models.yaml_config',
+        'markflow.watch', 'markflow.archive', 'markflow.serve',
+        'markflow.intervals')
+
+
+def test_cli_import_stays_lean():
+    code = ('import sys, time_tracker_parser; '
+            f'print(*[name for name in {LAZY!r} if name in sys.modules])')
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == []
+
+
+def test_mirrored_constants():
+    import time_tracker_parser
+    from markflow import analytics
+
+    assert time_tracker_parser.MISSING_BYE == intervals.MISSING_BYE
+    assert time_tracker_parser.ANALYTICS_PERIODS == analytics.PERIODS
@@ -0,0 +1,324 @@
+# tests/test_web_config_manager.py
+"""The forward scans rewrite Web.config exactly as the old patterns did."""
+import os
+import re
+import stat
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from web_config_manager import (
+    RuleSet, ToggleRule, apply_edits, comment_http_errors,
+    find_commented_http_errors, find_config_files, find_http_errors,
+    process_web_configs, toggle_web_config, uncomment_http_errors,
+)
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+# The regex versions the scans replaced, kept as the reference
+def old_comment(content):
+    pattern = r'(\s*)(<httpErrors[^>]*>.*?</httpErrors>)'
+    new_content, count = re.subn(
+        pattern, lambda m: f'{m.group(1)}<!-- {m.group(2)} -->', content,
+        flags=re.DOTALL | re.IGNORECASE)
+    return new_content, count > 0
+
+
+def old_uncomment(content):
+    pattern = r'(\s*)<!--\s*(<httpErrors[^>]*>.*?</httpErrors>)\s*-->'
+    new_content, count = re.subn(
+        pattern, lambda m: f'{m.group(1)}{m.group(2)}', content,
+        flags=re.DOTALL | re.IGNORECASE)
+    return new_content, count > 0
+
+
+ERRORS = ('<httpErrors errorMode="Custom" existingResponse="Replace">\n'
+          '      <remove statusCode="404" />\n'
+          '      <error statusCode="404" path="/404" responseMode="ExecuteURL" />\n'
+          '    </httpErrors>')
+
+
+def _config(body, newline='\n', bom=False):
+    text = ('<?xml version="1.0" encoding="utf-8"?>\n<configuration>\n'
+            '  <system.webServer>\n    ' + body + '\n'
+            '  </system.webServer>\n</configuration>\n')
+    return ('\ufeff' if bom else '') + text.replace('\n', newline)
+
+
+CASES = {
+    'plain': _config(ERRORS),
+    'commented': _config(f'<!-- {ERRORS} -->'),
+    'bom': _config(ERRORS, bom=True),
+    'bom-commented': _config(f'<!-- {ERRORS} -->', bom=True),
+    'crlf': _config(ERRORS, '\r\n'),
+    'crlf-commented': _config(f'<!--\n    {ERRORS}\n    -->', '\r\n'),
+    'bom-crlf': _config(ERRORS, '\r\n', bom=True),
+    'upper-case': _config(ERRORS.replace('httpErrors', 'HTTPERRORS')),
+    # Two elements, one in a <location> block, with a comment in between
+    'nested': _config(f'{ERRORS}\n    <location path="api">\n      '
+                      f'<!-- keep -->\n      {ERRORS}\n    </location>'),
+    'nested-commented': _config(f'<!-- {ERRORS} -->\n    <location>\n'
+                                f'      <!--{ERRORS}-->\n    </location>'),
+    # Broken or half-toggled files the old patterns also had to get through
+    'double-commented': _config(f'<!-- <!-- {ERRORS} --> -->'),
+    'half-commented': _config(f'<!-- {ERRORS}'),
+    'self-closing': _config('<httpErrors errorMode="Detailed" />'),
+    'unclosed-tag': _config('<httpErrors errorMode="Custom"'),
+    'unclosed-element': _config('<httpErrors>\n      <clear />'),
+    'comment-only-end': _config(f'{ERRORS} -->'),
+    'none': _config('<handlers />'),
+    'empty': '',
+}
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_comment_matches_old_pattern(name):
+    assert comment_http_errors(CASES[name]) == old_comment(CASES[name])
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_uncomment_matches_old_pattern(name):
+    assert uncomment_http_errors(CASES[name]) == old_uncomment(CASES[name])
+
+
+def test_already_toggled_is_left_alone():
+    assert list(find_commented_http_errors(CASES['plain'])) == []
+    assert list(find_commented_http_errors(CASES['none'])) == []
+    assert list(find_http_errors(CASES['none'])) == []
+    # Commenting again nests the comment, and uncommenting undoes that
+    recommented, _ = comment_http_errors(CASES['commented'])
+    assert recommented.count('<!-- ') == 2
+    assert uncomment_http_errors(recommented)[0] == CASES['commented']
+
+
+@pytest.mark.parametrize('name', ['bom-crlf', 'crlf-commented', 'nested'])
+def test_atomic_write_round_trip(tmp_path, name):
+    web_config = tmp_path / 'Web.config'
+    original = CASES[name].encode('utf-8')
+    web_config.write_bytes(original)
+    web_config.chmod(0o640)
+
+    first, second = ('uncomment', 'comment') if 'commented' in name \
+        else ('comment', 'uncomment')
+    old = old_comment if first == 'comment' else old_uncomment
+    assert toggle_web_config(web_config, first).status == 'changed'
+    assert web_config.read_bytes() == old(CASES[name])[0].encode('utf-8')
+    if first == 'uncomment':
+        assert toggle_web_config(web_config, first).status == 'unchanged'
+
+    assert toggle_web_config(web_config, second).status == 'changed'
+    if name != 'crlf-commented':  # the comment's own line breaks are not restored
+        assert web_config.read_bytes() == original
+    assert stat.S_IMODE(web_config.stat().st_mode) == 0o640
+    assert web_config.read_bytes().startswith(b'\xef\xbb\xbf') == ('bom' in name)
+    assert os.listdir(tmp_path) == ['Web.config']
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """A site with configs at several depths, one already commented."""
+    for path, body in (('site/Web.config', ERRORS),
+                       ('site/Web.Release.config', ERRORS),
+                       ('site/Views/web.config', f'<!-- {ERRORS} -->'),
+                       ('site/api/v1/App.CONFIG', ERRORS),
+                       ('site/api/v1/appsettings.json', '{}'),
+                       ('site/readme.txt', ERRORS)):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(_config(body), encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / 'site'
+
+
+def test_find_config_files(site):
+    # Files of a directory come before its subdirectories, each sorted
+    expected = [Path('site/Web.Release.config'), Path('site/Web.config'),
+                Path('site/Views/web.config'), Path('site/api/v1/App.CONFIG')]
+    assert find_config_files(['site']) == expected
+    # Plain paths are kept as given, and each file is listed once
+    assert find_config_files(['site/readme.txt', 'site/Web.config', 'site']) \
+        == [Path('site/readme.txt'), Path('site/Web.config'),
+            Path('site/Web.Release.config')] + expected[2:]
+    assert find_config_files(['site/**/web.config']) \
+        == [Path('site/Views/web.config')]
+    assert find_config_files(['site/*.missing']) == []
+
+
+def test_batch_comments_every_config(site, capsys):
+    file_paths = find_config_files([str(site)])
+    results = process_web_configs(file_paths, 'comment', workers=2)
+
+    assert [result.path for result in results] == file_paths
+    # Views/web.config was already commented, so it is wrapped again
+    assert [result.status for result in results] == ['changed'] * 4
+    for path in file_paths:
+        assert path.read_text(encoding='utf-8') \
+            == old_comment(_config(f'<!-- {ERRORS} -->' if 'Views' in str(path)
+                                   else ERRORS))[0]
+    assert (site / 'readme.txt').read_text(encoding='utf-8') == _config(ERRORS)
+    printed = capsys.readouterr().out.splitlines()
+    assert printed == [result.message for result in results]
+
+
+def test_batch_dry_run_writes_nothing(site, capsys):
+    file_paths = find_config_files([str(site)])
+    before = {path: path.read_bytes() for path in file_paths}
+    results = process_web_configs(file_paths, 'uncomment', dry_run=True)
+
+    assert [result.status for result in results] \
+        == ['unchanged', 'unchanged', 'changed', 'unchanged']
+    assert {path: path.read_bytes() for path in file_paths} == before
+    out = capsys.readouterr().out
+    assert f'+++ {file_paths[2]}\n' in out
+    assert '-    <!-- <httpErrors errorMode="Custom" existingResponse="Replace">\n' \
+        '+    <httpErrors errorMode="Custom" existingResponse="Replace">\n' in out
+
+
+@pytest.mark.parametrize('workers', ['0', '-1'])
+def test_rejects_workers_below_one(site, workers):
+    result = subprocess.run(
+        [sys.executable, str(REPO / 'web_config_manager.py'), 'site',
+         '--comment', '--workers', workers], capture_output=True, text=True)
+    assert result.returncode == 2
+    assert '--workers must be at least 1' in result.stderr
+    assert 'Traceback' not in result.stderr
+
+
+RULES_CONFIG = '''<configuration>
+  <appSettings>
+    <add key="debug" value="true" />
+    <add key="cdn" value="off" />
+    <!-- <add key="trace" value="1" /> -->
+  </appSettings>
+  <system.web>
+    <compilation debug='true' targetFramework="4.8">
+      <assemblies><add assembly="*" /></assemblies>
+    </compilation>
+    <!-- old: <customErrors mode="Off" /> -->
+    <!--<customErrors mode="On"><error statusCode="404" /></customErrors>-->
+  </system.web>
+  <location path="a"><location path="b"><system.web /></location></location>
+</configuration>
+'''
+
+
+def _rewrite_rules(rules, content=RULES_CONFIG):
+    matches = {}
+    edits = list(rules.find_edits(content, matches))
+    return ''.join(apply_edits(content, edits)), matches
+
+
+def test_rules_load_yaml_and_json(tmp_path):
+    yaml_rules = tmp_path / 'rules.yaml'
+    yaml_rules.write_text(
+        '- add[key="debug"]\n'
+        '- {select: customErrors, action: uncomment, name: errors}\n',
+        encoding='utf-8')
+    rules = RuleSet.load(yaml_rules, 'comment')
+    assert [(rule.name, rule.element, rule.action) for rule in rules.rules] \
+        == [('add[key="debug"]', 'add', 'comment'),
+            ('errors', 'customErrors', 'uncomment')]
+
+    json_rules = tmp_path / 'rules.json'
+    json_rules.write_text(
+        '{"rules": [{"select": "location[path=\'a\']", "action": "comment"}]}',
+        encoding='utf-8')
+    assert [rule.selector for rule in RuleSet.load(json_rules).rules] \
+        == ["location[path='a']"]
+
+
+@pytest.mark.parametrize('text, error', [
+    ('[]', 'non-empty list'),
+    ('{"other": ["add"]}', 'non-empty list'),
+    ('[{"action": "comment"}]', "rule 1 needs a 'select'"),
+    ('[{"select": "add", "action": "comment"}, 3]', "rule 2 needs a 'select'"),
+    ('["add"]', "rule 'add': action must be"),
+    ('[{"select": "add", "action": "delete"}]', 'action must be'),
+    ('[{"select": "add[", "action": "comment"}]', 'bad selector'),
+])
+def test_rules_load_errors(tmp_path, text, error):
+    rules_file = tmp_path / 'rules.json'
+    rules_file.write_text(text, encoding='utf-8')
+    with pytest.raises(ValueError, match=re.escape(error)):
+        RuleSet.load(rules_file)
+
+
+def test_rules_load_bad_yaml(tmp_path):
+    rules_file = tmp_path / 'rules.yml'
+    rules_file.write_text('- [unclosed', encoding='utf-8')
+    with pytest.raises(ValueError):
+        RuleSet.load(rules_file, 'comment')
+
+
+def test_find_edits_attribute_tests():
+    rules = RuleSet([ToggleRule('add[key="debug"]', 'comment', 'debug'),
+                     ToggleRule("compilation[ debug = 'true' ]", 'comment'),
+                     ToggleRule('add[value]', 'comment', 'valued')])
+    new, matches = _rewrite_rules(rules)
+    # The first rule to select an element wins; a commented one is skipped
+    assert matches == {'debug': 1, 'valued': 1,
+                       "compilation[ debug = 'true' ]": 1}
+    assert '    <!-- <add key="debug" value="true" /> -->\n' in new
+    assert '    <!-- <add key="cdn" value="off" /> -->\n' in new
+    assert '    <!-- <add key="trace" value="1" /> -->\n' in new
+    # Whole element, nested <add> included, so it is not commented twice
+    assert "<!-- <compilation debug='true' targetFramework=\"4.8\">\n" \
+        '      <assemblies><add assembly="*" /></assemblies>\n' \
+        '    </compilation> -->\n' in new
+    assert new.count('<!--') == RULES_CONFIG.count('<!--') + 3
+
+
+def test_find_edits_nested_and_uncomment():
+    rules = RuleSet([ToggleRule('location[path="a"]', 'comment'),
+                     ToggleRule('location', 'comment', 'inner'),
+                     ToggleRule('customErrors', 'uncomment')])
+    new, matches = _rewrite_rules(rules)
+    # The outer location ends at its own closing tag, not the inner one's
+    assert '  <!-- <location path="a"><location path="b"><system.web />' \
+        '</location></location> -->\n' in new
+    assert 'inner' not in matches
+    # Only a comment holding just the element is undone
+    assert '    <customErrors mode="On"><error statusCode="404" />' \
+        '</customErrors>\n' in new
+    assert '<!-- old: <customErrors mode="Off" /> -->' in new
+    assert matches == {'location[path="a"]': 1, 'customErrors': 1}
+
+    assert _rewrite_rules(RuleSet([ToggleRule('add', 'uncomment')]))[1] \
+        == {'add': 1}
+    assert _rewrite_rules(RuleSet([ToggleRule('missing', 'comment')])) \
+        == (RULES_CONFIG, {})
+
+
+def test_rules_dry_run_prints_diff_and_writes_nothing(tmp_path):
+    for name in ('Web.config', 'Web.Debug.config'):
+        (tmp_path / name).write_text(RULES_CONFIG, encoding='utf-8')
+    (tmp_path / 'rules.yaml').write_text(
+        '- {select: \'add[key="cdn"]\', name: cdn}\n', encoding='utf-8')
+
+    result = subprocess.run(
+        [sys.executable, str(REPO / 'web_config_manager.py'),
+         'Web.config', 'Web.Debug.config', '--rules', 'rules.yaml',
+         '--comment', '--dry-run'],
+        capture_output=True, text=True, cwd=tmp_path)
+    assert result.returncode == 0, result.stderr
+    diff = ('--- {0}\n+++ {0}\n'
+            '@@ -1,7 +1,7 @@\n'
+            ' <configuration>\n'
+            '   <appSettings>\n'
+            '     <add key="debug" value="true" />\n'
+            '-    <add key="cdn" value="off" />\n'
+            '+    <!-- <add key="cdn" value="off" /> -->\n'
+            '     <!-- <add key="trace" value="1" /> -->\n'
+            '   </appSettings>\n'
+            '   <system.web>\n')
+    assert result.stdout == (
+        "Would apply rules to 'Web.config': cdn x1.\n"
+        + diff.format('Web.config')
+        + "Would apply rules to 'Web.Debug.config': cdn x1.\n"
+        + diff.format('Web.Debug.config')
+        + 'Summary: 2 changed, 0 unchanged, 0 failed (dry run, nothing written).\n'
+        + "Rule 'cdn' (comment add[key=\"cdn\"]): 2 elements in 2 files.\n")
+    for name in ('Web.config', 'Web.Debug.config'):
+        assert (tmp_path / name).read_text(encoding='utf-8') == RULES_CONFIG
@@ -1,20 +1,40 @@
 #!/usr/bin/env python3
+import time
+_STARTED = time.perf_counter()
 
-import re
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from functools import partial
 import argparse
-import yaml
-import os
-from markflow.models.yaml_config import YamlConfig
-from markflow.models.markdown_files import MarkdownFile
-
-
-def parse_time(time_str: str) -> int:
-    """Convert time string like '09:00' to minutes since midnight."""
-    hour, minute = map(int, time_str.split(':'))
-    return hour * 60 + minute
+import json
+import re
+import sys
+# Runs from shell hooks, so anything only some commands need (yaml and the
+# config model, new-day, --watch, archives, numpy, process pools) is imported
+# where used. The parser, and with it the markdown model, is always needed.
+from markflow.date_range import DateRange, parse_date
+from markflow.stats import RunStats
+from markflow.models.time_records import DaySummary
+from markflow.cache import ParseCache
+from markflow.engine import Engine, sprint_day_filter
+from markflow.summary import SummaryAggregator, capped_notes, top_items
+from markflow.sprint_tree import SprintManifest, find_latest_day_file
+from markflow.parser import iter_time_tracking_tasks
+# Re-exported: benchmarks.run and older scripts call them through this module
+from markflow.parser import (  # noqa: F401
+    parse_time, parse_day_tasks, parse_time_tracking_file
+)
+
+if TYPE_CHECKING:
+    from markflow.models.yaml_config import YamlConfig
+    from markflow.watch import DayStatus
+
+# Mirrors markflow.analytics.PERIODS - importing it here would load numpy on every run
+ANALYTICS_PERIODS = ('day', 'week', 'sprint', 'month', 'quarter')
+# Mirrors markflow.intervals.MISSING_BYE - only --window and --longest-focus load it
+MISSING_BYE = ('drop', 'midnight', 'now')
+HEATMAP_TASKS = 15
 
 
 def minutes_to_duration(minutes: int) -> str:
@@ -29,174 +49,350 @@ def minutes_to_duration(minutes: int) -> str:
         return f"{hours}h {mins}m"
 
 
-def parse_time_tracking_file(file_path: Path) -> Dict[str, Dict[str, any]]:
-    """Parse a time tracking markdown file and return grouped task data."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+# TODO: add in markdown under the times.
+def print_summary(results: Dict[str, DaySummary], top: Optional[int] = None,
+                  max_notes: Optional[int] = None):
+    """
+    Print a summary of the parsed time tracking data: the `top` tasks of
+    each day with at most `max_notes` distinct notes each. Lines are
+    collected and written in one go.
+    """
+    lines = []
+    for date, day in results.items():
+        lines.append(f"\n📅 {date}")
+        lines.append("=" * 50)
+
+        # Tasks by total duration (descending)
+        task_notes = dict(zip(day.names, day.notes_by_task()))
+        for task_name, total_duration in top_items(day.task_totals(), top):
+            duration_str = minutes_to_duration(total_duration)
+            lines.append(f"- {task_name}: {duration_str}")
+
+            notes = capped_notes(task_notes[task_name], max_notes)
+            if notes:
+                lines.append("\t- Notes:")
+                # Note should already have the hyphen
+                lines.extend(f"\t\t{note}" for note in notes)
 
-    # Find all day sections
-    day_pattern = r'#### (\d{4}-\d{2}-\d{2})'  # \([^)]+\)'
-    day_matches = list(re.finditer(day_pattern, content))
+        # Show total time tracked for the day
+        total_duration_str = minutes_to_duration(day.total_duration)
+        lines.append(f"\n⏱️  Total time tracked: {total_duration_str}")
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
+
+
+def print_overall_summary(overall: SummaryAggregator,
+                          top: Optional[int] = None):
+    """Print the --summary totals across days, the `top` tasks only."""
+    lines = ["", "=" * 60, "📊 OVERALL SUMMARY", "=" * 60]
+    tasks = overall.top(top)
+    for task in tasks:
+        duration_str = minutes_to_duration(task.total)
+        days_str = f"({task.days} day{'s' if task.days > 1 else ''})"
+        lines.append(f"\n🔸 {task.name}: {duration_str} {days_str}")
+        if task.notes:
+            lines.append("\t- Notes:")
+            lines.extend(f"\t\t{note}" for note in task.notes)
+    if len(tasks) < len(overall):
+        lines.append(f"\n… {len(overall) - len(tasks)} more tasks")
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
+
+
+def print_analytics(results: Dict[str, DaySummary], period: str,
+                    heatmap: bool, stats: RunStats):
+    """Print totals per period and, optionally, a task heatmap."""
+    from markflow.analytics import OccurrenceTable, format_heatmap
+
+    with stats.stage('aggregation'):
+        try:
+            table = OccurrenceTable.from_summaries(results)
+        except ImportError as e:
+            print(f"❌ {e}")
+            return
+        rollup = table.rollup(period)
+        if heatmap:
+            names, labels, matrix = table.task_pivot(period, HEATMAP_TASKS)
+
+    with stats.stage('rendering'):
+        print(f"\n📈 Time per {period}")
+        print("=" * 60)
+        print(f"{period:<12}{'total':>10}{'days':>6}{'avg/day':>10}"
+              f"{'median':>10}{'p90':>10}")
+        for label, total, days, mean, percentiles in rollup.rows():
+            print(f"{label:<12}{minutes_to_duration(total):>10}{days:>6}"
+                  f"{minutes_to_duration(round(mean)):>10}"
+                  f"{minutes_to_duration(round(percentiles[50])):>10}"
+                  f"{minutes_to_duration(round(percentiles[90])):>10}")
+
+        if heatmap:
+            print(f"\n🔥 Busiest tasks per {period}")
+            print("=" * 60)
+            print(format_heatmap(names, labels, matrix))
 
-    results = {}
 
-    for i, day_match in enumerate(day_matches):
-        date_str = day_match.group(1)
-        day_start = day_match.end()
+def print_intervals(results: Dict[str, DaySummary], file_paths: List[Path],
+                    args: argparse.Namespace,
+                    date_range: Optional[DateRange], stats: RunStats):
+    """
+    Print the time inside a daily --window and the --longest-focus block,
+    from absolute intervals of the parsed days. Any --missing-bye policy
+    but 'drop' needs the raw task lines, so the files are read again.
+    """
+    from markflow.intervals import IntervalIndex, minute_datetime, parse_window
 
-        # Find the end of this day's section
-        if i + 1 < len(day_matches):
-            day_end = day_matches[i + 1].start()
-        else:
-            # Look for next section header or end of file
-            next_section = re.search(r'\n##[^#]', content[day_start:])
-            day_end = day_start + next_section.start() \
-                if next_section else len(content)
-
-        day_content = content[day_start:day_end]
-
-        # Parse tasks for this day
-        task_data = parse_day_tasks(day_content)
-        if task_data:
-            results[date_str] = task_data
-
-    return results
-
-
-def parse_day_tasks(day_content: str) -> Dict[str, any]:
-    """Parse tasks for a single day."""
-    lines = day_content.strip().split('\n')
-    tasks = []
-    current_task = None
-
-    for line in lines:
-        if not line:
-            continue
-
-        # Main task line (starts with -)
-        if line.startswith('- ') and re.search(r'\d{2}:\d{2}', line):
-            if current_task:
-                tasks.append(current_task)
-
-            # Extract time and task name
-            time_match = re.search(r'(\d{2}:\d{2})', line)
-            if time_match:
-                time_str = time_match.group(1)
-                task_name = line[line.find(time_str) + 5:].strip()
-                if task_name.startswith('- '):
-                    task_name = task_name[2:]
-
-                current_task = {
-                    'time': time_str,
-                    'name': task_name,
-                    'notes': []
-                }
-
-        # TODO: think how to change bullet points
-        # Sub-bullet point (notes)
-        elif line.strip().startswith('- ') and current_task:
-            current_task['notes'].append(line)
-
-    # Add the last task
-    if current_task:
-        tasks.append(current_task)
-
-    # Calculate durations and group by task label
-    grouped_tasks = {}
-
-    for i, task in enumerate(tasks):
-        start_time = parse_time(task['time'])
-
-        # Calculate end time (start of next task or end of day)
-        if i + 1 < len(tasks):
-            end_time = parse_time(tasks[i + 1]['time'])
-        else:
-            # Last 'task' should be "Bye"
-            # and only signals end time to finish previous calcuation
-            continue
-
-        duration = end_time - start_time
-        if duration < 0:  # Handle day boundary crossing
-            duration += 24 * 60
-
-        # Group by task name
-        task_name = task['name']
-        if task_name not in grouped_tasks:
-            grouped_tasks[task_name] = {
-                'total_duration': 0,
-                'notes': [],
-                'occurrences': []
-            }
-
-        grouped_tasks[task_name]['total_duration'] += duration
-        grouped_tasks[task_name]['notes'].extend(task['notes'])
-        grouped_tasks[task_name]['occurrences'].append({
-            'time': task['time'],
-            'duration': duration,
-            'notes': task['notes']
-        })
-
-    return grouped_tasks
+    try:
+        window = parse_window(args.window) if args.window else None
+    except ValueError as e:
+        print(f"❌ Invalid window: {e}")
+        return
 
+    with stats.stage('intervals'):
+        if args.missing_bye == 'drop':
+            index = IntervalIndex.from_summaries(results)
+        else:
+            since, until = date_range.bounds if date_range else (None, None)
+            days = {}
+            # Oldest first so later copies of a carried-over day win
+            for file_path in file_paths:
+                days.update(iter_time_tracking_tasks(file_path, since, until))
+            index = IntervalIndex.from_tasks(
+                ((date, tasks) for date, tasks in sorted(days.items())
+                 if date in results or date_range is None or (
+                     date in date_range
+                     and date_range.in_sprint(parse_date(date)))),
+                args.missing_bye)
+    if not len(index):
+        print("❌ No tracked intervals in the specified files.")
+        return
 
-# TODO: add in markdown under the times.
-def print_summary(results: Dict[str, Dict[str, any]]):
-    """Print a summary of the parsed time tracking data."""
-    for date, tasks in results.items():
-        print(f"\n📅 {date}")
-        print("=" * 50)
-
-        # Sort tasks by total duration (descending)
-        sorted_tasks = sorted(
-            tasks.items(), key=lambda x: x[1]['total_duration'], reverse=True)
-
-        for task_name, task_data in sorted_tasks:
-            duration_str = minutes_to_duration(task_data['total_duration'])
-            print(f"- {task_name}: {duration_str}")
-
-            if task_data['notes']:
-                print("\t- Notes:")
-                for note in task_data['notes']:
-                    # Note should already have the hyphen
-                    print(f"\t\t{note}")
+    first = minute_datetime(index.starts[0]).date()
+    last = minute_datetime(index.starts[-1]).date()
+    if date_range is not None:
+        first = date_range.since or first
+        last = date_range.until or last
+
+    with stats.stage('intervals'):
+        if window is not None:
+            totals, days = index.window(window, first, last, args.match)
+        if args.longest_focus:
+            focus = index.longest_focus(first, last)
+
+    with stats.stage('rendering'):
+        if window is not None:
+            label = f" ({args.match})" if args.match else ""
+            print(f"\n🕐 {args.window} from {first} to {last}{label}: "
+                  f"{minutes_to_duration(sum(totals.values()))} "
+                  f"on {days} day{'s' if days != 1 else ''}")
+            print("=" * 60)
+            for task_name, minutes in top_items(totals, args.top):
+                print(f"- {task_name}: {minutes_to_duration(minutes)}")
+        if args.longest_focus:
+            if focus is None:
+                print("\n🎯 No focus blocks")
+            else:
+                start, end = minute_datetime(focus[0]), minute_datetime(focus[1])
+                until = end.strftime('%H:%M') if end.date() == start.date() \
+                    else end.strftime('%Y-%m-%d %H:%M')
+                print(f"\n🎯 Longest focus block: "
+                      f"{minutes_to_duration(focus[1] - focus[0])} on "
+                      f"{start:%Y-%m-%d} {start:%H:%M}-{until}")
+
+
+def print_search_hits(query: str, hits: list, seconds: float):
+    """Print every occurrence matching a --search query with its duration."""
+    from markflow.search import tokenize
+
+    print(f"\n🔎 {len(hits)} hit{'s' if len(hits) != 1 else ''} "
+          f"for \"{query}\" in {seconds * 1000:.2f}ms")
+    print("=" * 60)
+    words = list(tokenize(query.replace('*', ' ')))
+    total = 0
+    for hit in hits:
+        occurrence = hit.occurrence
+        total += occurrence.duration
+        print(f"{hit.date} {occurrence.time} "
+              f"{minutes_to_duration(occurrence.duration):>8}  "
+              f"{occurrence.name}  ({Path(hit.file).name})")
+        for note in occurrence.notes:
+            # Only the notes that matched
+            if any(token.startswith(word) for token in tokenize(note)
+                   for word in words):
+                print(f"\t\t{note.strip()}")
+
+    if hits:
+        print(f"\n⏱️  Total time tracked: {minutes_to_duration(total)}")
+
+
+def print_ticket_totals(totals: list):
+    """Print the --tickets rollup, one ticket per line."""
+    if not totals:
+        return
+    print(f"\n🎫 {len(totals)} ticket{'s' if len(totals) != 1 else ''}")
+    print("=" * 60)
+    width = max(len(total.ticket) for total in totals)
+    for total in totals:
+        sprints = ', '.join(total.sprints)
+        print(f"{total.ticket:<{width}} "
+              f"{minutes_to_duration(total.total):>8}  "
+              f"{total.first} .. {total.last}  "
+              f"{total.days} day{'s' if total.days != 1 else ''}  "
+              f"sprint{'s' if len(total.sprints) != 1 else ''} {sprints}")
+
+
+def print_live_total(file_path: Path, status: 'DayStatus'):
+    """Print one line with today's running total for --watch."""
+    date_str, summary, current, total = status
+    stamp = datetime.now().strftime("%H:%M")
+    if summary is None and current is None:
+        print(f"⏳ {stamp} - Nothing tracked for {date_str} in {file_path.name}",
+              flush=True)
+        return
 
-        # Show total time tracked for the day
-        total_minutes = sum(task['total_duration'] for task in tasks.values())
-        total_duration_str = minutes_to_duration(total_minutes)
-        print(f"\n⏱️  Total time tracked: {total_duration_str}")
+    line = f"⏱️  {stamp} - {minutes_to_duration(total)} tracked on {date_str}"
+    if current is not None:
+        line += f" (now: {current.name} for {minutes_to_duration(current.duration)})"
+    print(line, flush=True)
 
 
-def get_latest_sprint(sprint_path: Path) -> Path:
+def export_files(engine: Engine, file_paths: List[Path], export_format: str,
+                 output: Optional[str], date_range: Optional[DateRange],
+                 tree: bool):
     """
-    From the path provided, the assumptions are the paths are
-    sorted ascending.
-    This will return the latest spring day.
+    Stream one row per occurrence to `output` (stdout by default), newest
+    file first. Status goes to stderr so stdout stays machine readable.
     """
-    # print(f"Sprints Root: {str(sprint_path)}")
-    last_year = [x for x in sprint_path.iterdir() if x.is_dir()][-1]
-    last_month = [x for x in last_year.iterdir() if x.is_dir()][-1]
-    last_sprint = [x for x in last_month.iterdir() if x.is_dir()][-1]
-    return [x for x in last_sprint.iterdir() if x.is_file() and '.md' in x.suffix][-1]
+    from markflow.export import export_days
 
+    keep = None
+    if tree and date_range is not None and date_range.sprint is not None:
+        keep = sprint_day_filter(file_paths, date_range)
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Parse time tracking markdown files')
-    parser.add_argument('--file', action='append',
-                        help='Markdown files to parse')
-    parser.add_argument('--aggregate-time', action='store_true',
-                        help='aggregates time in the latest sprint-day file')
-    parser.add_argument('--new-day', action='store_true',
-                        help='creates a new sprint day')
-    parser.add_argument('--summary', action='store_true',
-                        help='Show summary across all files')
-    parser.add_argument('--config', action='store_true',
-                        help='Set up or reconfigure the tracking root directory to the top of sprints')
-    # parser.add_argument('--help', action='store_true',
-    #                     help='prints the help text for this tool')
+    engine.stats.count('files', len(file_paths))
+    with engine.stats.stage('export'):
+        days = engine.iter_days(file_paths, date_range, keep)
+        rows = export_days(days, export_format, output)
+    engine.stats.count('tasks', rows)
+    if output and output != '-':
+        print(f"📤 Exported {rows} rows to: {output}", file=sys.stderr)
+
+
+def update_index(engine: Engine, index):
+    """Bring a `DayIndex` up to date with every day file of the tree."""
+    tree_files = engine.discover()
+    with engine.stats.stage('index'):
+        changed, reindexed = index.update(tree_files, engine.cache)
+        index.save()
+    if engine.cache is not None:
+        with engine.stats.stage('cache'):
+            engine.cache.save()
+    print_indexed(engine.root_path, len(tree_files), changed, reindexed)
+
+
+def print_indexed(root_path, files: int, changed: int, reindexed: int):
+    print(f"🗂️  Indexed {files} files under {root_path}: "
+          f"{changed} changed, {reindexed} days re-indexed")
 
-    args = parser.parse_args()
 
+def search_tree(engine: Engine, query: Optional[str],
+                date_range: Optional[DateRange]):
+    """Bring the search index up to date with the tree, then run `query`."""
+    from markflow.search import SearchIndex
+
+    stats = engine.stats
+    with stats.stage('cache'):
+        index = SearchIndex.load()
+    update_index(engine, index)
+
+    if query is None:
+        return
+    start = time.perf_counter()
+    with stats.stage('search'):
+        hits = index.search(query, date_range)
+    seconds = time.perf_counter() - start
+    with stats.stage('rendering'):
+        print_search_hits(query, hits, seconds)
+
+
+def ticket_rollup(engine: Engine, patterns: Optional[List[str]],
+                  tickets: Optional[List[str]]):
+    """
+    Bring the ticket rollup up to date with the tree, then print the
+    `tickets` asked for, or every ticket when there are none.
+    """
+    from markflow.tickets import DEFAULT_TICKET_PATTERNS, TicketIndex
+
+    stats = engine.stats
+    with stats.stage('cache'):
+        index = TicketIndex.load(
+            patterns=patterns or DEFAULT_TICKET_PATTERNS)
+    update_index(engine, index)
+
+    with stats.stage('rendering'):
+        if tickets:
+            totals = []
+            for ticket in tickets:
+                total = index.get(ticket)
+                if total is None:
+                    print(f"❌ No time tracked on {ticket}")
+                else:
+                    totals.append(total)
+        else:
+            totals = index.totals()
+        print_ticket_totals(totals)
+
+
+def ask_daemon(args: argparse.Namespace, request: Dict[str, Any]):
+    """
+    The answer of a running `python -m markflow serve` for `request` and
+    the command line's root and date range, None to parse directly.
+    """
+    if args.no_daemon or args.no_cache:
+        return None
+    from markflow.serve import DaemonError, query
+
+    request.update(
+        root=str(Path(args.root).absolute()) if args.root else None,
+        since=args.since, until=args.until, month=args.month,
+        sprint=args.sprint)
+    try:
+        return query(request)
+    except DaemonError:  # another root, or a query it cannot answer
+        return None
+
+
+def served_days(args: argparse.Namespace, served: Dict[str, Any],
+                stats: RunStats) -> Dict[str, DaySummary]:
+    """The days a daemon answered with, announced like parsed ones."""
+    from markflow.serve import load_days
+
+    if 'file' in served:
+        print(f"📄 Processing: {served['file']}")
+    else:
+        if not served['files']:
+            print("No files found to aggregate?")
+        print(f"📂 Processing {served['files']} files under: "
+              f"{Path(args.root) if args.root else served['root']}")
+    with stats.stage('daemon'):
+        return load_days(served['days'])
+
+
+def archive_tree(engine: Engine):
+    """Fold every closed year and month of the tree into its archive."""
+    archives = engine.archive()
+    for archive in archives:
+        period = archive.directory.relative_to(engine.root_path).as_posix()
+        total = sum(task.total for task in archive.summary.tasks.values())
+        size = archive.path.stat().st_size
+        print(f"📦 Archived {period}: {len(archive.sources)} files, "
+              f"{len(archive.days)} days, {minutes_to_duration(total)} "
+              f"-> {archive.path} ({size / 1024:.1f} KiB)")
+    if not archives:
+        print(f"📦 Every closed sprint under {engine.root_path} is archived")
+
+
+def run(args: argparse.Namespace, stats: RunStats):
+    """Carry out the command line request, timing each stage in `stats`."""
     # if specific file not specified use config
     # if args.help:
     #     parser.print_help()
@@ -204,160 +400,355 @@ def main():
 
     # Handle config setup
     if args.config:
+        from markflow.models.yaml_config import YamlConfig
+
         YamlConfig.create_config()
         return
 
+    def load_config() -> 'YamlConfig':
+        from markflow.models.yaml_config import YamlConfig
+
+        with stats.stage('config'):
+            try:
+                return YamlConfig.load_config()
+            except ValueError as e:
+                print(f"❌ Invalid config: {e}")
+                sys.exit(1)
+
+    def tracking_root() -> Path:
+        root_path = Path(args.root) if args.root \
+            else load_config().root_path
+        if not root_path.is_dir():
+            print(f"❌ Tracking root not found: {root_path}")
+            sys.exit(1)
+        return root_path
+
+    if args.watch:
+        if args.file:
+            find_file = partial(Path, args.file[0])
+        else:
+            root_path = tracking_root()
+            if args.no_cache:
+                find_file = partial(find_latest_day_file, root_path)
+            else:
+                # Kept in memory: only the newest directories are re-checked
+                find_file = SprintManifest(root_path).latest_day_file
+
+        from markflow.watch import watch_day_file
+
+        print("👀 Watching for changes, Ctrl+C to stop")
+        try:
+            watch_day_file(find_file, print_live_total, args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    def make_engine(use_cache: bool = False) -> Engine:
+        root_path = tracking_root()
+        with stats.stage('cache'):
+            cache = ParseCache.load() if use_cache and not args.no_cache \
+                else None
+        return Engine(root_path, cache, workers=args.workers,
+                      use_manifest=not args.no_cache, stats=stats,
+                      use_archive=not args.no_cache)
+
+    if args.add_task or args.end_day or args.tick:
+        from markflow.models.markdown_files import MarkdownFile
+
+        if args.file:
+            file_path = Path(args.file[0])
+        else:
+            file_path = make_engine().latest_file()
+
+        mdfile = MarkdownFile(file_path)
+        try:
+            with stats.stage('write'):
+                for item in args.tick or ():
+                    mdfile.tick(item)
+                if args.add_task:
+                    mdfile.append_task(args.add_task, notes=args.note or ())
+                if args.end_day:
+                    mdfile.end_day()
+        except (ValueError, RuntimeError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        finally:
+            mdfile.close()
+        print(f"✏️  Updated: {file_path}")
+
+        # Ending the day runs the day's calculation
+        if not (args.end_day or args.aggregate_time):
+            return
+        args.aggregate_time = True
+
     all_results = {}
 
-    # to hold files if needed.
-    files: List[MarkdownFile] = []
+    # Files given with --file, or the latest day file
+    file_paths: List[Path] = []
+
+    # Whole tree mode - paths only, content is never loaded up front
+    tree_files: Optional[List[Path]] = None
+
+    try:
+        date_range = DateRange.from_args(
+            args.since, args.until, args.month, args.sprint)
+    except ValueError as e:
+        print(f"❌ Invalid date range: {e}")
+        return
+
+    if args.search and not args.index:
+        served = ask_daemon(args, {'op': 'search', 'query': args.search})
+        if served is not None:
+            from markflow.serve import load_hits
+
+            print_indexed(Path(args.root) if args.root else served['root'],
+                          served['files'],
+                          served['changed'], served['reindexed'])
+            with stats.stage('rendering'):
+                print_search_hits(args.search, load_hits(served['hits']),
+                                  served['seconds'])
+            return
+
+    if args.index or args.search:
+        search_tree(make_engine(use_cache=True), args.search, date_range)
+        return
+
+    if args.archive:
+        engine = make_engine(use_cache=True)
+        archive_tree(engine)
+        engine.save()
+        return
+
+    if args.tickets or args.ticket:
+        config = None if args.root else load_config()
+        patterns = config.ticket_patterns if config is not None else None
+        try:
+            ticket_rollup(make_engine(use_cache=True), patterns, args.ticket)
+        except re.error as e:
+            print(f"❌ Invalid ticket pattern: {e}")
+            sys.exit(1)
+        return
+
+    if args.all or args.root or date_range or args.rollup or args.heatmap \
+            or args.window or args.longest_focus:
+        args.aggregate_time = True
+
+    # A running daemon has the tree parsed already
+    served = None
+    if args.aggregate_time and not (args.file or args.export or args.window
+                                    or args.longest_focus or args.new_day):
+        with stats.stage('daemon'):
+            served = ask_daemon(args, {
+                'op': 'days',
+                'latest': not (args.all or args.root or date_range),
+            })
 
     # What file(s) are we parsing
-    # put file into 'files' either way.
     # TODO: Encapsulate logic
-    if args.file is not None and len(args.file) > 0:
+    engine = None
+    if served is not None:
+        engine = Engine(Path(args.root or served['root']), stats=stats)
+    elif args.all or args.root or (date_range and not args.file):
+        engine = make_engine(use_cache=args.aggregate_time)
+        tree_files = engine.discover(date_range)
+    elif args.file is not None and len(args.file) > 0:
+        engine = Engine(use_manifest=not args.no_cache, workers=args.workers,
+                        stats=stats)
         for file_path in args.file:
             path = Path(file_path)
             if not path.exists():
                 print(f"❌ File not found: {file_path}")
                 continue
-            else:
-                files.append(MarkdownFile(file_path))
+            file_paths.append(path)
     elif not args.new_day:
-        config: YamlConfig = YamlConfig.load_config()
-        file_path = get_latest_sprint(config.root_path)
-        files.append(MarkdownFile(file_path))
+        engine = make_engine()
+        file_paths.append(engine.latest_file())
+
+    if args.export:
+        paths = tree_files if tree_files is not None else file_paths
+        export_files(engine, paths, args.export, args.output, date_range,
+                     tree_files is not None)
+        return
 
     # TODO: need groupings to avoid the issue with no files
-    if args.aggregate_time:
-        if len(files) < 1:
+    if served is not None:
+        all_results = served_days(args, served, stats)
+    elif args.aggregate_time:
+        if len(file_paths) < 1 and not tree_files:
             print("No files found to aggregate?")
 
-        for mdfile in files:
-            print(f"📄 Processing: {mdfile.file_path}")
-            # TODO: parsing doesn't need to reopen file now
-            results = parse_time_tracking_file(mdfile.file_path)
-            all_results.update(results)
+        engine = engine or make_engine()
+        if engine.cache is None and not args.no_cache:
+            with stats.stage('cache'):
+                engine.cache = ParseCache.load()
+
+        if tree_files is not None:
+            print(f"📂 Processing {len(tree_files)} files under: "
+                  f"{engine.root_path}")
+            all_results = engine.days(tree_files, date_range, tree=True)
+
+        for file_path in file_paths:
+            print(f"📄 Processing: {file_path}")
+        if file_paths:
+            all_results.update(engine.days(file_paths, date_range))
+
+        engine.save()
 
     if args.new_day:
         print("Starting a new day!")
-        config: YamlConfig = YamlConfig.load_config()
-        latest_sprint_path = get_latest_sprint(config.root_path)
-        # get date from file name
-        # will have to determine which week of the year it is
-        mdfile = MarkdownFile(latest_sprint_path)
-
-        # WARN: There will come a time in 2026 where week will be 00...
-        latest_parent_path = latest_sprint_path.parent.absolute()
-
-        # Default values
-        rn = datetime.now()  # right_now
-        new_file_name = f"{rn.strftime("%Y%m%d")}.md"
-        sprint = rn.strftime("%U")
-
-        # Check if in the same week
-        # Week switches to 00 for new year
-        if latest_sprint_path.parts[-2] == sprint or int(sprint) == 0:
-            # Adding to same sprint
-            new_file_path = latest_parent_path / new_file_name
-        else:
+        # Stream the previous day into the new file and swap it in atomically
+        if engine is None or engine.root_path is None:
+            engine = make_engine()
+        new_day = engine.new_day(prune=args.prune_completed)
+        if new_day.new_sprint:
             print("🔥 New Sprint - Good Luck!")
-            year = rn.strftime("%Y")
-            month = rn.strftime("%m")
-            # create directory first
-            new_file_path = config.root_path / year / month / sprint
-            new_file_path.mkdir(parents=True, exist_ok=True)
-            # full path
-            new_file_path = new_file_path / new_file_name
-
-        # Update the date header in the content
-        updated_content = mdfile.content
-        new_date = rn.strftime("%Y-%m-%d")
-
-        # Replace the first line with the new date
-        lines = updated_content.split('\n')
-        if lines:
-            lines[0] = f'# Today {new_date}'
-        
-        # Find the Daily Tracker section and add new day entry
-        daily_tracker_index = -1
-        for i, line in enumerate(lines):
-            if line.strip() == "### Daily Tracker":
-                daily_tracker_index = i
-                break
-        
-        if daily_tracker_index != -1:
-            # Get current time for the initial entry
-            current_time = rn.strftime("%H:%M")
-            day_abbrev = rn.strftime("%a")  # Mon, Tue, Wed, etc.
-            
-            # Create the new day section
-            new_day_section = [
-                "",  # Empty line before
-                f"#### {new_date} ({day_abbrev})",
-                "",  # Empty line after
-                f"- {current_time} - Admin"
-            ]
-            
-            # Insert after the Daily Tracker heading
-            # Find where to insert (after any existing content under Daily Tracker)
-            insert_index = daily_tracker_index + 1
-            
-            # Skip any existing content until we find a good insertion point
-            while (insert_index < len(lines) and 
-                   lines[insert_index].strip() != "" and 
-                   not lines[insert_index].startswith("####")):
-                insert_index += 1
-            
-            # Insert the new day section
-            for i, section_line in enumerate(new_day_section):
-                lines.insert(insert_index + i, section_line)
-        
-        updated_content = '\n'.join(lines)
-
-        # TODO: Eventually load in the Markdown class
-        with open(new_file_path, 'w', encoding="UTF-8") as file:
-            # Can read-to-write update later
-            file.write(updated_content)
-        print(f"📊 Created: {new_file_path}")
+        print(f"📊 Created: {new_day.path}")
+
+    if stats.enabled:
+        stats.count('days', len(all_results))
+        for day in all_results.values():
+            stats.count('tasks', len(day))
+            stats.count('notes', sum(map(len, day.notes)))
+
+    if args.window or args.longest_focus:
+        paths = tree_files if tree_files is not None else file_paths
+        print_intervals(all_results, paths, args, date_range, stats)
+        return
 
     if all_results:
-        print_summary(all_results)
+        if args.rollup or args.heatmap:
+            print_analytics(all_results, args.rollup or 'day', args.heatmap,
+                            stats)
+        else:
+            with stats.stage('rendering'):
+                print_summary(all_results, args.top, args.max_notes)
 
         # TODO: Summary will need updates
         if args.summary and len(all_results) > 1:
-            print("\n" + "=" * 60)
-            print("📊 OVERALL SUMMARY")
-            print("=" * 60)
-
             # Aggregate all tasks across all days
-            overall_tasks = {}
-            for date, tasks in all_results.items():
-                for task_name, task_data in tasks.items():
-                    if task_name not in overall_tasks:
-                        overall_tasks[task_name] = {
-                            'total_duration': 0,
-                            'notes': [],
-                            'days': 0
-                        }
-
-                    overall_tasks[task_name]['total_duration'] += task_data['total_duration']
-                    overall_tasks[task_name]['notes'].extend(
-                        task_data['notes'])
-                    overall_tasks[task_name]['days'] += 1
-
-            # Sort by total duration
-            sorted_overall = sorted(overall_tasks.items(
-            ), key=lambda x: x[1]['total_duration'], reverse=True)
-
-            for task_name, task_data in sorted_overall:
-                duration_str = minutes_to_duration(task_data['total_duration'])
-                days_str = f"({task_data['days']} day{
-                    's' if task_data['days'] > 1 else ''})"
-                print(f"\n🔸 {task_name}: {duration_str} {days_str}")
+            overall = engine.summary(all_results, args.max_notes)
+
+            with stats.stage('rendering'):
+                print_overall_summary(overall, args.top)
     else:
         print("❌ No time tracking data found in the specified files.")
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        description='Parse time tracking markdown files')
+    parser.add_argument('--file', action='append',
+                        help='Markdown files to parse')
+    parser.add_argument('--aggregate-time', action='store_true',
+                        help='aggregates time in the latest sprint-day file')
+    parser.add_argument('--new-day', action='store_true',
+                        help='creates a new sprint day')
+    parser.add_argument('--prune-completed', action='store_true',
+                        help='with --new-day, drop completed [x] items and untick the daily tasks')
+    parser.add_argument('--add-task', metavar='NAME',
+                        help="append '- HH:MM - NAME' to today's block of the latest sprint-day file (or --file)")
+    parser.add_argument('--note', action='append',
+                        help='with --add-task, a note line under the task (repeatable)')
+    parser.add_argument('--end-day', action='store_true',
+                        help="close today's block with '- HH:MM - Bye' and print the day's totals")
+    parser.add_argument('--tick', action='append', metavar='ITEM',
+                        help='tick the first open "- [ ] ITEM" checkbox (repeatable)')
+    parser.add_argument('--summary', action='store_true',
+                        help='Show summary across all files')
+    parser.add_argument('--top', type=int, metavar='N',
+                        help='only the N tasks with the most time per day and in the --summary')
+    parser.add_argument('--max-notes', type=int, metavar='K',
+                        help='at most K distinct notes per task, the most recent; with --summary also lists them under each task')
+    parser.add_argument('--config', action='store_true',
+                        help='Set up or reconfigure the tracking root directory to the top of sprints')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Skip the parse cache, sprint manifest and archives and read every day file')
+    parser.add_argument('--all', action='store_true',
+                        help='aggregates every sprint-day file under the tracking root')
+    parser.add_argument('--root',
+                        help='aggregates every sprint-day file under this directory instead of the configured root')
+    parser.add_argument('--workers', type=int,
+                        help='number of worker processes for --all/--root (default: CPU count)')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and print a live total for today whenever the latest sprint-day file changes')
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help='seconds between checks in --watch mode (default: 5)')
+    parser.add_argument('--since',
+                        help='only days on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--until',
+                        help='only days on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--month',
+                        help='only days in this month (YYYY-MM)')
+    parser.add_argument('--sprint',
+                        help='only days of this sprint directory (WW or YYYY-WW)')
+    parser.add_argument('--rollup', choices=ANALYTICS_PERIODS,
+                        help='totals, average and percentiles per period instead of per-day listings (needs numpy)')
+    parser.add_argument('--heatmap', action='store_true',
+                        help='text heatmap of the busiest tasks per --rollup period (default: day)')
+    parser.add_argument('--window', metavar='HH:MM-HH:MM',
+                        help='time spent inside this clock window on every day of the range, per task')
+    parser.add_argument('--match', metavar='TEXT',
+                        help='with --window, only tasks whose name holds TEXT (case-insensitive)')
+    parser.add_argument('--longest-focus', action='store_true',
+                        help='the longest run of back to back tasks without a meeting, lunch or break')
+    parser.add_argument('--missing-bye', choices=MISSING_BYE,
+                        default='drop',
+                        help="a day's last task without a Bye is dropped (default), runs until midnight or until now")
+    parser.add_argument('--export', choices=('csv', 'jsonl'),
+                        help='stream one row per task occurrence instead of the summary')
+    parser.add_argument('--output',
+                        help='file for --export, "-" or unset for stdout')
+    parser.add_argument('--index', action='store_true',
+                        help='build or update the search index of every task name and note under the tracking root')
+    parser.add_argument('--search', metavar='QUERY',
+                        help='occurrences whose name or notes hold every word of QUERY ("word*" for a prefix), with durations; updates the index first')
+    parser.add_argument('--tickets', action='store_true',
+                        help='total time, first and last day, days and sprints of every ticket in task names (ticket_patterns in config.yaml, default TICKET-123)')
+    parser.add_argument('--ticket', action='append', metavar='ID',
+                        help='the --tickets rollup of one ticket, can be repeated')
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='parse directly even when `python -m markflow serve` is running')
+    parser.add_argument('--archive', action='store_true',
+                        help='compact every closed year (and closed month of this year) into one binary archive.mfa, read instead of its day files while they are unchanged')
+    parser.add_argument('--profile', action='store_true',
+                        help='print time spent per stage and counters to stderr')
+    parser.add_argument('--stats-json',
+                        help='write stage timings and counters as JSON to this file, "-" for stdout')
+    parser.add_argument('--cprofile',
+                        help='run under cProfile and dump pstats to this file')
+    # parser.add_argument('--help', action='store_true',
+    #                     help='prints the help text for this tool')
+
+    args = parser.parse_args()
+    for flag, value in (('--top', args.top), ('--max-notes', args.max_notes),
+                        ('--workers', args.workers)):
+        if value is not None and value < 1:
+            parser.error(f'{flag} must be at least 1')
+    if args.interval <= 0:
+        parser.error('--interval must be more than 0 seconds')
+
+    stats = RunStats(enabled=bool(
+        args.profile or args.stats_json or args.cprofile), started=_STARTED)
+    stats.add_time('startup', time.perf_counter() - _STARTED)
+
+    if args.cprofile:
+        import cProfile
+        profile = cProfile.Profile()
+        profile.runcall(run, args, stats)
+        profile.dump_stats(args.cprofile)
+        print(f"🔬 cProfile stats written to: {args.cprofile}", file=sys.stderr)
+    else:
+        run(args, stats)
+
+    if args.profile:
+        print(stats.format_table(), file=sys.stderr)
+    if args.stats_json == '-':
+        json.dump(stats.to_json(), sys.stdout, indent=2)
+        print()
+    elif args.stats_json:
+        with open(args.stats_json, 'w', encoding='utf-8') as f:
+            json.dump(stats.to_json(), f, indent=2)
+
+
 if __name__ == '__main__':
     main()
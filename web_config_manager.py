@@ -1,94 +1,602 @@
 #!/usr/bin/env python3
 
+import os
 import re
+import sys
+import json
+import glob
 import argparse
+import difflib
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Elements are found with literal searches and the scan only moves forward,
+# so there is nothing for a regex to backtrack over on big or broken files.
+# Case-insensitive and whitespace rules are the same as the old patterns:
+#   (\s*)(<httpErrors[^>]*>.*?</httpErrors>)
+#   (\s*)<!--\s*(<httpErrors[^>]*>.*?</httpErrors>)\s*-->
+OPEN_TAG_RE = re.compile(r'<httpErrors', re.IGNORECASE)
+CLOSE_TAG_RE = re.compile(r'</httpErrors>', re.IGNORECASE)
+COMMENTED_OPEN_RE = re.compile(r'<!--\s*<httpErrors', re.IGNORECASE)
+COMMENT_END_RE = re.compile(r'\s*-->')
+
+LINE_RE = re.compile(r'[^\n]*\n|[^\n]+')
+HUNK_RE = re.compile(r'@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@')
+
+# Rule sets: end of a start tag, allowing '>' inside quoted values. XML
+# forbids '<' in a tag, so each match stops at the next '<' and scanning
+# every start tag stays linear even when quotes are left open
+TAG_END_RE = re.compile(r'''[^<>"']*(?:(?:"[^<"]*"|'[^<']*')[^<>"']*)*>''')
+CLOSE_TAIL_RE = re.compile(r'\s*>')
+SELECTOR_RE = re.compile(r'\s*([A-Za-z_][\w:.-]*)\s*((?:\[[^\]]*\]\s*)*)')
+SELECTOR_ATTRIBUTE_RE = re.compile(
+    r'''\[\s*([^\s=\]]+)\s*(?:=\s*(?:"([^"]*)"|'([^']*)'|([^\]\s]*)))?\s*\]''')
+
+# Batch mode picks up Web.config, Web.Release.config, app.config, ...
+CONFIG_SUFFIX = '.config'
+
+# (start, end, replacement pieces) of one rewritten span
+Edit = Tuple[int, int, Tuple[str, ...]]
+
+
+def _indent_start(content: str, tag_start: int, floor: int) -> int:
+    """Start of the whitespace run before `tag_start`, not before `floor`."""
+    start = tag_start
+    while start > floor and content[start - 1].isspace():
+        start -= 1
+    return start
+
+
+def find_http_errors(content: str) -> Iterator[Edit]:
+    """Edits that wrap each httpErrors element in a comment."""
+    pos = 0
+    while True:
+        tag = OPEN_TAG_RE.search(content, pos)
+        if tag is None:
+            return
+        tag_end = content.find('>', tag.end())
+        if tag_end < 0:
+            return
+        # No closing tag here means none for any later element either
+        close = CLOSE_TAG_RE.search(content, tag_end + 1)
+        if close is None:
+            return
+
+        start = _indent_start(content, tag.start(), pos)
+        yield start, close.end(), (
+            content[start:tag.start()], '<!-- ',
+            content[tag.start():close.end()], ' -->')
+        pos = close.end()
+
+
+def find_commented_http_errors(content: str) -> Iterator[Edit]:
+    """Edits that unwrap each commented-out httpErrors element."""
+    pos = 0
+    while True:
+        opening = COMMENTED_OPEN_RE.search(content, pos)
+        if opening is None:
+            return
+        tag_start = opening.end() - len('<httpErrors')
+        tag_end = content.find('>', opening.end())
+        if tag_end < 0:
+            return
+        # The element runs to the first closing tag that ends the comment
+        for close in CLOSE_TAG_RE.finditer(content, tag_end + 1):
+            comment_end = COMMENT_END_RE.match(content, close.end())
+            if comment_end is not None:
+                break
+        else:
+            return
+
+        start = _indent_start(content, opening.start(), pos)
+        yield start, comment_end.end(), (
+            content[start:opening.start()], content[tag_start:close.end()])
+        pos = comment_end.end()
+
+
+def apply_edits(content: str, edits: Iterable[Edit]) -> Iterator[str]:
+    """The rewritten content as a stream of pieces."""
+    pos = 0
+    for start, end, pieces in edits:
+        yield content[pos:start]
+        yield from pieces
+        pos = end
+    yield content[pos:]
+
+
+def _rewrite(content: str, find: Callable[[str], Iterator[Edit]]) -> Tuple[str, bool]:
+    edits = list(find(content))
+    return ''.join(apply_edits(content, edits)), bool(edits)
 
 
 def comment_http_errors(content: str) -> Tuple[str, bool]:
     """Comment out the httpErrors element in Web.config content."""
-    pattern = r'(\s*)(<httpErrors[^>]*>.*?</httpErrors>)'
-    
-    def replace_func(match):
-        indent = match.group(1)
-        element = match.group(2)
-        return f'{indent}<!-- {element} -->'
-    
-    new_content, count = re.subn(pattern, replace_func, content, flags=re.DOTALL | re.IGNORECASE)
-    return new_content, count > 0
+    return _rewrite(content, find_http_errors)
 
 
 def uncomment_http_errors(content: str) -> Tuple[str, bool]:
     """Uncomment the httpErrors element in Web.config content."""
-    pattern = r'(\s*)<!--\s*(<httpErrors[^>]*>.*?</httpErrors>)\s*-->'
-    
-    def replace_func(match):
-        indent = match.group(1)
-        element = match.group(2)
-        return f'{indent}{element}'
-    
-    new_content, count = re.subn(pattern, replace_func, content, flags=re.DOTALL | re.IGNORECASE)
-    return new_content, count > 0
+    return _rewrite(content, find_commented_http_errors)
 
 
-def process_web_config(file_path: Path, action: str) -> None:
-    """Process the Web.config file to comment or uncomment httpErrors element."""
+class ToggleRule:
+    """
+    One element selector and what to do with the elements it selects.
+    Selectors are an element name with optional attribute tests, as in
+    `customErrors`, `compilation[debug="true"]` or `add[key]`.
+    """
+    __slots__ = ('name', 'selector', 'element', 'attribute_res', 'action')
+
+    def __init__(self, selector: str, action: Optional[str],
+                 name: Optional[str] = None):
+        self.selector = selector
+        self.name = name or selector
+        if action not in ('comment', 'uncomment'):
+            raise ValueError(
+                f"rule '{self.name}': action must be comment or uncomment")
+        self.action = action
+
+        match = SELECTOR_RE.fullmatch(selector)
+        if match is None:
+            raise ValueError(f"rule '{self.name}': bad selector {selector!r}")
+        self.element = match.group(1)
+        # One search per attribute test, run over the start tag only
+        self.attribute_res = []
+        for attribute in SELECTOR_ATTRIBUTE_RE.finditer(match.group(2)):
+            pattern = rf'\s(?i:{re.escape(attribute.group(1))})\s*=\s*'
+            value = next(
+                (v for v in attribute.group(2, 3, 4) if v is not None), None)
+            if value is not None:
+                value = re.escape(value)
+                pattern += f'''(?:"{value}"|'{value}')'''
+            self.attribute_res.append(re.compile(pattern))
+
+    def selects(self, content: str, start: int, tag_end: int) -> bool:
+        """Whether the start tag at `content[start:tag_end]` passes the tests."""
+        return all(
+            attribute.search(content, start, tag_end)
+            for attribute in self.attribute_res)
+
+
+class RuleSet:
+    """
+    Toggle rules compiled into one scan: every selected element of a file
+    is commented or uncommented in a single pass, the first matching rule
+    winning for each element.
+    """
+    __slots__ = ('rules', 'by_element', 'tag_res', 'scan_re')
+
+    def __init__(self, rules: List[ToggleRule]):
+        self.rules = rules
+        # (action, element name) -> rules, in file order
+        self.by_element: Dict[Tuple[str, str], List[ToggleRule]] = {}
+        for rule in rules:
+            self.by_element.setdefault(
+                (rule.action, rule.element.lower()), []).append(rule)
+        element_names = {name for _, name in self.by_element}
+
+        # Opening and closing tags per element name, to pair them up
+        self.tag_res = {
+            name: re.compile(
+                rf'<(/?){re.escape(name)}(?=[\s/>])', re.IGNORECASE)
+            for name in element_names
+        }
+        # Comments, commented-out elements and elements, in document order
+        names = '|'.join(re.escape(name) for name in sorted(element_names))
+        self.scan_re = re.compile(
+            rf'<!--\s*(?=<({names})(?=[\s/>]))|<!--|<({names})(?=[\s/>])',
+            re.IGNORECASE)
+
+    @classmethod
+    def load(cls, file_path: Path, default_action: Optional[str] = None) -> 'RuleSet':
+        """
+        Read rules from a YAML or JSON file: a list, or a mapping with a
+        `rules` list, of `{select, action, name}` entries or bare selectors.
+        Rules without an action get `default_action`.
+        """
+        text = Path(file_path).read_text(encoding='utf-8')
+        if Path(file_path).suffix.lower() in ('.yaml', '.yml'):
+            import yaml
+            try:
+                data = yaml.safe_load(text)
+            except yaml.YAMLError as e:
+                raise ValueError(str(e)) from e
+        else:
+            data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get('rules')
+        if not isinstance(data, list) or not data:
+            raise ValueError("expected a non-empty list of rules")
+
+        rules = []
+        for i, entry in enumerate(data, 1):
+            if isinstance(entry, str):
+                entry = {'select': entry}
+            if not isinstance(entry, dict) or not isinstance(entry.get('select'), str):
+                raise ValueError(f"rule {i} needs a 'select' selector")
+            rules.append(ToggleRule(
+                entry['select'], entry.get('action', default_action),
+                entry.get('name')))
+        return cls(rules)
+
+    def _element_ends(self, content: str, name: str) -> Dict[int, int]:
+        """
+        End of every paired `name` element, keyed on its `<`. Tags are
+        paired with a stack in one pass, so nesting is handled.
+        """
+        ends: Dict[int, int] = {}
+        stack: List[int] = []
+        for tag in self.tag_res[name].finditer(content):
+            if tag.group(1):
+                close = CLOSE_TAIL_RE.match(content, tag.end())
+                if close is not None and stack:
+                    ends[stack.pop()] = close.end()
+                continue
+            tag_end = TAG_END_RE.match(content, tag.end())
+            if tag_end is not None and content[tag_end.end() - 2] != '/':
+                stack.append(tag.start())
+        return ends
+
+    def find_edits(self, content: str,
+                   matches: Optional[Dict[str, int]] = None) -> Iterator[Edit]:
+        """
+        Edits for every selected element, counting elements per rule name
+        in `matches`. Elements inside a comment are left alone unless the
+        comment holds just that element and a rule uncomments it.
+        """
+        # Only worked out for names with a selected, non-self-closing element
+        element_ends: Dict[str, Dict[int, int]] = {}
+
+        def select(name: str, start: int, action: str):
+            """The first rule selecting the element and the element's end."""
+            name = name.lower()
+            rules = self.by_element.get((action, name))
+            if not rules:
+                return None, None
+            tag_end = TAG_END_RE.match(content, start + 1 + len(name))
+            if tag_end is None:
+                return None, None
+            tag_end = tag_end.end()
+            for rule in rules:
+                if rule.selects(content, start, tag_end):
+                    break
+            else:
+                return None, None
+
+            if content[tag_end - 2] == '/':
+                return rule, tag_end
+            if name not in element_ends:
+                element_ends[name] = self._element_ends(content, name)
+            return rule, element_ends[name].get(start)
+
+        pos = 0
+        while True:
+            token = self.scan_re.search(content, pos)
+            if token is None:
+                return
+
+            if token.group(2) is not None:
+                # An element outside any comment
+                start = token.start()
+                rule, end = select(token.group(2), start, 'comment')
+                if rule and end:
+                    yield start, end, ('<!-- ', content[start:end], ' -->')
+                    if matches is not None:
+                        matches[rule.name] = matches.get(rule.name, 0) + 1
+                    pos = end
+                else:
+                    pos = token.end()
+                continue
+
+            if token.group(1) is not None:
+                # A comment opening straight onto an element
+                start = token.end()
+                rule, end = select(token.group(1), start, 'uncomment')
+                comment_end = rule and end and COMMENT_END_RE.match(content, end)
+                if comment_end:
+                    yield token.start(), comment_end.end(), (content[start:end],)
+                    if matches is not None:
+                        matches[rule.name] = matches.get(rule.name, 0) + 1
+                    pos = comment_end.end()
+                    continue
+
+            comment_end = content.find('-->', token.start() + 4)
+            if comment_end < 0:
+                return
+            pos = comment_end + 3
+
+
+def write_pieces_atomic(file_path: Path, pieces: Iterable[str]) -> None:
+    """
+    Stream `pieces` into a temp file beside `file_path` and rename it over
+    the original, keeping its mode. Text is written as UTF-8 with newlines
+    untouched, so a BOM and CRLF line endings survive the rewrite.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f'.{file_path.name}.', suffix='.tmp', dir=file_path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            for piece in pieces:
+                f.write(piece)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class ToggleResult:
+    """
+    Outcome of toggling one file: 'changed', 'unchanged' or 'failed', and
+    with a rule set, the number of elements each rule matched.
+    """
+    __slots__ = ('path', 'status', 'message', 'diff', 'matches')
+
+    def __init__(self, path: Path, status: str, message: str,
+                 diff: Optional[str] = None,
+                 matches: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.status = status
+        self.message = message
+        self.diff = diff
+        self.matches = matches or {}
+
+
+def _context_start(content: str, pos: int, lines: int) -> int:
+    """Start of the line holding `pos`, moved back `lines` lines."""
+    start = content.rfind('\n', 0, pos) + 1
+    for _ in range(lines):
+        if start == 0:
+            break
+        start = content.rfind('\n', 0, start - 1) + 1
+    return start
+
+
+def _context_end(content: str, pos: int, lines: int) -> int:
+    """End of the line holding `pos`, moved forward `lines` lines."""
+    end = pos
+    for _ in range(lines + 1):
+        if end >= len(content):
+            return len(content)
+        newline = content.find('\n', end)
+        end = len(content) if newline < 0 else newline + 1
+    return end
+
+
+def _split_lines(text: str) -> List[str]:
+    return LINE_RE.findall(text)
+
+
+def edits_diff(content: str, edits: Iterable[Edit], file_name: str,
+               context: int = 3) -> str:
+    """
+    Unified diff of `edits`. Only a few lines around each edit are
+    compared, so a diff of a multi-megabyte file costs about as much as
+    the edits themselves.
+    """
+    windows: List[List[Any]] = []
+    for edit in edits:
+        start = _context_start(content, edit[0], context)
+        end = _context_end(content, edit[1] - 1, context)
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = end
+            windows[-1][2].append(edit)
+        else:
+            windows.append([start, end, [edit]])
+
+    out = [f"--- {file_name}\n", f"+++ {file_name}\n"]
+    old_line = 0  # Lines before the current window, before and after editing
+    shift = 0
+    counted = 0
+    for start, end, window_edits in windows:
+        old_line += content.count('\n', counted, start)
+        counted = start
+
+        new = []
+        pos = start
+        for edit_start, edit_end, pieces in window_edits:
+            new.append(content[pos:edit_start])
+            new.extend(pieces)
+            pos = edit_end
+        new.append(content[pos:end])
+        old_lines = _split_lines(content[start:end])
+        new_lines = _split_lines(''.join(new))
+
+        for line in list(difflib.unified_diff(
+                old_lines, new_lines, n=context))[2:]:
+            hunk = HUNK_RE.match(line)
+            if hunk:
+                line = (f"@@ -{int(hunk.group(1)) + old_line}{hunk.group(2) or ''} "
+                        f"+{int(hunk.group(3)) + old_line + shift}"
+                        f"{hunk.group(4) or ''} @@\n")
+            out.append(line if line.endswith('\n') else line + '\n')
+        shift += len(new_lines) - len(old_lines)
+    return ''.join(out)
+
+
+def toggle_web_config(file_path: Path, action: Optional[str],
+                      dry_run: bool = False,
+                      rules: Optional[RuleSet] = None) -> ToggleResult:
+    """
+    Comment or uncomment the httpErrors element of one file, or apply a
+    rule set instead when given. With `dry_run` nothing is written and
+    the result carries a unified diff.
+    """
     if not file_path.exists():
-        print(f"Error: File '{file_path}' not found.")
-        return
-    
+        return ToggleResult(
+            file_path, 'failed', f"Error: File '{file_path}' not found.")
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except UnicodeDecodeError:
-        try:
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                content = f.read()
-        except Exception as e:
-            print(f"Error reading file: {e}")
-            return
+        # Decoded as-is: a BOM stays a U+FEFF character and CRLF stays CRLF
+        content = file_path.read_bytes().decode('utf-8')
     except Exception as e:
-        print(f"Error reading file: {e}")
-        return
-    
-    if action == 'comment':
-        new_content, changed = comment_http_errors(content)
+        return ToggleResult(
+            file_path, 'failed', f"Error reading file '{file_path}': {e}")
+
+    matches: Dict[str, int] = {}
+    if rules is not None:
+        edits = iter(list(rules.find_edits(content, matches)))
+    elif action == 'comment':
+        edits = find_http_errors(content)
         action_desc = "commented out"
+        dry_run_desc = "comment out"
     else:
-        new_content, changed = uncomment_http_errors(content)
+        edits = find_commented_http_errors(content)
         action_desc = "uncommented"
-    
-    if not changed:
+        dry_run_desc = "uncomment"
+
+    first = next(edits, None)
+    if first is None:
+        if rules is not None:
+            return ToggleResult(
+                file_path, 'unchanged', f"No rules matched in '{file_path}'.")
         element_status = "commented" if action == "uncomment" else "uncommented"
-        print(f"No httpErrors element found to {action} (already {element_status}?).")
-        return
-    
+        return ToggleResult(
+            file_path, 'unchanged',
+            f"No httpErrors element found to {action} in '{file_path}' "
+            f"(already {element_status}?).")
+
+    if rules is not None:
+        applied = ', '.join(f"{name} x{count}" for name, count in matches.items())
+        done = f"Applied rules to '{file_path}': {applied}."
+        would = f"Would apply rules to '{file_path}': {applied}."
+    else:
+        done = f"Successfully {action_desc} httpErrors element in '{file_path}'."
+        would = f"Would {dry_run_desc} httpErrors element in '{file_path}'."
+
+    if dry_run:
+        return ToggleResult(
+            file_path, 'changed', would,
+            edits_diff(content, chain([first], edits), str(file_path)),
+            matches)
+
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        print(f"Successfully {action_desc} httpErrors element in '{file_path}'.")
+        write_pieces_atomic(
+            file_path, apply_edits(content, chain([first], edits)))
     except Exception as e:
-        print(f"Error writing file: {e}")
+        return ToggleResult(
+            file_path, 'failed', f"Error writing file '{file_path}': {e}")
+    return ToggleResult(file_path, 'changed', done, matches=matches)
+
+
+def process_web_config(file_path: Path, action: str) -> None:
+    """Process the Web.config file to comment or uncomment httpErrors element."""
+    print(toggle_web_config(file_path, action).message)
+
+
+def find_config_files(targets: Iterable[str]) -> List[Path]:
+    """
+    Files named by `targets`: plain paths are kept as given, directories
+    are searched for `*.config` files and glob patterns (`**` included)
+    are expanded. Each file is listed once, in the order found.
+    """
+    found: Dict[Path, None] = {}
+    for target in targets:
+        if any(char in target for char in '*?['):
+            matches = [Path(p) for p in sorted(glob.glob(target, recursive=True))]
+            if not matches:
+                print(f"No files match '{target}'.")
+        else:
+            matches = [Path(target)]
+
+        for path in matches:
+            if not path.is_dir():
+                found[path] = None
+                continue
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(CONFIG_SUFFIX):
+                        found[Path(root) / name] = None
+    return list(found)
+
+
+def process_web_configs(file_paths: List[Path], action: Optional[str],
+                        dry_run: bool = False,
+                        workers: Optional[int] = None,
+                        rules: Optional[RuleSet] = None) -> List[ToggleResult]:
+    """
+    Toggle many files on a thread pool, printing each outcome (and diff)
+    in the order the files were given.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(
+                partial(toggle_web_config, action=action, dry_run=dry_run,
+                        rules=rules),
+                file_paths):
+            print(result.message)
+            if result.diff:
+                print(result.diff, end='')
+            results.append(result)
+    return results
 
 
 def main():
     parser = argparse.ArgumentParser(description='Comment or uncomment httpErrors element in Web.config files')
-    parser.add_argument('file', help='Path to Web.config file')
+    parser.add_argument('paths', nargs='+', metavar='path',
+                        help='Web.config files, directories to search for *.config files, or glob patterns')
     
-    action_group = parser.add_mutually_exclusive_group(required=True)
+    action_group = parser.add_mutually_exclusive_group()
     action_group.add_argument('--comment', action='store_true', 
                              help='Comment out the httpErrors element')
     action_group.add_argument('--uncomment', action='store_true', 
                              help='Uncomment the httpErrors element')
+    parser.add_argument('--rules',
+                        help='YAML or JSON file of element selectors to toggle in one pass; '
+                             '--comment/--uncomment set the action of rules without one')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print unified diffs instead of writing files')
+    parser.add_argument('--workers', type=int,
+                        help='files toggled at the same time (default: thread pool default)')
     
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    
+    action = 'comment' if args.comment else 'uncomment' if args.uncomment else None
+    rules = None
+    if args.rules:
+        try:
+            rules = RuleSet.load(Path(args.rules), action)
+        except (OSError, ValueError) as e:
+            print(f"Error: invalid rules file '{args.rules}': {e}")
+            sys.exit(1)
+    elif action is None:
+        parser.error('one of --comment, --uncomment or --rules is required')
+
+    file_paths = find_config_files(args.paths)
+    if not file_paths:
+        print("No config files found.")
+        sys.exit(1)
     
-    file_path = Path(args.file)
-    action = 'comment' if args.comment else 'uncomment'
+    results = process_web_configs(
+        file_paths, action, args.dry_run, args.workers, rules)
     
-    process_web_config(file_path, action)
+    counts = {status: 0 for status in ('changed', 'unchanged', 'failed')}
+    for result in results:
+        counts[result.status] += 1
+    if len(results) > 1 or args.dry_run:
+        print(f"Summary: {counts['changed']} changed, {counts['unchanged']} unchanged, "
+              f"{counts['failed']} failed{' (dry run, nothing written)' if args.dry_run else ''}.")
+    if rules is not None:
+        for rule in rules.rules:
+            files = [r for r in results if rule.name in r.matches]
+            elements = sum(r.matches[rule.name] for r in files)
+            print(f"Rule '{rule.name}' ({rule.action} {rule.selector}): "
+                  f"{elements} element{'s' if elements != 1 else ''} in "
+                  f"{len(files)} file{'s' if len(files) != 1 else ''}.")
+    if counts['failed']:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()